@@ -0,0 +1,46 @@
+# benchmarks/bench_decode.py
+# Compares Response.json() with the raw-bytes decode path on payloads the size of Mapping and a full Latest
+# Run from the repository root with: python -m benchmarks.bench_decode
+
+import json
+import random
+import timeit
+
+from requests import Response
+
+from rswiki_wrapper import decode
+
+
+def make_response(payload) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode('utf-8')
+    # Real responses from these APIs carry no charset, so requests falls back to detecting it
+    response.encoding = None
+    return response
+
+
+def latest_payload(items: int = 4000) -> dict:
+    return {'data': {str(item_id): {'high': random.randint(1, 10 ** 9), 'highTime': 1672437534,
+                                    'low': random.randint(1, 10 ** 9), 'lowTime': 1672437701}
+                     for item_id in range(items)}}
+
+
+def mapping_payload(items: int = 4000) -> list:
+    return [{'examine': 'An item used for benchmarking the decoder.', 'id': item_id, 'members': bool(item_id % 2),
+             'lowalch': 40, 'limit': 10000, 'value': 100, 'highalch': 60, 'icon': f'Item {item_id}.png',
+             'name': f'Item {item_id}'} for item_id in range(items)]
+
+
+def bench(name: str, payload, number: int = 20) -> None:
+    response = make_response(payload)
+    stdlib = min(timeit.repeat(response.json, number=number, repeat=5)) / number
+    fast = min(timeit.repeat(lambda: decode.decode_json(response.content), number=number, repeat=5)) / number
+    print(f'{name:8} Response.json(): {stdlib * 1000:7.2f} ms   decode_json(): {fast * 1000:7.2f} ms   '
+          f'speedup: {stdlib / fast:4.1f}x')
+
+
+if __name__ == '__main__':
+    print('orjson installed' if decode.orjson is not None else 'orjson not installed, using the stdlib fallback')
+    bench('Latest', latest_payload())
+    bench('Mapping', mapping_payload())
@@ -0,0 +1,58 @@
+# benchmarks/bench_records.py
+# Compares the memory held by dict content and by compact records, measured with tracemalloc
+# Run from the repository root with: python -m benchmarks.bench_records
+
+import gc
+import json
+import tracemalloc
+
+from rswiki_wrapper.decode import decode_json
+from rswiki_wrapper.records import AvgPriceRow, LatestPrice, MappingItem, TimeSeriesPoint
+
+from benchmarks.bench_decode import latest_payload, mapping_payload
+
+
+def avg_price_payload(items: int = 4000) -> dict:
+    return {'data': {str(item_id): {'avgHighPrice': 100 + item_id, 'avgLowPrice': 90 + item_id,
+                                    'highPriceVolume': 1000 + item_id, 'lowPriceVolume': 2000 + item_id}
+                     for item_id in range(items)}, 'timestamp': 1672531200}
+
+
+def series_payload(points: int = 365) -> dict:
+    return {'data': [{'timestamp': 1672531200 + n * 300, 'avgHighPrice': 100 + n, 'avgLowPrice': 90 + n,
+                      'highPriceVolume': 1000 + n, 'lowPriceVolume': 2000 + n} for n in range(points)]}
+
+
+def retained(build, body: bytes) -> int:
+    """Return the bytes still allocated by the content built from a response body"""
+    gc.collect()
+    tracemalloc.start()
+    content = build(decode_json(body))
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del content
+    return size
+
+
+def bench(name: str, payload, as_dicts, as_records) -> None:
+    body = json.dumps(payload).encode('utf-8')
+    dicts = retained(as_dicts, body)
+    records = retained(as_records, body)
+    print(f'{name:10} dicts: {dicts / 1024:8.1f} KiB   records: {records / 1024:8.1f} KiB   '
+          f'saved: {1 - records / dicts:5.1%}')
+
+
+if __name__ == '__main__':
+    bench('Latest', latest_payload(),
+          lambda data: data['data'],
+          lambda data: {key: LatestPrice.from_dict(row) for key, row in data['data'].items()})
+    bench('AvgPrice', avg_price_payload(),
+          lambda data: data['data'],
+          lambda data: {key: AvgPriceRow.from_dict(row) for key, row in data['data'].items()})
+    bench('TimeSeries', series_payload(),
+          lambda data: data['data'],
+          lambda data: [TimeSeriesPoint.from_dict(point) for point in data['data']])
+    bench('Mapping', mapping_payload(),
+          lambda data: data,
+          lambda data: [MappingItem.from_dict(item) for item in data])
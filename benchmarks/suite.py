@@ -0,0 +1,224 @@
+# benchmarks/suite.py
+# Measures the client's own cost per call against canned payloads of realistic size, without network I/O
+#
+# Run from the repository root with:
+#   python -m benchmarks.suite                          # print the results
+#   python -m benchmarks.suite --save baseline.json     # save a baseline
+#   python -m benchmarks.suite --compare baseline.json  # fail if a case regressed against the baseline
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tracemalloc
+from importlib import metadata
+from time import perf_counter
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from rswiki_wrapper import Exchange, Latest, Mapping, MediaWiki, RateLimiter, Runescape, TimeSeries, WikiClient
+from rswiki_wrapper.standin import StandInServer
+
+USER_AGENT = 'RS Wiki API Python Wrapper - Benchmark Suite'
+
+
+class CannedAdapter(BaseAdapter):
+    """
+    A transport adapter that answers from the payloads of a ``StandInServer``, rendered once per URL and then reused,
+    so that only the client's own work is measured.
+    """
+
+    def __init__(self, server: StandInServer):
+        super().__init__()
+        self.server = server
+        self._bodies = {}
+
+    def send(self, request, **kwargs):
+        target = request.path_url
+        if target not in self._bodies:
+            status, headers, payload = self.server.respond(target)
+            self._bodies[target] = (status, headers, json.dumps(payload).encode('utf-8'))
+        status, headers, body = self._bodies[target]
+
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(dict(headers, **{'Content-Type': 'application/json'}))
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(server: StandInServer) -> WikiClient:
+    # An effectively unlimited rate limiter replaces the fixed one-second pause between ASK pages
+    client = WikiClient(rate_limiter=RateLimiter(rate=1e9, capacity=1e9))
+    adapter = CannedAdapter(server)
+    client.session.mount('https://', adapter)
+    client.session.mount('http://', adapter)
+    return client
+
+
+def cases(client: WikiClient) -> dict:
+    """
+    The benchmarked calls, each a function making one complete query.
+    """
+    exchange_ids = [str(item_id) for item_id in range(2, 102)]
+
+    def ask_production():
+        MediaWiki('osrs', user_agent=USER_AGENT, client=client).ask_production(get_all=True)
+
+    def browse_properties():
+        MediaWiki('osrs', user_agent=USER_AGENT, client=client).browse_properties('Cake')
+
+    def default_user_agent():
+        # Measures the construction path including the default user agent warning
+        with contextlib.redirect_stdout(io.StringIO()):
+            Runescape('vos', client=client)
+
+    return {
+        'latest': lambda: Latest(user_agent=USER_AGENT, client=client),
+        'mapping': lambda: Mapping(user_agent=USER_AGENT, client=client),
+        'timeseries': lambda: TimeSeries(id=2, timestep='5m', user_agent=USER_AGENT, client=client),
+        'exchange_latest': lambda: Exchange('rs', 'latest', user_agent=USER_AGENT, client=client, id=exchange_ids),
+        'runescape_vos': lambda: Runescape('vos', user_agent=USER_AGENT, client=client),
+        'default_user_agent': default_user_agent,
+        'ask_production': ask_production,
+        'browse_properties': browse_properties,
+    }
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(call, min_iterations: int = 20, min_seconds: float = 1.0, warmup: int = 3) -> dict:
+    """
+    Time a call repeatedly, then trace one more call for its peak memory.
+
+    Returns:
+        dict: ``iterations``, ``calls_per_sec``, ``p50_ms``, ``p99_ms`` and ``peak_kib``.
+    """
+    for _ in range(warmup):
+        call()
+
+    samples = []
+    started = perf_counter()
+    while len(samples) < min_iterations or perf_counter() - started < min_seconds:
+        begin = perf_counter()
+        call()
+        samples.append(perf_counter() - begin)
+    total = perf_counter() - started
+
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'iterations': len(samples),
+        'calls_per_sec': len(samples) / total,
+        'p50_ms': percentile(samples, 0.50) * 1000,
+        'p99_ms': percentile(samples, 0.99) * 1000,
+        'peak_kib': peak / 1024,
+    }
+
+
+def run(names: list = None, items: int = 4000, series_points: int = 365, ask_results: int = 500,
+        min_iterations: int = 20, min_seconds: float = 1.0) -> dict:
+    """
+    Run the suite.
+
+    Args:
+        names (list, optional): The cases to run. Default is every case.
+        items (int, optional): The number of items in the full ``Latest`` and ``Mapping`` payloads.
+        series_points (int, optional): The number of points in the ``TimeSeries`` payload.
+        ask_results (int, optional): The total number of ASK results, served in pages of 50.
+        min_iterations (int, optional): The least number of timed calls per case.
+        min_seconds (float, optional): The least time spent timing each case.
+
+    Returns:
+        dict: The results of each case, keyed by case name.
+    """
+    server = StandInServer(items=items, series_points=series_points, ask_results=ask_results)
+    try:
+        with make_client(server) as client:
+            calls = cases(client)
+            return {name: measure(calls[name], min_iterations, min_seconds) for name in (names or calls)}
+    finally:
+        server.stop()
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    Find the cases that are slower, or use more memory, than a saved baseline.
+
+    Args:
+        results (dict): The results of ``run()``.
+        baseline (dict): A saved baseline, as written by ``--save``.
+        threshold (float, optional): The relative change counted as a regression. Default is ``0.2``.
+
+    Returns:
+        list: A description of each regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        if result['p50_ms'] > before['p50_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.2f} ms -> {result['p50_ms']:.2f} ms")
+        if result['peak_kib'] > before['peak_kib'] * (1 + threshold):
+            regressions.append(f"{name}: peak {before['peak_kib']:.0f} KiB -> {result['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def package_version():
+    try:
+        return metadata.version('rswiki-wrapper')
+    except metadata.PackageNotFoundError:
+        # Run from a checkout that is not installed
+        return None
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the client's own cost per call against canned payloads, "
+                                                 "without network I/O.")
+    parser.add_argument('cases', nargs='*', help='the cases to run (default: all)')
+    parser.add_argument('--save', help='write the results to a baseline file')
+    parser.add_argument('--compare', help='compare the results to a baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='the relative change counted as a regression')
+    parser.add_argument('--seconds', type=float, default=1.0, help='the least time spent timing each case')
+    args = parser.parse_args(argv)
+
+    results = run(args.cases or None, min_seconds=args.seconds)
+
+    print(f"{'case':20} {'calls/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for name, result in results.items():
+        print(f"{name:20} {result['calls_per_sec']:10.1f} {result['p50_ms']:9.2f} {result['p99_ms']:9.2f} "
+              f"{result['peak_kib']:10.0f}")
+
+    if args.save:
+        meta = {'python': platform.python_version(), 'machine': platform.machine(),
+                'rswiki_wrapper': package_version()}
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,2 +1,68 @@
-from .wiki import WikiQuery, WeirdGloop, Exchange, Runescape, MediaWiki
-from .osrs import Latest, Mapping, AvgPrice, TimeSeries
+# rswiki_wrapper/__init__.py
+# Exposes the public names of the package, importing each module only when one of its names is first used
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# The module each public name is defined in. Importing the package is nearly free; ``requests``, ``aiohttp`` and
+# ``numpy`` are only loaded by the modules that need them, when one of their names is first accessed.
+_EXPORTS = {
+    'WikiClient': 'client', 'get_default_client': 'client', 'set_default_client': 'client',
+    'decode_json': 'decode',
+    'DiskCache': 'cache', 'MemoryCache': 'cache',
+    'RateLimiter': 'ratelimit',
+    'Metrics': 'metrics',
+    'RetryPolicy': 'retry', 'CircuitBreaker': 'retry', 'CircuitOpenError': 'retry',
+    'PriceTable': 'tables', 'SeriesTable': 'tables',
+    'PriceStore': 'store',
+    'LatestFeed': 'feed', 'LatestDelta': 'feed',
+    'BatchLoader': 'batch', 'ExchangeLoader': 'batch', 'LatestLoader': 'batch',
+    'LatestPrice': 'records', 'AvgPriceRow': 'records', 'TimeSeriesPoint': 'records', 'MappingItem': 'records',
+    'StandInServer': 'standin',
+    'QueryPlan': 'plan',
+    'WikiQuery': 'wiki', 'WeirdGloop': 'wiki', 'Exchange': 'wiki', 'Runescape': 'wiki', 'MediaWiki': 'wiki',
+    'Latest': 'osrs', 'Mapping': 'osrs', 'AvgPrice': 'osrs', 'TimeSeries': 'osrs',
+    'AsyncWikiClient': 'aio', 'AsyncLatest': 'aio', 'AsyncMapping': 'aio', 'AsyncAvgPrice': 'aio',
+    'AsyncTimeSeries': 'aio', 'AsyncExchange': 'aio', 'AsyncRunescape': 'aio', 'AsyncMediaWiki': 'aio',
+}
+
+__all__ = list(_EXPORTS)
+
+# Submodules stay reachable as attributes, as they were when the package imported them eagerly
+_SUBMODULES = set(_EXPORTS.values()) | {'index', 'stream'}
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return import_module('.' + name, __name__)
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module('.' + module, __name__), name)
+    # Cache the name so that later lookups skip this function
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .client import WikiClient, get_default_client, set_default_client
+    from .decode import decode_json
+    from .cache import DiskCache, MemoryCache
+    from .ratelimit import RateLimiter
+    from .metrics import Metrics
+    from .retry import RetryPolicy, CircuitBreaker, CircuitOpenError
+    from .tables import PriceTable, SeriesTable
+    from .store import PriceStore
+    from .feed import LatestFeed, LatestDelta
+    from .batch import BatchLoader, ExchangeLoader, LatestLoader
+    from .records import LatestPrice, AvgPriceRow, TimeSeriesPoint, MappingItem
+    from .standin import StandInServer
+    from .plan import QueryPlan
+    from .wiki import WikiQuery, WeirdGloop, Exchange, Runescape, MediaWiki
+    from .osrs import Latest, Mapping, AvgPrice, TimeSeries
+    from .aio import AsyncWikiClient, AsyncLatest, AsyncMapping, AsyncAvgPrice, AsyncTimeSeries, AsyncExchange, \
+        AsyncRunescape, AsyncMediaWiki
@@ -0,0 +1,443 @@
+# rswiki_wrapper/aio.py
+# Contains the asyncio client and awaitable versions of the query classes
+
+import asyncio
+import threading
+from time import perf_counter
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .client import rebase_url
+from .metrics import Metrics, RequestEvent, body_size, url_labels
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .osrs import Latest, Mapping, AvgPrice, TimeSeries
+from .wiki import Exchange, Runescape, MediaWiki, PROPERTY_NAMES
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncWikiClient(object):
+    """
+    A non-blocking HTTP client for running queries from an asyncio event loop. Requests are sent with ``aiohttp`` over
+    a shared connection pool, and at most ``concurrency`` requests are in flight at once, so thousands of queries can
+    be gathered from one event loop without a thread per request.
+
+    Queries constructed with an ``AsyncWikiClient`` do not send their request in the constructor. Use the ``fetch()``
+    class method of the ``Async`` query classes, or ``await client.execute(query)``.
+
+    Args:
+        concurrency (int, optional): The maximum number of requests in flight at once from each event loop. Default is
+            ``100``.
+        limit_per_host (int, optional): The maximum number of open connections to each API host from each event loop.
+            Default is ``10``.
+        timeout (float or tuple, optional): Either the total timeout of a request in seconds or a
+            ``(connect, read)`` tuple. Default is ``None`` (wait forever).
+        rate_limiter (:obj:`RateLimiter`, optional): A per-host rate limiter that every request waits on without
+            blocking the event loop. Default is ``None`` (no limit).
+        base_url (str, optional): A server to send every request to instead of the real API hosts. See
+            ``WikiClient``. Default is ``None``.
+        metrics (:obj:`Metrics`, optional): A registry recording every request. See ``WikiClient``. Default is
+            ``None`` (no metrics).
+        retry (:obj:`RetryPolicy`, optional): When and how long to wait before sending a failed request again. See
+            ``WikiClient``. Default is ``None`` (no retries).
+        breaker (:obj:`CircuitBreaker`, optional): A per-host circuit breaker. See ``WikiClient``. Default is
+            ``None``.
+
+    Note:
+        This client requires ``aiohttp``, installed with ``pip install rswiki-wrapper[async]``.
+
+    Example:
+        Fetching time-series data for several items concurrently::
+
+            >>> async with AsyncWikiClient(concurrency=20) as client:
+            >>>     queries = [AsyncTimeSeries.fetch(id=i, timestep='5m', client=client) for i in ('2', '6', '453')]
+            >>>     results = await asyncio.gather(*queries)
+            >>> results[0].content[0].keys()
+            dict_keys(['timestamp', 'avgHighPrice', 'avgLowPrice', 'highPriceVolume', 'lowPriceVolume'])
+    """
+    blocking = False
+
+    def __init__(self, concurrency: int = 100, limit_per_host: int = 10, timeout=None,
+                 rate_limiter: RateLimiter = None, base_url: str = None, metrics: Metrics = None,
+                 retry: RetryPolicy = None, breaker: CircuitBreaker = None):
+        if aiohttp is None:
+            raise ImportError('AsyncWikiClient requires aiohttp. Install it with pip install rswiki-wrapper[async]')
+
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.base_url = base_url
+        self.metrics = metrics
+        self.retry = retry
+        self.breaker = breaker
+        # The aiohttp session and semaphore of each event loop the client is used from, since a session can only be
+        # used from the loop it was created on
+        self._sessions = {}
+        self._closing = []
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> tuple:
+        """
+        Return the ``aiohttp`` session and request semaphore of the running event loop, creating them on first use.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._close_finished(loop)
+            entry = self._sessions.get(loop)
+            if entry is None or entry[0].closed:
+                if isinstance(self.timeout, tuple):
+                    timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+                else:
+                    timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+                connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.limit_per_host)
+                entry = (aiohttp.ClientSession(connector=connector, timeout=timeout),
+                         asyncio.Semaphore(self.concurrency))
+                self._sessions[loop] = entry
+        return entry
+
+    def _close_finished(self, loop) -> None:
+        """
+        Close the sessions of event loops that have been closed, such as the loop of an earlier ``asyncio.run()``, so
+        that their connections are not leaked. Called with the lock held. The sessions of loops that are still open,
+        including loops running in other threads, are left to those loops.
+        """
+        for finished in [other for other in self._sessions if other is not loop and other.is_closed()]:
+            session, _ = self._sessions.pop(finished)
+            if not session.closed:
+                self._closing.append(loop.create_task(session.close()))
+
+    async def get(self, url: str, headers: dict = None, params: dict = None) -> Response:
+        """
+        Send a GET request without blocking the event loop.
+
+        Args:
+            url (str): The URL of the API endpoint to query.
+            headers (dict, optional): The headers to send with the request.
+            params (dict, optional): The query string parameters.
+
+        Returns:
+            :obj:`Response`: A ``requests`` response object holding the downloaded body, so that query classes can
+            parse it exactly as they do for the blocking client.
+        """
+        session, semaphore = self._get_session()
+        # aiohttp only accepts str, int and float params, and requests drops params that are None
+        params = {key: str(value) for key, value in (params or {}).items() if value is not None}
+
+        timings = {'queue': 0.0}
+        retries = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.check(url)
+
+            async with semaphore:
+                started = perf_counter()
+                if self.rate_limiter is not None:
+                    wait = self.rate_limiter.try_acquire(url)
+                    while wait > 0:
+                        await asyncio.sleep(wait)
+                        wait = self.rate_limiter.try_acquire(url)
+                timings['queue'] += perf_counter() - started
+
+                response = error = None
+                try:
+                    response = await self._send(session, rebase_url(url, self.base_url), headers, params, timings)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+
+            if self.breaker is not None:
+                self.breaker.record(url, self.breaker.is_failure(response))
+
+            wait = None
+            if self.retry is not None and retries < self.retry.retries and self.retry.should_retry(response):
+                wait = self.retry.delay(retries, response)
+            if wait is None:
+                if error is not None:
+                    raise error
+                break
+
+            # Back off outside the semaphore, so that other requests can use the slot meanwhile
+            timings['backoff'] = timings.get('backoff', 0.0) + wait
+            await asyncio.sleep(wait)
+            retries += 1
+
+        if self.metrics is not None:
+            self.metrics.observe(RequestEvent(*url_labels(url), response.status_code, body_size(response),
+                                              retries=retries, timings=timings))
+        return response
+
+    async def _send(self, session, url: str, headers: dict, params: dict, timings: dict = None) -> Response:
+        """
+        Perform the request and copy the ``aiohttp`` response into a ``requests`` response object, adding the
+        ``response`` and ``download`` phases to ``timings``.
+        """
+        timings = {} if timings is None else timings
+        sent = perf_counter()
+        async with session.get(url, headers=headers, params=params) as resp:
+            received = perf_counter()
+            response = Response()
+            response._content = await resp.read()
+            timings['response'] = received - sent
+            timings['download'] = perf_counter() - received
+            response.status_code = resp.status
+            response.reason = resp.reason
+            response.headers = CaseInsensitiveDict(resp.headers)
+            response.url = str(resp.url)
+            response.encoding = resp.charset or 'utf-8'
+        return response
+
+    async def execute(self, query):
+        """
+        Send the request of a query constructed with this client and build its ``.json`` and ``.content``.
+
+        Args:
+            query (:obj:`WikiQuery`): A query whose request has not been sent.
+
+        Returns:
+            :obj:`WikiQuery`: The same query, with its ``response`` attribute set.
+        """
+        if getattr(query, 'url', None) is not None:
+            if hasattr(query, '_param_chunks'):
+                # Queries split into several requests, such as an Exchange with a list of items
+                query.responses = list(await asyncio.gather(
+                    *(self.get(query.url, headers=query.headers, params=params) for params in query._param_chunks())))
+                query.response = query.responses[-1]
+            else:
+                query.response = await self.get(query.url, headers=query.headers, params=query.params)
+            query._parse()
+        return query
+
+    async def close(self):
+        """
+        Close the ``aiohttp`` session of the running event loop and all its pooled connections, along with the
+        sessions left by event loops that have been closed. A client used from several running event loops is closed
+        by calling ``close()`` from each of them.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._close_finished(loop)
+            entry = self._sessions.pop(loop, None)
+            closing = [task for task in self._closing if task.get_loop() is loop]
+            self._closing = [task for task in self._closing if task.get_loop() is not loop]
+        if entry is not None:
+            await entry[0].close()
+        await asyncio.gather(*closing)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+_default_async_client = None
+
+
+def get_default_async_client() -> AsyncWikiClient:
+    """
+    Return the module-level ``AsyncWikiClient`` used by async queries that are not given a client, creating it on
+    first use.
+
+    Returns:
+        :obj:`AsyncWikiClient`: The shared default async client.
+    """
+    global _default_async_client
+    if _default_async_client is None:
+        _default_async_client = AsyncWikiClient()
+    return _default_async_client
+
+
+class AsyncQuery(object):
+    """
+    A mixin that turns a query class into its awaitable equivalent. The query is built without sending a request, and
+    ``fetch()`` sends it through an ``AsyncWikiClient``. The returned object is an instance of the original query
+    class, with the same ``.response``, ``.json`` and ``.content`` attributes.
+    """
+
+    def __init__(self, *args, client: AsyncWikiClient = None, **kwargs):
+        if client is None:
+            client = get_default_async_client()
+        super().__init__(*args, client=client, **kwargs)
+
+    @classmethod
+    async def fetch(cls, *args, client: AsyncWikiClient = None, **kwargs):
+        """
+        Construct the query and await its response.
+
+        Args:
+            ``*args``: The positional arguments of the original query class.
+            client (:obj:`AsyncWikiClient`, optional): The client to send the request with. Default is the shared
+                client returned by ``get_default_async_client()``.
+            ``**kwargs``: The keyword arguments of the original query class.
+
+        Returns:
+            The completed query.
+        """
+        if client is None:
+            client = get_default_async_client()
+        query = cls(*args, client=client, **kwargs)
+        return await client.execute(query)
+
+
+class AsyncLatest(AsyncQuery, Latest):
+    """
+    The awaitable equivalent of ``Latest``. For example ``await AsyncLatest.fetch(user_agent=...)``.
+    """
+    pass
+
+
+class AsyncMapping(AsyncQuery, Mapping):
+    """
+    The awaitable equivalent of ``Mapping``. For example ``await AsyncMapping.fetch(user_agent=...)``.
+    """
+    pass
+
+
+class AsyncAvgPrice(AsyncQuery, AvgPrice):
+    """
+    The awaitable equivalent of ``AvgPrice``. For example ``await AsyncAvgPrice.fetch('5m', user_agent=...)``.
+    """
+    pass
+
+
+class AsyncTimeSeries(AsyncQuery, TimeSeries):
+    """
+    The awaitable equivalent of ``TimeSeries``. For example
+    ``await AsyncTimeSeries.fetch(id='2', timestep='5m', user_agent=...)``.
+    """
+    pass
+
+
+class AsyncExchange(AsyncQuery, Exchange):
+    """
+    The awaitable equivalent of ``Exchange``. For example
+    ``await AsyncExchange.fetch('osrs', 'latest', id=['2', '6'], user_agent=...)``. A list of items is split into
+    requests that are gathered concurrently.
+    """
+    pass
+
+
+class AsyncRunescape(AsyncQuery, Runescape):
+    """
+    The awaitable equivalent of ``Runescape``. For example ``await AsyncRunescape.fetch('vos', user_agent=...)``.
+    """
+    pass
+
+
+class AsyncMediaWiki(AsyncQuery, MediaWiki):
+    """
+    The awaitable equivalent of ``MediaWiki``. The helper methods have the same arguments and results as their
+    ``MediaWiki`` counterparts, but must be awaited.
+
+    Example:
+        Example of getting Production JSON information for Cake::
+
+            >>> query = AsyncMediaWiki('osrs', user_agent='My Project - me@example.com')
+            >>> await query.ask_production('Cake')
+            >>> query.content['Cake'][0]['skills']
+            [{'experience': '180', 'level': '40', 'name': 'Cooking', 'boostable': 'Yes'}]
+    """
+
+    async def update(self, url, **kwargs):
+        """
+        Refresh the query with a new URL and additional parameters. Updates the ``self.response`` attribute.
+        """
+        self.url = url
+        self.params = kwargs
+        self.response = await self.client.get(url, headers=self.headers, params=kwargs)
+
+    async def ask(self, result_format: str = 'json', conditions: list[str] = None, printouts: list[str] = None,
+                  offset: str = None, **kwargs):
+        """
+        Send an ASK query. See ``MediaWiki.ask()``.
+        """
+        await self.update(self.base_url, **self._ask_params(result_format, conditions, printouts, offset, **kwargs))
+        self.json = self._decode()
+
+    async def get_ask_content(self, conditions: list[str], printouts: list[str], get_all: bool = False) -> None:
+        """
+        Retrieve content from an ASK query. See ``MediaWiki.get_ask_content()``.
+        """
+        self._add_ask_results(printouts)
+
+        offset = self.json.get('query-continue-offset')
+        if get_all and offset is not None:
+            # Sleep 1s to limit hits to API
+            await self._pause(1)
+            async for page in self.iter_ask(conditions, printouts, offset=offset):
+                self.content.update(page)
+
+    async def iter_ask(self, conditions: list[str], printouts: list[str], offset: str = None, delay: float = 1):
+        """
+        Page through the results of an ASK query with ``async for``. See ``MediaWiki.iter_ask()``.
+        """
+        while True:
+            await self.ask(conditions=conditions, printouts=printouts, offset=offset)
+            yield self._parse_ask_results(self.json, printouts)
+
+            offset = self.json.get('query-continue-offset')
+            if offset is None:
+                return
+            await self._pause(delay)
+
+    async def _pause(self, seconds: float) -> None:
+        """
+        Wait between ASK pages, unless the client has a ``rate_limiter``. See ``MediaWiki._pause()``.
+        """
+        if self.client.rate_limiter is None:
+            await asyncio.sleep(seconds)
+
+    async def ask_production(self, item: str = None, get_all: bool = False):
+        """
+        Retrieve production data for an item or category. See ``MediaWiki.ask_production()``.
+        """
+        conditions, printouts = self._production_query(item)
+        self.content = {}
+
+        await self.ask(conditions=conditions, printouts=printouts)
+        await self.get_ask_content(conditions, printouts, get_all)
+
+    async def ask_exchange(self, item: str = None, get_all: bool = False):
+        """
+        Retrieve exchange data for an item. See ``MediaWiki.ask_exchange()``.
+        """
+        conditions, printouts = self._exchange_query(item)
+        self.content = {}
+
+        await self.ask(conditions=conditions, printouts=printouts)
+        await self.get_ask_content(conditions, printouts, get_all)
+
+    async def browse(self, result_format: str = 'json', format_version: str = 'latest', **kwargs) -> None:
+        """
+        Send an SMWbrowse query. See ``MediaWiki.browse()``.
+        """
+        await self.update(self.base_url, **self._browse_params(result_format, format_version, **kwargs))
+        self.json = self._decode()
+
+    async def browse_properties(self, item: str):
+        """
+        Retrieve property values for a given subject. See ``MediaWiki.browse_properties()``.
+        """
+        await self.browse(browse='subject', params=self._browse_subject(item))
+        self._parse_properties()
+
+    async def browse_properties_many(self, items: list[str], clean: bool = False) -> dict:
+        """
+        Retrieve the property values of many subjects concurrently. See ``MediaWiki.browse_properties_many()``. The
+        requests are bounded by the concurrency and rate limiter of the client.
+        """
+        async def fetch(item):
+            params = self._browse_params(browse='subject', params=self._browse_subject(item))
+            properties = self._properties_from_json(self._decode(await self.client.get(self.base_url,
+                                                                                       headers=self.headers,
+                                                                                       params=params)))
+            return self._rename_properties(properties, PROPERTY_NAMES) if clean else properties
+
+        self.content = dict(zip(items, await asyncio.gather(*(fetch(item) for item in items))))
+        return self.content
@@ -0,0 +1,186 @@
+# rswiki_wrapper/batch.py
+# Contains the loaders that batch single-item lookups into one upstream request
+
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+
+from .osrs import Latest
+from .wiki import Exchange
+
+
+class BatchLoader(ABC):
+    """
+    Collects single-item lookups made within a short ``window`` and answers them all from one upstream request, in the
+    style of a DataLoader. Each lookup returns a ``Future`` that is resolved when its batch completes; lookups of the
+    same item in one window share a future. A batch is sent when the window closes or when it reaches ``max_batch``
+    items, whichever comes first.
+
+    Child classes implement ``_fetch()`` to request a batch of items; ``BatchLoader`` itself cannot be constructed.
+
+    Args:
+        window (float, optional): The seconds to wait for more lookups after the first lookup of a batch. Default is
+            ``0.005``.
+        max_batch (int, optional): The largest number of items in one batch. Default is ``100``.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 100):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def load(self, item) -> Future:
+        """
+        Queue a lookup of one item.
+
+        Args:
+            item (str or int): The item to look up.
+
+        Returns:
+            :obj:`Future`: Resolved with the result of the item, or with a ``KeyError`` if the upstream response does
+            not contain it.
+        """
+        item = str(item)
+        batch = None
+        with self._lock:
+            future = self._pending.get(item)
+            if future is None:
+                future = self._pending[item] = Future()
+                if len(self._pending) >= self.max_batch:
+                    batch = self._take()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self.window, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+        if batch is not None:
+            # Send the full batch from its own thread, as the window timer does, so that the caller is not blocked
+            threading.Thread(target=self._run, args=(batch,), daemon=True).start()
+        return future
+
+    def get(self, item, timeout: float = None):
+        """
+        Look up one item, blocking until its batch completes.
+
+        Args:
+            item (str or int): The item to look up.
+            timeout (float, optional): The seconds to wait for the result. Default is ``None`` (no limit).
+
+        Returns:
+            The result of the item.
+        """
+        return self.load(item).result(timeout)
+
+    def flush(self) -> None:
+        """
+        Send the pending batch now instead of waiting for the window to close.
+        """
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._run(batch)
+
+    def _take(self) -> dict:
+        # Called with the lock held
+        batch = self._pending
+        self._pending = {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _run(self, batch: dict) -> None:
+        try:
+            results = self._fetch(list(batch))
+        except Exception as exc:
+            for future in batch.values():
+                future.set_exception(exc)
+            return
+
+        for item, future in batch.items():
+            if item in results:
+                future.set_result(results[item])
+            else:
+                future.set_exception(KeyError(item))
+
+    @abstractmethod
+    def _fetch(self, items: list) -> dict:
+        """
+        Request a batch of items.
+
+        Args:
+            items (list): The items of the batch, as strings.
+
+        Returns:
+            dict: The result of each item found, keyed by item.
+        """
+
+
+class ExchangeLoader(BatchLoader):
+    """
+    Batches single-item lookups of the Weird Gloop ``'latest'`` exchange endpoint into pipe-joined ``Exchange``
+    queries.
+
+    Args:
+        game (str): The game to query. Valid options are ``'rs'``, ``'rs-fsw-2022'``, ``'osrs'``, ``'osrs-fsw-2022'``.
+        user_agent (str): The user agent string to use in the queries. Default is
+            ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the requests with.
+        key (str, optional): Whether items are looked up by ``'id'`` or ``'name'``. Default is ``'id'``.
+        window (float, optional): The seconds to collect lookups for. Default is ``0.005``.
+        max_batch (int, optional): The largest number of items in one batch. Default is ``100``.
+
+    Example:
+        Looking up prices from many request handlers::
+
+            >>> loader = ExchangeLoader('rs', user_agent='My Project - me@example.com')
+            >>> loader.get('2')
+            {'id': '2', 'timestamp': '2023-01-02T12:00:00.000Z', 'price': 302, 'volume': 52100}
+    """
+
+    def __init__(self, game: str, user_agent: str = 'RS Wiki API Python Wrapper - Default', client=None,
+                 key: str = 'id', window: float = 0.005, max_batch: int = 100):
+        super().__init__(window=window, max_batch=max_batch)
+        self.game = game
+        self.user_agent = user_agent
+        self.client = client
+        self.key = key
+
+    def _fetch(self, items: list) -> dict:
+        query = Exchange(self.game, 'latest', user_agent=self.user_agent, client=self.client, **{self.key: items})
+        return {item: records[0] for item, records in query.content.items()}
+
+
+class LatestLoader(BatchLoader):
+    """
+    Batches single-item lookups of the real-time ``'latest'`` route into one full ``Latest`` query, which returns
+    every item in a single request.
+
+    Args:
+        game (str, optional): The game mode to query. Can be one of ``'osrs'``, ``'dmm'``, or ``'fsw'``. Default
+            ``'osrs'``.
+        user_agent (str): The user agent string to use in the queries. Default is
+            ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the requests with.
+        window (float, optional): The seconds to collect lookups for. Default is ``0.005``.
+        max_batch (int, optional): The largest number of items in one batch. Default is ``100``.
+
+    Example:
+        Looking up the latest price of an item by ID::
+
+            >>> loader = LatestLoader(user_agent='My Project - me@example.com')
+            >>> loader.get(2)
+            {'high': 152, 'highTime': 1672437534, 'low': 154, 'lowTime': 1672437701}
+    """
+
+    def __init__(self, game: str = 'osrs', user_agent: str = 'RS Wiki API Python Wrapper - Default', client=None,
+                 window: float = 0.005, max_batch: int = 100):
+        super().__init__(window=window, max_batch=max_batch)
+        self.game = game
+        self.user_agent = user_agent
+        self.client = client
+
+    def _fetch(self, items: list) -> dict:
+        return Latest(game=self.game, user_agent=self.user_agent, client=self.client).content
@@ -0,0 +1,272 @@
+# rswiki_wrapper/cache.py
+# Contains the HTTP response caches used by WikiClient
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from time import time
+
+from requests import Request, Response
+from requests.structures import CaseInsensitiveDict
+
+
+def canonical_url(url: str, params: dict = None) -> str:
+    """
+    Build the full request URL with the query string parameters sorted by name, so that equivalent queries produce
+    the same cache key regardless of the order their kwargs were given in.
+
+    Args:
+        url (str): The URL of the API endpoint.
+        params (dict, optional): The query string parameters.
+
+    Returns:
+        str: The canonical URL.
+    """
+    params = sorted((key, value) for key, value in (params or {}).items() if value is not None)
+    return Request('GET', url, params=params).prepare().url
+
+
+class DiskCache(object):
+    """
+    A persistent HTTP cache for slow-changing endpoints such as ``Mapping``. Each response of such an endpoint that
+    carries an ``ETag`` or ``Last-Modified`` validator is stored on disk with its headers. The next request for the
+    same URL sends ``If-None-Match``/``If-Modified-Since``, and if the server answers ``304 Not Modified`` the stored
+    body is used to rebuild the response, so ``.json`` and ``.content`` are created without downloading the payload
+    again. Frequently polled routes, such as ``Latest``, ``AvgPrice`` and ``TimeSeries``, are never written to disk.
+
+    The cache is opt-in; pass it to a ``WikiClient`` to enable it for the slow-changing queries sent through that
+    client. Entries are written atomically, so one directory can be shared by several worker processes.
+
+    Args:
+        directory (str): The directory to store cached responses in. Created if it does not exist.
+
+    Example:
+        Caching the item mapping between runs::
+
+            >>> client = WikiClient(cache=DiskCache('~/.cache/rswiki'))
+            >>> mapping = Mapping(user_agent='My Project - me@example.com', client=client)
+            >>> mapping.response.from_cache
+            True
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + suffix)
+
+    def validators(self, key: str) -> dict:
+        """
+        Return the conditional request headers for a cached URL.
+
+        Args:
+            key (str): The canonical URL of the request.
+
+        Returns:
+            dict: The ``If-None-Match`` and/or ``If-Modified-Since`` headers, or an empty dict if nothing is cached.
+        """
+        meta = self._load_meta(key)
+        if meta is None:
+            return {}
+
+        headers = {}
+        if meta['headers'].get('ETag'):
+            headers['If-None-Match'] = meta['headers']['ETag']
+        if meta['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+        return headers
+
+    def load(self, key: str) -> Response:
+        """
+        Rebuild a cached response.
+
+        Args:
+            key (str): The canonical URL of the request.
+
+        Returns:
+            :obj:`Response`: The stored response with ``from_cache`` set to ``True``, or ``None`` on a cache miss.
+        """
+        meta = self._load_meta(key)
+        if meta is None:
+            return None
+        try:
+            with open(self._path(key, '.body'), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        response = Response()
+        response._content = body
+        response.status_code = meta['status_code']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.url = meta['url']
+        response.encoding = meta['encoding']
+        response.from_cache = True
+        return response
+
+    def store(self, key: str, response: Response) -> bool:
+        """
+        Store a successful response if it carries a validator.
+
+        Args:
+            key (str): The canonical URL of the request.
+            response (:obj:`Response`): The response to store.
+
+        Returns:
+            bool: Whether the response was stored.
+        """
+        if response.status_code != 200:
+            return False
+        if 'ETag' not in response.headers and 'Last-Modified' not in response.headers:
+            return False
+
+        meta = {
+            'url': response.url,
+            'status_code': response.status_code,
+            'encoding': response.encoding,
+            'headers': dict(response.headers),
+        }
+        # Write the body before the metadata so a reader never sees validators without their body
+        self._write(self._path(key, '.body'), response.content)
+        self._write(self._path(key, '.json'), json.dumps(meta).encode('utf-8'))
+        return True
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a cached response, if there is one.
+
+        Args:
+            key (str): The canonical URL of the request.
+        """
+        # Remove the metadata before the body so a reader never sees validators without their body
+        for suffix in ('.json', '.body'):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Remove every cached response.
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith('.body') or name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+    def _load_meta(self, key: str):
+        try:
+            with open(self._path(key, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class MemoryCache(object):
+    """
+    An in-process LRU cache of responses with a per-entry expiry time. Only queries that define an expiry policy are
+    cached: ``AvgPrice`` entries expire when the next ``'5m'`` or ``'1h'`` bucket closes (and historical buckets
+    requested with ``timestamp`` never expire), while ``Latest`` entries expire after the configurable ``ttl``.
+
+    The cache is thread-safe, keyed on the canonical URL with sorted params, and counts hits and misses so it can be
+    sized from real traffic.
+
+    Args:
+        maxsize (int, optional): The maximum number of responses to keep. The least recently used entry is evicted
+            first. Default is ``128``.
+        ttl (float, optional): The lifetime in seconds of ``Latest`` responses. Default is ``10``.
+
+    Attributes:
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not cached or had expired.
+
+    Example:
+        Sharing average prices between callers::
+
+            >>> client = WikiClient(memory_cache=MemoryCache(maxsize=64, ttl=5))
+            >>> first = AvgPrice('5m', user_agent='My Project - me@example.com', client=client)
+            >>> second = AvgPrice('5m', user_agent='My Project - me@example.com', client=client)
+            >>> client.memory_cache.info()
+            {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 64}
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 10):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float = None) -> Response:
+        """
+        Look up a response.
+
+        Args:
+            key (str): The canonical URL of the request.
+            now (float, optional): The current UNIX time. Default is ``time.time()``.
+
+        Returns:
+            :obj:`Response`: The cached response, or ``None`` if it is missing or expired.
+        """
+        now = time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, response: Response, expires: float) -> None:
+        """
+        Store a response until an absolute expiry time.
+
+        Args:
+            key (str): The canonical URL of the request.
+            response (:obj:`Response`): The response to store.
+            expires (float): The UNIX time the entry expires at. ``None`` stores nothing.
+        """
+        if expires is None:
+            return
+        with self._lock:
+            self._entries[key] = (expires, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove every entry and reset the hit and miss counts.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        """
+        Report the cache statistics.
+
+        Returns:
+            dict: The ``hits``, ``misses``, current ``size`` and ``maxsize`` of the cache.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
@@ -0,0 +1,375 @@
+# rswiki_wrapper/client.py
+# Contains the shared HTTP client used by all RS Wiki API queries
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter, sleep, time
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import DiskCache, MemoryCache, canonical_url
+from .metrics import Metrics, RequestEvent, body_size, url_labels
+from .ratelimit import RateLimiter, TokenBucket
+from .retry import CircuitBreaker, RetryPolicy
+
+
+class WikiClient(object):
+    """
+    A pooled, keep-alive HTTP client shared by every ``WikiQuery``. Each client owns a ``requests.Session`` whose
+    connections are pooled per host (``prices.runescape.wiki``, ``api.weirdgloop.org``, and the two ``api.php``
+    hosts), so repeated queries reuse an open TCP+TLS connection instead of performing a new handshake.
+
+    If no client is passed to a query class, a module-level default client is used. See ``get_default_client()``.
+
+    Args:
+        pool_connections (int, optional): The number of per-host connection pools to keep. Default is ``4``, one for
+            each API host used by the wrapper.
+        pool_maxsize (int, optional): The maximum number of keep-alive connections kept open to each host. Raise this
+            if the client is shared between many threads. Default is ``10``.
+        timeout (float or tuple, optional): The timeout passed to ``requests``, either a single value in seconds or a
+            ``(connect, read)`` tuple. Default is ``None`` (wait forever).
+        cache (:obj:`DiskCache`, optional): A persistent cache for conditional requests to slow-changing endpoints,
+            such as ``Mapping``. Default is ``None`` (no caching).
+        memory_cache (:obj:`MemoryCache`, optional): An in-process cache for queries with an expiry policy, such as
+            ``AvgPrice`` and ``Latest``. Default is ``None`` (no caching).
+        rate_limiter (:obj:`RateLimiter`, optional): A per-host rate limiter that every request sent over the network
+            waits on. Default is ``None`` (no limit).
+        base_url (str, optional): A server to send every request to instead of the real API hosts, such as a
+            ``StandInServer``. The path and query string of each request are kept. Default is ``None``.
+        metrics (:obj:`Metrics`, optional): A registry recording the host, route, status, size, cache result and
+            phase timings of every request. Default is ``None`` (no metrics).
+        retry (:obj:`RetryPolicy`, optional): When and how long to wait before sending a request again after a
+            connection error, a timeout, a ``429`` or a ``5xx``. Default is ``None`` (no retries).
+        breaker (:obj:`CircuitBreaker`, optional): A per-host circuit breaker that fails requests fast while their
+            host is unhealthy. Default is ``None``.
+
+    Attributes:
+        session (:obj:`Session`): The ``requests`` session holding the connection pools.
+        timeout (float or tuple): The timeout used for every request.
+        cache (:obj:`DiskCache`): The conditional request cache, if any.
+        memory_cache (:obj:`MemoryCache`): The in-process response cache, if any.
+        rate_limiter (:obj:`RateLimiter`): The per-host rate limiter, if any.
+        base_url (str): The server requests are redirected to, if any.
+        metrics (:obj:`Metrics`): The metrics registry, if any.
+        retry (:obj:`RetryPolicy`): The retry policy, if any.
+        breaker (:obj:`CircuitBreaker`): The circuit breaker, if any.
+        blocking (bool): Queries constructed with a blocking client send their request inside the constructor.
+
+    Example:
+        Sharing one client between several queries::
+
+            >>> client = WikiClient(pool_maxsize=20, timeout=(3.05, 10))
+            >>> latest = Latest(user_agent='My Project - me@example.com', client=client)
+            >>> mapping = Mapping(user_agent='My Project - me@example.com', client=client)
+    """
+    blocking = True
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 10, timeout=None, cache: DiskCache = None,
+                 memory_cache: MemoryCache = None, rate_limiter: RateLimiter = None, base_url: str = None,
+                 metrics: Metrics = None, retry: RetryPolicy = None, breaker: CircuitBreaker = None):
+        self.timeout = timeout
+        self.base_url = base_url
+        self.metrics = metrics
+        self.retry = retry
+        self.breaker = breaker
+        self.cache = cache
+        self.memory_cache = memory_cache
+        self.rate_limiter = rate_limiter
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url: str, headers: dict = None, params: dict = None, expiry=None, revalidate: bool = False,
+            hedge: float = None) -> requests.Response:
+        """
+        Send a GET request through the pooled session.
+
+        Args:
+            url (str): The URL of the API endpoint to query.
+            headers (dict, optional): The headers to send with the request.
+            params (dict, optional): The query string parameters.
+            expiry (callable, optional): The expiry policy of the query, called as ``expiry(now, ttl)`` and returning
+                the UNIX time the response expires at. Only responses with a policy are kept in the memory cache.
+            revalidate (bool, optional): Whether to keep the response in the disk cache and revalidate it with a
+                conditional request next time. Only slow-changing endpoints are worth writing to disk. Default is
+                ``False``.
+            hedge (float, optional): Send the request a second time if no answer has arrived after this many seconds,
+                and use whichever answer comes first. Default is ``None`` (no hedging).
+
+        Returns:
+            :obj:`Response`: The response object provided by the ``requests`` library. If the client has a cache and
+            the server answers ``304 Not Modified``, the cached response is returned instead.
+        """
+        use_disk = self.cache is not None and revalidate
+        use_memory = self.memory_cache is not None and expiry is not None
+        if not use_disk and not use_memory:
+            return self._send(url, headers, params, hedge=hedge)
+
+        key = canonical_url(url, params)
+        if use_memory:
+            response = self.memory_cache.get(key)
+            if response is not None:
+                if self.metrics is not None:
+                    self.metrics.observe(RequestEvent(*url_labels(url), response.status_code, cache='hit'))
+                return response
+
+        response = self._conditional_get(key, url, headers, params, use_disk, use_memory, hedge)
+
+        if use_memory and response.status_code == 200:
+            self.memory_cache.set(key, response, expiry(time(), self.memory_cache.ttl))
+        return response
+
+    def _conditional_get(self, key: str, url: str, headers: dict, params: dict, use_disk: bool = False,
+                         use_memory: bool = False, hedge: float = None) -> requests.Response:
+        """
+        Send a GET request, revalidating against the disk cache if ``use_disk`` is set.
+        """
+        if not use_disk:
+            return self._send(url, headers, params, cached=use_memory, hedge=hedge)
+
+        validators = self.cache.validators(key)
+        response = self._send(url, dict(headers or {}, **validators), params, cached=True, hedge=hedge)
+
+        if response.status_code == 304:
+            cached = self.cache.load(key)
+            if cached is not None:
+                cached.request = response.request
+                return cached
+            # The stored body is missing or unreadable, so the 304 has nothing to revalidate. Drop the entry and ask
+            # again without validators to download the body.
+            response.close()
+            self.cache.delete(key)
+            response = self._send(url, headers, params, cached=True, hedge=hedge)
+        self.cache.store(key, response)
+        return response
+
+    def stream(self, url: str, headers: dict = None, params: dict = None) -> requests.Response:
+        """
+        Send a GET request and return as soon as the headers arrive, leaving the body to be read incrementally with
+        ``Response.iter_content()``. Streamed requests bypass the caches, since their body is never held in memory.
+
+        Args:
+            url (str): The URL of the API endpoint to query.
+            headers (dict, optional): The headers to send with the request.
+            params (dict, optional): The query string parameters.
+
+        Returns:
+            :obj:`Response`: The open response. Close it, or use it as a context manager, to release the connection.
+        """
+        return self._send(url, headers, params, stream=True)
+
+    def _send(self, url: str, headers: dict, params: dict, stream: bool = False, cached: bool = False,
+              hedge: float = None) -> requests.Response:
+        """
+        Send a GET request over the network, retrying and hedging as configured. ``cached`` tells the metrics
+        registry that a cache was checked before sending.
+        """
+        if hedge is None:
+            response, retries, timings = self._attempt(url, headers, params, stream)
+        else:
+            response, retries, timings = self._hedged(url, headers, params, hedge)
+
+        if self.metrics is not None:
+            cache = None if not cached else 'revalidated' if response.status_code == 304 else 'miss'
+            self.metrics.observe(RequestEvent(*url_labels(url), response.status_code, body_size(response), cache,
+                                              retries, timings))
+        return response
+
+    def _attempt(self, url: str, headers: dict, params: dict, stream: bool = False) -> tuple:
+        """
+        Send a request until it succeeds or the retry policy gives up, waiting on the circuit breaker and rate
+        limiter before each attempt.
+
+        Returns:
+            tuple: ``(response, retries, timings)``. Connection errors and timeouts are raised once the retries are
+            used up; failed responses are returned.
+        """
+        timings = {'queue': 0.0}
+        retries = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.check(url)
+
+            started = perf_counter()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            sent = perf_counter()
+            timings['queue'] += sent - started
+
+            response = error = None
+            try:
+                response = self.session.get(rebase_url(url, self.base_url), headers=headers, params=params,
+                                            timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if self.breaker is not None:
+                self.breaker.record(url, self.breaker.is_failure(response))
+
+            wait = None
+            if self.retry is not None and retries < self.retry.retries and self.retry.should_retry(response):
+                wait = self.retry.delay(retries, response)
+            if wait is None:
+                if error is not None:
+                    raise error
+                # requests times the exchange up to the parsed headers; the rest of the call read the body
+                timings['response'] = response.elapsed.total_seconds()
+                if not stream:
+                    timings['download'] = max(0.0, perf_counter() - sent - timings['response'])
+                return response, retries, timings
+
+            if response is not None:
+                response.close()
+            timings['backoff'] = timings.get('backoff', 0.0) + wait
+            sleep(wait)
+            retries += 1
+
+    def _hedged(self, url: str, headers: dict, params: dict, delay: float) -> tuple:
+        """
+        Send a request, and send it again if no answer has arrived after ``delay`` seconds. The first successful
+        attempt wins; the other is left to finish in the background and its response is closed.
+        """
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            first = executor.submit(self._attempt, url, headers, params)
+            done, _ = wait({first}, timeout=delay)
+            if done:
+                return first.result()
+
+            pending = {first, executor.submit(self._attempt, url, headers, params)}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        for loser in (done | pending) - {future}:
+                            loser.add_done_callback(_close_attempt)
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            executor.shutdown(wait=False)
+
+    def map_limited(self, fn, args, workers: int = 4, rate: float = 1, ordered: bool = True):
+        """
+        Call ``fn`` on each of ``args`` from a pool of threads, with at most ``workers`` calls in flight and at most
+        ``rate`` calls started per second. The helpers that send many requests at once, such as
+        ``TimeSeries.bulk()`` and ``MediaWiki.browse_properties_many()``, are built on this method.
+
+        Args:
+            fn (callable): The function to call with each argument.
+            args (iterable): The arguments. They are read lazily, so the iterable may be endless; stop iterating over
+                the results to stop calling ``fn``.
+            workers (int, optional): The number of calls in flight at once. Default is ``4``.
+            rate (float, optional): The budget of calls per second shared by all workers. Default is ``1``. Ignored if
+                the client has a ``rate_limiter``, which then paces the requests.
+            ordered (bool, optional): Whether to yield results in the order of ``args`` rather than in completion
+                order. Default is ``True``.
+
+        Yields:
+            tuple: ``(arg, future)``, where ``future.result()`` returns the result of the call or raises its error.
+        """
+        bucket = TokenBucket(rate) if self.rate_limiter is None else None
+
+        def call(arg):
+            if bucket is not None:
+                bucket.acquire()
+            return fn(arg)
+
+        args = iter(args)
+        pending = {}
+        pool = ThreadPoolExecutor(max_workers=max(1, workers))
+
+        def submit() -> None:
+            for arg in args:
+                pending[pool.submit(call, arg)] = arg
+                return
+
+        try:
+            for _ in range(max(1, workers)):
+                submit()
+            while pending:
+                if ordered:
+                    done = [next(iter(pending))]
+                    wait(done)
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    arg = pending.pop(future)
+                    submit()
+                    yield arg, future
+        finally:
+            # Calls not yet started are dropped if the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        """
+        Close all pooled connections held by the client.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _close_attempt(future) -> None:
+    """
+    Release the connection of a hedged attempt that lost the race.
+    """
+    if not future.cancelled() and future.exception() is None:
+        future.result()[0].close()
+
+
+def rebase_url(url: str, base_url: str = None) -> str:
+    """
+    Point a request URL at another server, keeping its path and query string. Caches and rate limiters still key on
+    the original URL, so a stand-in server behaves like the API host it replaces.
+
+    Args:
+        url (str): The URL of the API endpoint.
+        base_url (str, optional): The scheme and host to send the request to, such as ``'http://127.0.0.1:8080'``.
+            A path in ``base_url`` is prepended to the path of ``url``. Default is ``None`` (no change).
+
+    Returns:
+        str: The rebased URL.
+    """
+    if base_url is None:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, base.path.rstrip('/') + parts.path, parts.query, parts.fragment))
+
+
+_default_client = None
+
+
+def get_default_client() -> WikiClient:
+    """
+    Return the module-level ``WikiClient`` used by queries that are not given a client, creating it on first use.
+
+    Returns:
+        :obj:`WikiClient`: The shared default client.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = WikiClient()
+    return _default_client
+
+
+def set_default_client(client: WikiClient) -> None:
+    """
+    Replace the module-level default client, for example to change the pool size or timeout for every query.
+
+    Args:
+        client (:obj:`WikiClient`): The client to use for queries that are not given a client.
+    """
+    global _default_client
+    _default_client = client
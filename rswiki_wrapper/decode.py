@@ -0,0 +1,29 @@
+# rswiki_wrapper/decode.py
+# Contains the JSON decoder used to parse API responses
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def decode_json(content: bytes):
+    """
+    Decode a JSON response body directly from its raw bytes. The RS Wiki APIs always answer in UTF-8, so the charset
+    detection done by ``Response.json()`` is skipped. ``orjson`` is used when it is installed, and the standard
+    library ``json`` module otherwise; both return the same ``dict`` and ``list`` objects.
+
+    Args:
+        content (bytes): The raw response body.
+
+    Returns:
+        The decoded JSON document.
+
+    Raises:
+        ValueError: If the body is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
@@ -0,0 +1,118 @@
+# rswiki_wrapper/feed.py
+# Contains the change feed built on Latest
+
+from time import monotonic, sleep
+
+from .osrs import Latest
+
+
+class LatestDelta(object):
+    """
+    The changes to the ``Latest`` prices between two polls.
+
+    Attributes:
+        added (dict): The items that were not in the previous snapshot, in the ``Latest.content`` format.
+        changed (dict): The items whose ``high``, ``low``, ``highTime`` or ``lowTime`` changed, in the
+            ``Latest.content`` format.
+        removed (list): The IDs of the items that are no longer in the snapshot.
+    """
+    __slots__ = ('added', 'changed', 'removed')
+
+    def __init__(self, added: dict, changed: dict, removed: list):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f'LatestDelta(added={len(self.added)}, changed={len(self.changed)}, removed={len(self.removed)})'
+
+
+class LatestFeed(object):
+    """
+    A poller for the ``'latest'`` route that keeps the previous snapshot and reports only what changed. The market is
+    diffed once per poll, so each consumer does work proportional to the number of changes instead of the number of
+    items.
+
+    Args:
+        game (str, optional): The specific game mode to query. Can be one of ``'osrs'``, ``'dmm'``, or ``'fsw'``.
+            Default ``'osrs'``.
+        user_agent (str): The user agent string to use in the queries. Default is
+            ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the requests with.
+        interval (float, optional): The seconds between polls when iterating. Default is ``60``.
+
+    Attributes:
+        snapshot (dict): The ``Latest.content`` of the most recent poll, or an empty dict before the first poll.
+
+    Example:
+        Printing each price movement::
+
+            >>> feed = LatestFeed(user_agent='My Project - me@example.com', interval=60)
+            >>> for delta in feed:
+            >>>     for item_id, prices in delta.changed.items():
+            >>>         print(item_id, prices['high'], prices['low'])
+    """
+
+    def __init__(self, game: str = 'osrs', user_agent: str = 'RS Wiki API Python Wrapper - Default', client=None,
+                 interval: float = 60):
+        self.game = game
+        self.user_agent = user_agent
+        self.client = client
+        self.interval = interval
+        self.snapshot = {}
+
+    def poll(self) -> LatestDelta:
+        """
+        Query ``Latest`` once and compare it to the previous snapshot. On the first poll every item is added.
+
+        Returns:
+            :obj:`LatestDelta`: The items added, changed and removed since the previous poll.
+        """
+        content = Latest(game=self.game, user_agent=self.user_agent, client=self.client).content
+        delta = self.diff(self.snapshot, content)
+        self.snapshot = content
+        return delta
+
+    @staticmethod
+    def diff(previous: dict, current: dict) -> LatestDelta:
+        """
+        Compare two ``Latest.content`` snapshots.
+
+        Args:
+            previous (dict): The older snapshot.
+            current (dict): The newer snapshot.
+
+        Returns:
+            :obj:`LatestDelta`: The items added, changed and removed between the snapshots.
+        """
+        added = {}
+        changed = {}
+        for item_id, prices in current.items():
+            old = previous.get(item_id)
+            if old is None:
+                added[item_id] = prices
+            elif old != prices:
+                changed[item_id] = prices
+
+        # Every item of the previous snapshot is still present unless it held more items than were carried over
+        removed = []
+        if len(previous) > len(current) - len(added):
+            removed = [item_id for item_id in previous if item_id not in current]
+        return LatestDelta(added, changed, removed)
+
+    def __iter__(self):
+        """
+        Poll forever, yielding a delta every ``interval`` seconds. Polls with no changes are skipped.
+        """
+        while True:
+            started = monotonic()
+            delta = self.poll()
+            if delta:
+                yield delta
+            sleep(max(0.0, self.interval - (monotonic() - started)))
@@ -0,0 +1,89 @@
+# rswiki_wrapper/index.py
+# Contains the item lookup index built from Mapping content
+
+from array import array
+from bisect import bisect_left
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize an item name for lookups, ignoring case and repeated whitespace.
+
+    Args:
+        name (str): The item name.
+
+    Returns:
+        str: The normalized name, for example ``'dragon bones'`` for ``' Dragon  Bones'``.
+    """
+    return ' '.join(name.casefold().split())
+
+
+class ItemIndex(object):
+    """
+    Lookup indexes over the item mapping: item ID to item, normalized name to item ID, and a prefix index for
+    autocomplete. The prefix index is a sorted list of normalized names searched with ``bisect``, which gives
+    ``O(log n)`` prefix lookups while storing each name only once, with the matching item IDs packed in an ``array``.
+
+    Indexes are normally built by ``Mapping`` the first time a lookup is made after a fetch.
+
+    Args:
+        items (list): The item mapping content, a list of dicts with at least ``'id'`` and ``'name'`` keys.
+    """
+    __slots__ = ('_by_id', '_names', '_ids')
+
+    def __init__(self, items: list):
+        self._by_id = {item['id']: item for item in items}
+
+        pairs = sorted((normalize_name(item['name']), item['id']) for item in items)
+        self._names = [name for name, _ in pairs]
+        self._ids = array('l', (item_id for _, item_id in pairs))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, item_id):
+        """
+        Look up an item by ID.
+
+        Args:
+            item_id (int or str): The item ID.
+
+        Returns:
+            dict: The item, or ``None`` if the ID is unknown.
+        """
+        return self._by_id.get(int(item_id))
+
+    def id_of(self, name: str):
+        """
+        Look up the ID of an item by name, ignoring case and repeated whitespace.
+
+        Args:
+            name (str): The item name.
+
+        Returns:
+            int: The item ID, or ``None`` if the name is unknown. If several items share the name, the lowest ID.
+        """
+        name = normalize_name(name)
+        i = bisect_left(self._names, name)
+        if i < len(self._names) and self._names[i] == name:
+            return self._ids[i]
+        return None
+
+    def search(self, prefix: str, limit: int = 10) -> list:
+        """
+        Find the items whose names start with a prefix, in alphabetical order.
+
+        Args:
+            prefix (str): The start of the item name, ignoring case and repeated whitespace.
+            limit (int, optional): The maximum number of items to return. Default is ``10``.
+
+        Returns:
+            list: The matching items.
+        """
+        prefix = normalize_name(prefix)
+        results = []
+        i = bisect_left(self._names, prefix)
+        while i < len(self._names) and len(results) < limit and self._names[i].startswith(prefix):
+            results.append(self._by_id[self._ids[i]])
+            i += 1
+        return results
@@ -0,0 +1,246 @@
+# rswiki_wrapper/metrics.py
+# Contains the metrics registry that records the cost of every upstream call
+
+import re
+import threading
+from urllib.parse import urlsplit
+
+# The upper bounds, in seconds, of the phase timing histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# The phases timed for each request, in order
+PHASES = ('queue', 'backoff', 'response', 'download', 'decode')
+
+
+class RequestEvent(object):
+    """
+    The record of one request, passed to every listener of a ``Metrics`` registry.
+
+    Attributes:
+        host (str): The API host the request was for, such as ``'prices.runescape.wiki'``.
+        route (str): The path of the request, such as ``'/api/v1/osrs/latest'``.
+        status (int): The HTTP status of the response.
+        bytes (int): The size of the response body, from ``Content-Length`` where the server sends it.
+        cache (str): ``'hit'`` if answered from the memory cache, ``'revalidated'`` if the disk cache answered a
+            ``304 Not Modified``, ``'miss'`` if a cache was checked but the body was downloaded, or ``None`` if the
+            client has no cache.
+        retries (int): The number of times the request was sent again after a failure.
+        timings (dict): The seconds spent in each phase of the request, keyed by phase name. See ``Metrics``.
+    """
+    __slots__ = ('host', 'route', 'status', 'bytes', 'cache', 'retries', 'timings')
+
+    def __init__(self, host: str, route: str, status: int, bytes: int = 0, cache: str = None, retries: int = 0,
+                 timings: dict = None):
+        self.host = host
+        self.route = route
+        self.status = status
+        self.bytes = bytes
+        self.cache = cache
+        self.retries = retries
+        self.timings = timings or {}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{field}={getattr(self, field)!r}' for field in self.__slots__)
+        return f'RequestEvent({fields})'
+
+
+def url_labels(url: str) -> tuple:
+    """
+    Split a request URL into the ``(host, route)`` labels used by ``Metrics``. The query string is dropped so that the
+    number of routes stays small.
+
+    Args:
+        url (str): The URL of the request.
+
+    Returns:
+        tuple: ``(host, route)``.
+    """
+    parts = urlsplit(url)
+    return parts.netloc, re.sub(r'/{2,}', '/', parts.path) or '/'
+
+
+def body_size(response) -> int:
+    """
+    Return the size of a response body, preferring the ``Content-Length`` sent by the server so that compressed and
+    streamed bodies are counted as they were transferred.
+    """
+    length = response.headers.get('Content-Length')
+    if length is not None and length.isdigit():
+        return int(length)
+    return len(response._content) if isinstance(response._content, bytes) else 0
+
+
+class Metrics(object):
+    """
+    A thread-safe registry of the requests sent by a client. Pass it to a ``WikiClient`` or ``AsyncWikiClient`` to
+    record, for every request, its host, route, status, body size, cache result, retries and phase timings.
+
+    The timed phases are:
+
+    * ``queue``: waiting on the client's rate limiter,
+    * ``backoff``: waiting between retries, if the request was retried,
+    * ``response``: from sending the final attempt to receiving the response headers, including any DNS lookup and
+      connection set-up, which ``requests`` does not time separately,
+    * ``download``: reading the response body of the final attempt,
+    * ``decode``: decoding the JSON body inside the query class.
+
+    Answers from the memory cache are counted as cache hits only, since no request is sent.
+
+    Args:
+        buckets (tuple, optional): The upper bounds, in seconds, of the phase timing histogram buckets. Default is
+            ``DEFAULT_BUCKETS``.
+
+    Attributes:
+        listeners (list): Callables called with each ``RequestEvent`` as it is recorded.
+
+    Example:
+        Exporting the metrics of a client::
+
+            >>> metrics = Metrics()
+            >>> client = WikiClient(metrics=metrics)
+            >>> latest = Latest(user_agent='My Project - me@example.com', client=client)
+            >>> metrics.to_dict()['prices.runescape.wiki']['/api/v1/osrs/latest']['requests']
+            {200: 1}
+            >>> print(metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def subscribe(self, listener) -> None:
+        """
+        Call a function with each ``RequestEvent`` as it is recorded, for example to forward events to a logging or
+        tracing system.
+
+        Args:
+            listener (callable): The function, called as ``listener(event)``.
+        """
+        self.listeners.append(listener)
+
+    def _route(self, host: str, route: str) -> dict:
+        entry = self._routes.setdefault(host, {}).get(route)
+        if entry is None:
+            entry = {'requests': {}, 'bytes': 0, 'cache': {}, 'retries': 0, 'phases': {}}
+            self._routes[host][route] = entry
+        return entry
+
+    def _time(self, entry: dict, phase: str, seconds: float) -> None:
+        histogram = entry['phases'].get(phase)
+        if histogram is None:
+            histogram = {'count': 0, 'sum': 0.0, 'buckets': [0] * len(self.buckets)}
+            entry['phases'][phase] = histogram
+        histogram['count'] += 1
+        histogram['sum'] += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                histogram['buckets'][i] += 1
+                break
+
+    def observe(self, event: RequestEvent) -> None:
+        """
+        Record a request.
+
+        Args:
+            event (:obj:`RequestEvent`): The request to record.
+        """
+        with self._lock:
+            entry = self._route(event.host, event.route)
+            if event.cache is not None:
+                entry['cache'][event.cache] = entry['cache'].get(event.cache, 0) + 1
+            if event.cache != 'hit':
+                entry['requests'][event.status] = entry['requests'].get(event.status, 0) + 1
+                entry['bytes'] += event.bytes
+                entry['retries'] += event.retries
+                for phase, seconds in event.timings.items():
+                    self._time(entry, phase, seconds)
+
+        for listener in self.listeners:
+            listener(event)
+
+    def observe_phase(self, url: str, phase: str, seconds: float) -> None:
+        """
+        Record the time spent in one phase of a request outside the client, such as ``decode``.
+
+        Args:
+            url (str): The URL of the request.
+            phase (str): The name of the phase.
+            seconds (float): The time spent.
+        """
+        host, route = url_labels(url)
+        with self._lock:
+            self._time(self._route(host, route), phase, seconds)
+
+    def reset(self) -> None:
+        """
+        Forget everything recorded so far.
+        """
+        with self._lock:
+            self._routes = {}
+
+    def to_dict(self) -> dict:
+        """
+        Export the metrics as plain data.
+
+        Returns:
+            dict: Keyed by host, then route. Each route holds ``requests`` (counts keyed by status), ``bytes``,
+            ``cache`` (counts keyed by result), ``retries`` and ``phases``. Each phase holds its ``count``, its
+            ``sum`` in seconds and its ``buckets``, the non-cumulative count of timings up to each bound.
+        """
+        with self._lock:
+            return {host: {route: {'requests': dict(entry['requests']), 'bytes': entry['bytes'],
+                                   'cache': dict(entry['cache']), 'retries': entry['retries'],
+                                   'phases': {phase: {'count': histogram['count'], 'sum': histogram['sum'],
+                                                      'buckets': dict(zip(self.buckets, histogram['buckets']))}
+                                              for phase, histogram in entry['phases'].items()}}
+                           for route, entry in routes.items()}
+                    for host, routes in self._routes.items()}
+
+    def to_prometheus(self) -> str:
+        """
+        Export the metrics in the Prometheus text exposition format, for serving from a ``/metrics`` endpoint.
+
+        Returns:
+            str: The metric families ``rswiki_requests_total``, ``rswiki_response_bytes_total``,
+            ``rswiki_cache_total``, ``rswiki_retries_total`` and ``rswiki_phase_seconds``.
+        """
+        families = {
+            'rswiki_requests_total': ('counter', 'Requests sent, by response status.', []),
+            'rswiki_response_bytes_total': ('counter', 'Response body bytes received.', []),
+            'rswiki_cache_total': ('counter', 'Cache lookups, by result.', []),
+            'rswiki_retries_total': ('counter', 'Requests sent again after a failure.', []),
+            'rswiki_phase_seconds': ('histogram', 'Time spent in each phase of a request.', []),
+        }
+
+        for host, routes in self.to_dict().items():
+            for route, entry in routes.items():
+                labels = f'host="{_escape(host)}",route="{_escape(route)}"'
+                for status, count in entry['requests'].items():
+                    families['rswiki_requests_total'][2].append(f'{{{labels},status="{status}"}} {count}')
+                families['rswiki_response_bytes_total'][2].append(f'{{{labels}}} {entry["bytes"]}')
+                for result, count in entry['cache'].items():
+                    families['rswiki_cache_total'][2].append(f'{{{labels},result="{result}"}} {count}')
+                families['rswiki_retries_total'][2].append(f'{{{labels}}} {entry["retries"]}')
+
+                for phase, histogram in entry['phases'].items():
+                    samples = families['rswiki_phase_seconds'][2]
+                    cumulative = 0
+                    for bound, count in histogram['buckets'].items():
+                        cumulative += count
+                        samples.append(f'_bucket{{{labels},phase="{phase}",le="{bound}"}} {cumulative}')
+                    samples.append(f'_bucket{{{labels},phase="{phase}",le="+Inf"}} {histogram["count"]}')
+                    samples.append(f'_sum{{{labels},phase="{phase}"}} {histogram["sum"]}')
+                    samples.append(f'_count{{{labels},phase="{phase}"}} {histogram["count"]}')
+
+        lines = []
+        for name, (kind, description, samples) in families.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(name + sample for sample in samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
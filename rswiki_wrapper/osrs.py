@@ -1,8 +1,16 @@
 # rswiki_wrapper/osrs.py
 # Contains all functions for OSRS Wiki API calls
 
+from .client import get_default_client
+from .index import ItemIndex
+from .records import AvgPriceRow, LatestPrice, MappingItem, TimeSeriesPoint
+from .stream import iter_members
+from .tables import PriceTable, SeriesTable, TIMESTEP_SECONDS
 from .wiki import WikiQuery
 
+# The size of the chunks read from the network when streaming a response
+STREAM_CHUNK_SIZE = 65536
+
 
 class RealTimeQuery(WikiQuery):
     """
@@ -20,6 +28,7 @@ class RealTimeQuery(WikiQuery):
         game (str, optional): The specific game mode to query. Can be one of ``'osrs'``, ``'dmm'``, or ``'fsw'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
         ``**kwargs``: Additional keyword arguments to include in the query. Varies by route.
 
     Attributes:
@@ -27,11 +36,31 @@ class RealTimeQuery(WikiQuery):
         response (:obj:`Response`): The response object provided by the ``requests`` library.
         json (dict): The raw JSON formatted response from the API. Formatted as OrderedDict for all Real-Time queries.
     """
-    def __init__(self, route="", game="osrs", user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
+    def __init__(self, route="", game="osrs", user_agent='RS Wiki API Python Wrapper - Default', client=None,
+                 **kwargs):
+        self.route = route
         base_url = 'https://prices.runescape.wiki/api/v1/' + game + '/' + route
-        super().__init__(base_url, user_agent=user_agent, **kwargs)
+        super().__init__(base_url, user_agent=user_agent, client=client, **kwargs)
+
+    def _parse(self):
+        self.json = self._decode()
+
+    @classmethod
+    def _stream(cls, route: str, depth: int, game: str, user_agent: str, client, chunk_size: int, **kwargs):
+        """
+        Send a query and decode the objects at one nesting ``depth`` of the response body as it downloads. See
+        ``iter_members()``.
 
-        self.json = self.response.json()
+        Yields:
+            tuple: ``(key, record)`` for each object, where ``key`` is ``None`` for the items of an array.
+        """
+        client = client if client is not None else get_default_client()
+        url = 'https://prices.runescape.wiki/api/v1/' + game + '/' + route
+
+        with client.stream(url, headers={'User-Agent': user_agent}, params=kwargs) as response:
+            response.raise_for_status()
+            for key, body in iter_members(response.iter_content(chunk_size), depth):
+                yield key, cls.decoder(body)
 
 
 class Latest(RealTimeQuery):
@@ -44,6 +73,11 @@ class Latest(RealTimeQuery):
             Default ``'osrs'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+        records (bool, optional): Whether to build ``.content`` from compact ``LatestPrice`` records instead of
+            dicts. Default is ``False``.
+        hedge (float, optional): For latency-critical polling, send the request a second time if no answer has
+            arrived after this many seconds, and use whichever answer comes first. Default is ``None``.
 
     Keyword Args:
         id (str, optional): The itemID to query if only one itemID is desired.
@@ -75,11 +109,69 @@ class Latest(RealTimeQuery):
             >>> query.content['2']
             {'high': 152, 'highTime': 1672437534, 'low': 154, 'lowTime': 1672437701}
     """
-    def __init__(self, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
-        super().__init__(route="latest", game=game, user_agent=user_agent, **kwargs)
+    def __init__(self, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None, records=False,
+                 hedge=None, **kwargs):
+        self.records = records
+        self.hedge = hedge
+        super().__init__(route="latest", game=game, user_agent=user_agent, client=client, **kwargs)
+
+    def _cache_expiry(self, now, ttl):
+        # Latest prices change continuously, so they are only shared for the short ttl of the cache
+        return now + ttl
+
+    def _parse(self):
+        super()._parse()
 
         # Response is {'data': {}}
         self.content = self.json['data']
+        if self.records:
+            # The records replace the decoded dicts in .json too, so that only one copy is kept
+            self.content = self.json['data'] = {item_id: LatestPrice.from_dict(prices)
+                                                for item_id, prices in self.content.items()}
+
+    @classmethod
+    def stream(cls, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None,
+               chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        """
+        Query the latest prices and yield each item as its part of the response arrives, instead of building
+        ``.json`` and ``.content``. Only one item and one chunk of the body are held in memory at a time, and items
+        can be processed while the rest of the market downloads.
+
+        Args:
+            game (str, optional): The specific game mode to query. Default ``'osrs'``.
+            user_agent (str): The user agent string to use in the query.
+            client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+            chunk_size (int, optional): The number of bytes read from the network at a time. Default is ``65536``.
+            ``**kwargs``: The keyword arguments of ``Latest``.
+
+        Yields:
+            tuple: ``(item_id, prices)`` in the order of the response, in the same format as ``.content``.
+
+        Example:
+            Example to find items with no recent instant-sell price::
+
+                >>> for item_id, prices in Latest.stream(user_agent='My Project - me@example.com'):
+                >>>     if prices['low'] is None:
+                >>>         print(item_id)
+        """
+        return cls._stream('latest', 2, game, user_agent, client, chunk_size, **kwargs)
+
+    def to_table(self) -> PriceTable:
+        """
+        Convert the content to an array-backed ``PriceTable`` indexed by item ID, with ``'high'``, ``'highTime'``,
+        ``'low'`` and ``'lowTime'`` columns. Requires ``numpy``.
+
+        Returns:
+            :obj:`PriceTable`: The latest prices of every item.
+
+        Example:
+            Example to get the spread of a specific item ID::
+
+                >>> table = Latest('osrs', user_agent='My Project - me@example.com').to_table()
+                >>> table.spread()[2]
+                -2
+        """
+        return PriceTable.from_content(self.content, ['high', 'highTime', 'low', 'lowTime'])
 
 
 class Mapping(RealTimeQuery):
@@ -94,6 +186,9 @@ class Mapping(RealTimeQuery):
             Default ``'osrs'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+        records (bool, optional): Whether to build ``.content`` from compact ``MappingItem`` records instead of
+            dicts. Default is ``False``.
 
     Attributes:
         content (list): A list of all item mapping information
@@ -123,20 +218,97 @@ class Mapping(RealTimeQuery):
             {'examine': 'Fabulously ancient mage protection enchanted in the 3rd Age.', 'id': 10344, 'members': True,
             'lowalch': 20200, 'limit': 8, 'value': 50500, 'highalch': 30300, 'icon': '3rd age amulet.png', 'name': '3rd age amulet'}
 
-        Example to create an item hash map::
+        Example to look up items by ID, by name, or by the start of their name::
 
             >>> query = Mapping('osrs', user_agent='My Project - me@example.com')
-            >>> item_map = {}
-            >>> for d in query.content:
-            >>>     item_map[str(d['id'])] = d
-            >>>     item_map[d['name']] = d
-            >>> item_map['Coal']['id']
+            >>> query.get_id('coal')
             453
+            >>> query.get_item(453)['name']
+            'Coal'
+            >>> [item['name'] for item in query.search('dragon b', limit=3)]
+            ['Dragon bolts', 'Dragon bolts (e)', 'Dragon bolts (p)']
     """
-    def __init__(self, game='osrs', user_agent='RS Wiki API Python Wrapper - Default'):
-        super().__init__(route="mapping", game=game, user_agent=user_agent)
+    # The mapping only changes when items are added to the game, so it is worth revalidating from a DiskCache
+    _revalidate = True
+
+    def __init__(self, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None, records=False):
+        self._index = None
+        self.records = records
+        super().__init__(route="mapping", game=game, user_agent=user_agent, client=client)
+
+    def _parse(self):
+        super()._parse()
 
         self.content = self.json
+        if self.records:
+            self.content = self.json = [MappingItem.from_dict(item) for item in self.content]
+        # Indexes are rebuilt on the first lookup after each fetch
+        self._index = None
+
+    @classmethod
+    def stream(cls, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None,
+               chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Query the item mapping and yield each item as its part of the response arrives, instead of building
+        ``.json`` and ``.content``.
+
+        Args:
+            game (str, optional): The specific game mode to query. Default ``'osrs'``.
+            user_agent (str): The user agent string to use in the query.
+            client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+            chunk_size (int, optional): The number of bytes read from the network at a time. Default is ``65536``.
+
+        Yields:
+            dict: The mapping information of each item, in the same format as the items of ``.content``.
+        """
+        for _, item in cls._stream('mapping', 1, game, user_agent, client, chunk_size):
+            yield item
+
+    @property
+    def index(self) -> ItemIndex:
+        """
+        :obj:`ItemIndex`: The lookup indexes of the content, built once per fetch on first use.
+        """
+        if self._index is None:
+            self._index = ItemIndex(self.content)
+        return self._index
+
+    def get_item(self, item_id):
+        """
+        Look up the mapping information of an item by ID.
+
+        Args:
+            item_id (int or str): The item ID.
+
+        Returns:
+            dict: The item, or ``None`` if the ID is unknown.
+        """
+        return self.index.get(item_id)
+
+    def get_id(self, name: str):
+        """
+        Look up the ID of an item by name, ignoring case and repeated whitespace.
+
+        Args:
+            name (str): The item name.
+
+        Returns:
+            int: The item ID, or ``None`` if the name is unknown.
+        """
+        return self.index.id_of(name)
+
+    def search(self, prefix: str, limit: int = 10) -> list:
+        """
+        Find the items whose names start with a prefix, for autocomplete.
+
+        Args:
+            prefix (str): The start of the item name, ignoring case and repeated whitespace.
+            limit (int, optional): The maximum number of items to return. Default is ``10``.
+
+        Returns:
+            list: The matching items, in alphabetical order of name.
+        """
+        return self.index.search(prefix, limit)
 
 
 class AvgPrice(RealTimeQuery):
@@ -152,6 +324,9 @@ class AvgPrice(RealTimeQuery):
             Default ``'osrs'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+        records (bool, optional): Whether to build ``.content`` from compact ``AvgPriceRow`` records instead of
+            dicts. Default is ``False``.
 
     Keyword Args:
         timestamp (str, optional): The timestamp (UNIX formatted) to begin the average calculation at.
@@ -179,15 +354,69 @@ class AvgPrice(RealTimeQuery):
             >>> query.content['2']
             {'avgHighPrice': 158, 'highPriceVolume': 127372, 'avgLowPrice': 159, 'lowPriceVolume': 11785}
     """
-    def __init__(self, route, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
+    def __init__(self, route, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None,
+                 records=False, **kwargs):
+        self.records = records
         # Valid routes are '5m' or '1h'
         assert route in ['5m', '1h'], 'Invalid route selected'
 
         # TODO Validate the timestamp is valid if the kwarg is used
-        super().__init__(route, game=game, user_agent=user_agent, **kwargs)
+        super().__init__(route, game=game, user_agent=user_agent, client=client, **kwargs)
+
+    def _cache_expiry(self, now, ttl):
+        # A closed bucket requested with a timestamp never changes; the current one changes when the next bucket closes
+        if self.params.get('timestamp') is not None:
+            return float('inf')
+
+        step = TIMESTEP_SECONDS[self.route]
+        return (now // step + 1) * step
+
+    def _parse(self):
+        super()._parse()
 
         # Response is {'data': {OrderedDict()}}
         self.content = self.json['data']
+        if self.records:
+            self.content = self.json['data'] = {item_id: AvgPriceRow.from_dict(prices)
+                                                for item_id, prices in self.content.items()}
+
+    @classmethod
+    def stream(cls, route, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None,
+               chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        """
+        Query the average prices and yield each item as its part of the response arrives, instead of building
+        ``.json`` and ``.content``. See ``Latest.stream()``.
+
+        Args:
+            route (str): The route to query. Must be ``'5m'`` or ``'1h'``.
+            game (str, optional): The specific game mode to query. Default ``'osrs'``.
+            user_agent (str): The user agent string to use in the query.
+            client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+            chunk_size (int, optional): The number of bytes read from the network at a time. Default is ``65536``.
+            ``**kwargs``: The keyword arguments of ``AvgPrice``, such as ``timestamp``.
+
+        Yields:
+            tuple: ``(item_id, prices)`` in the order of the response, in the same format as ``.content``.
+        """
+        return cls._stream(route, 2, game, user_agent, client, chunk_size, **kwargs)
+
+    def to_table(self) -> PriceTable:
+        """
+        Convert the content to an array-backed ``PriceTable`` indexed by item ID, with ``'avgHighPrice'``,
+        ``'avgLowPrice'``, ``'highPriceVolume'`` and ``'lowPriceVolume'`` columns. Requires ``numpy``.
+
+        Returns:
+            :obj:`PriceTable`: The average prices and volumes of every item.
+
+        Example:
+            Example to get the volume-weighted price of a specific item ID::
+
+                >>> table = AvgPrice('5m', 'osrs', user_agent='My Project - me@example.com').to_table()
+                >>> table.volume_weighted_price()[2]
+                158.08468851728622
+        """
+        return PriceTable.from_content(self.content, ['avgHighPrice', 'avgLowPrice', 'highPriceVolume',
+                                                      'lowPriceVolume'], high='avgHighPrice', low='avgLowPrice')
 
 
 class TimeSeries(RealTimeQuery):
@@ -204,6 +433,9 @@ class TimeSeries(RealTimeQuery):
             Default ``'osrs'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+        records (bool, optional): Whether to build ``.content`` from compact ``TimeSeriesPoint`` records instead of
+            dicts. Default is ``False``.
 
     Keyword Args:
         id (str, required): The itemID to provide timeseries data for.
@@ -233,9 +465,79 @@ class TimeSeries(RealTimeQuery):
             >>> query.content[0]
             {'timestamp': 1672330200, 'avgHighPrice': 162, 'avgLowPrice': 155, 'highPriceVolume': 204403, 'lowPriceVolume': 11966}
     """
-    def __init__(self, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
+    def __init__(self, game='osrs', user_agent='RS Wiki API Python Wrapper - Default', client=None, records=False,
+                 **kwargs):
         # TODO Validate the timestep is valid (5m, 1h, 6h)
-        super().__init__(route="timeseries", game=game, user_agent=user_agent, **kwargs)
+        self.records = records
+        super().__init__(route="timeseries", game=game, user_agent=user_agent, client=client, **kwargs)
+
+    def _parse(self):
+        super()._parse()
 
         # Response is {'data': [{OrderedDict()}]}
         self.content = self.json['data']
+        if self.records:
+            self.content = self.json['data'] = [TimeSeriesPoint.from_dict(point) for point in self.content]
+
+    def to_table(self) -> SeriesTable:
+        """
+        Convert the content to a columnar ``SeriesTable`` with a ``'timestamp'`` array and masked ``'avgHighPrice'``,
+        ``'avgLowPrice'``, ``'highPriceVolume'`` and ``'lowPriceVolume'`` columns. Requires ``numpy``.
+
+        Returns:
+            :obj:`SeriesTable`: The time-series of the item.
+
+        Example:
+            Example to get daily volume-weighted prices from a 6 hour series::
+
+                >>> series = TimeSeries('osrs', user_agent='My Project - me@example.com', id='2', timestep='6h')
+                >>> series.to_table().resample('24h').vwap()[-1]
+        """
+        return SeriesTable.from_content(self.content, step=self.params.get('timestep'))
+
+    @classmethod
+    def bulk(cls, ids: list, timestep: str, game: str = 'osrs', user_agent: str = 'RS Wiki API Python Wrapper - Default',
+             client=None, workers: int = 4, rate: float = 1):
+        """
+        Fetch the time-series of many items at once, with at most ``workers`` requests in flight and at most
+        ``rate`` requests per second. Results are yielded as each request completes, and a failed item does not stop
+        the rest of the batch.
+
+        Args:
+            ids (list): The item IDs to fetch.
+            timestep (str): The period of the time-series data to retrieve. Valid values are ``'5m'``, ``'1h'``, or
+                ``'6h'``.
+            game (str, optional): The specific game mode to query. Default ``'osrs'``.
+            user_agent (str): The user agent string to use in the queries.
+            client (:obj:`WikiClient`, optional): The pooled HTTP client to send the requests with.
+            workers (int, optional): The number of requests in flight at once. Default is ``4``.
+            rate (float, optional): The budget of requests per second. Default is ``1``. See
+                ``WikiClient.map_limited()``.
+
+        Yields:
+            tuple: ``(id, series)`` in completion order, where ``series`` is the ``TimeSeries`` of the item, or the
+            exception raised while fetching it.
+
+        Example:
+            Refreshing a watchlist and collecting the failures::
+
+                >>> failed = {}
+                >>> for item_id, series in TimeSeries.bulk(['2', '6', '453'], '5m', user_agent='My Project - me@example.com'):
+                >>>     if isinstance(series, Exception):
+                >>>         failed[item_id] = series
+        """
+        client = client if client is not None else get_default_client()
+
+        def fetch(item_id):
+            return cls(game=game, user_agent=user_agent, client=client, id=item_id, timestep=timestep)
+
+        results = client.map_limited(fetch, ids, workers, rate, ordered=False)
+        try:
+            for item_id, future in results:
+                try:
+                    series = future.result()
+                except Exception as exc:
+                    series = exc
+                yield item_id, series
+        finally:
+            results.close()
@@ -0,0 +1,148 @@
+# rswiki_wrapper/plan.py
+# Contains the deferred query plan, which collects queries and sends their requests together
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from .cache import canonical_url
+from .client import WikiClient, get_default_client
+
+
+class QueryPlan(object):
+    """
+    A deferring client. Queries constructed with a ``QueryPlan`` as their ``client`` send no request. Instead they are
+    added to the plan as unexecuted query objects, which can be inspected before anything is sent. ``execute()`` then
+    sends the requests of every planned query together and builds each query's ``.json`` and ``.content``:
+
+    * identical requests, for example the same ``TimeSeries`` built by several reports, are sent once and their
+      response is shared,
+    * requests are grouped by host, and the hosts are queried concurrently, with at most ``per_host`` requests in
+      flight to each host,
+    * every request goes through the wrapped ``WikiClient``, so its caches, rate limiter, retry policy and metrics
+      apply as usual.
+
+    The classes that send one request per query are deferred: ``Latest``, ``Mapping``, ``AvgPrice``, ``TimeSeries``,
+    ``Exchange`` (including lists of items), ``Runescape``, and ``MediaWiki.ask()`` and ``MediaWiki.browse()``. The
+    ``MediaWiki`` helpers that need several dependent requests, such as ``get_ask_content()``, still run at once
+    through the wrapped client.
+
+    Args:
+        client (:obj:`WikiClient`, optional): The client to send the requests with. Default is the shared client
+            returned by ``get_default_client()``.
+        per_host (int, optional): The largest number of requests in flight to each host. Default is ``4``.
+
+    Attributes:
+        client (:obj:`WikiClient`): The client requests are sent with.
+        queries (list): The queries planned and not yet executed, in the order they were built.
+
+    Example:
+        Building overlapping queries up front and sending them together::
+
+            >>> plan = QueryPlan(per_host=8)
+            >>> latest = Latest(user_agent='My Project - me@example.com', client=plan)
+            >>> series = [TimeSeries(id=i, timestep='5m', user_agent='My Project - me@example.com', client=plan)
+            >>>           for i in ('2', '6', '2')]
+            >>> len(plan.requests())
+            3
+            >>> plan.execute()
+            >>> series[0].content[0]['avgHighPrice']
+            152
+    """
+    blocking = False
+
+    def __init__(self, client: WikiClient = None, per_host: int = 4):
+        self.client = client if client is not None else get_default_client()
+        self.per_host = per_host
+        self.queries = []
+
+    def __getattr__(self, name: str):
+        # Queries reach the client through the plan, for its rate limiter and for requests sent at once
+        if name == 'client':
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def defer(self, query) -> None:
+        """
+        Add a query to the plan. Called by the query classes when they are constructed with the plan as their client.
+
+        Args:
+            query (:obj:`WikiQuery`): The query, with its ``url``, ``params`` and ``headers`` set.
+        """
+        self.queries.append(query)
+
+    @staticmethod
+    def _query_requests(query) -> list:
+        """
+        The requests of a query, as ``(key, params)`` pairs. A query split into several requests, such as an
+        ``Exchange`` with a list of items, has one pair per request.
+        """
+        chunks = query._param_chunks() if hasattr(query, '_param_chunks') else [query.params]
+        return [((canonical_url(query.url, params), tuple(sorted(query.headers.items()))), params) for params in chunks]
+
+    def requests(self) -> list:
+        """
+        The distinct requests the planned queries will send.
+
+        Returns:
+            list: The canonical URL of each request, in the order the queries were planned.
+        """
+        seen = {}
+        for query in self.queries:
+            for key, params in self._query_requests(query):
+                seen.setdefault(key, key[0])
+        return list(seen.values())
+
+    def execute(self) -> list:
+        """
+        Send the requests of every planned query and build their ``.json`` and ``.content``. The plan is emptied, so
+        it can be reused for the next batch of queries.
+
+        Returns:
+            list: The executed queries, in the order they were planned.
+
+        Raises:
+            Exception: The first error raised by a request or by parsing a response, after every other query has
+            been completed.
+        """
+        queries, self.queries = self.queries, []
+
+        # Collapse identical requests, keeping the first query that asked for each one
+        unique = {}
+        for query in queries:
+            for key, params in self._query_requests(query):
+                if key not in unique:
+                    unique[key] = (query, params)
+
+        hosts = {}
+        for key, (query, params) in unique.items():
+            hosts.setdefault(urlsplit(query.url).netloc, []).append(key)
+
+        executors = [ThreadPoolExecutor(max_workers=max(1, min(self.per_host, len(keys)))) for keys in hosts.values()]
+        try:
+            futures = {key: executor.submit(self._send, *unique[key])
+                       for executor, keys in zip(executors, hosts.values()) for key in keys}
+            wait(futures.values())
+        finally:
+            for executor in executors:
+                executor.shutdown()
+
+        error = None
+        for query in queries:
+            try:
+                responses = [futures[key].result() for key, params in self._query_requests(query)]
+                if hasattr(query, '_param_chunks'):
+                    query.responses = responses
+                query.response = responses[-1]
+                query._parse()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return queries
+
+    def _send(self, query, params: dict):
+        if query.hedge is None:
+            return self.client.get(query.url, headers=query.headers, params=params, expiry=query._cache_expiry,
+                                   revalidate=query._revalidate)
+        return self.client.get(query.url, headers=query.headers, params=params, expiry=query._cache_expiry,
+                               revalidate=query._revalidate, hedge=query.hedge)
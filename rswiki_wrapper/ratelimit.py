@@ -0,0 +1,224 @@
+# rswiki_wrapper/ratelimit.py
+# Contains the rate limiters used to keep request rates polite
+
+import json
+import os
+import threading
+from time import monotonic, sleep, time
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket. Tokens are added at ``rate`` per second up to ``capacity``, and each request takes one
+    token, waiting for the bucket to refill if it is empty. Over any period the number of requests is at most
+    ``capacity + rate * seconds``.
+
+    Args:
+        rate (float): The sustained number of requests allowed per second.
+        capacity (float, optional): The largest burst of requests allowed at once. Default is ``1``.
+
+    Example:
+        Limiting a loop to two requests per second::
+
+            >>> bucket = TokenBucket(rate=2)
+            >>> for item_id in ('2', '6', '453'):
+            >>>     bucket.acquire()
+            >>>     TimeSeries(id=item_id, timestep='5m', user_agent='My Project - me@example.com')
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        assert rate > 0, 'rate must be positive'
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: ``0`` if a token was taken, otherwise the seconds to wait until one is available.
+        """
+        with self._lock:
+            self._refill(monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """
+        Take a token, blocking until one is available.
+        """
+        wait = self.try_acquire()
+        while wait > 0:
+            sleep(wait)
+            wait = self.try_acquire()
+
+
+class FileTokenBucket(object):
+    """
+    A token bucket whose state is kept in a small file, so that one budget is shared by every thread and process
+    using the same ``path``. Access to the file is serialized with an exclusive file lock (``fcntl`` on POSIX,
+    ``msvcrt`` on Windows).
+
+    Args:
+        path (str): The file holding the bucket state. Created if it does not exist.
+        rate (float): The sustained number of requests allowed per second, across all processes.
+        capacity (float, optional): The largest burst of requests allowed at once. Default is ``1``.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float = 1):
+        assert rate > 0, 'rate must be positive'
+
+        self.path = os.path.expanduser(path)
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: ``0`` if a token was taken, otherwise the seconds to wait until one is available.
+        """
+        with self._lock, open(self.path, 'a+b') as f:
+            _lock_file(f)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read().decode('utf-8'))
+                    tokens, last = state['tokens'], state['last']
+                except (ValueError, KeyError, TypeError):
+                    tokens, last = self.capacity, time()
+
+                # Wall-clock time is used because monotonic clocks are not comparable between processes
+                now = time()
+                tokens = min(self.capacity, tokens + max(0.0, now - last) * self.rate)
+                wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+                if wait == 0:
+                    tokens -= 1
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({'tokens': tokens, 'last': now}).encode('utf-8'))
+                f.flush()
+            finally:
+                _unlock_file(f)
+        return wait
+
+    def acquire(self) -> None:
+        """
+        Take a token, blocking until one is available.
+        """
+        wait = self.try_acquire()
+        while wait > 0:
+            sleep(wait)
+            wait = self.try_acquire()
+
+
+def _lock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RateLimiter(object):
+    """
+    A per-host rate limiter for a ``WikiClient``. Every request takes a token from the bucket of its host before it
+    is sent, so queries from all threads run at the largest polite rate instead of idling for a fixed second. With
+    a ``directory``, the buckets are ``FileTokenBucket`` files and the budget is shared between worker processes.
+
+    Args:
+        rate (float, optional): The default requests per second allowed to each host. Default is ``1``.
+        capacity (float, optional): The largest burst of requests allowed to each host. Default is ``1``.
+        per_host (dict, optional): Requests per second for specific hosts, for example
+            ``{'prices.runescape.wiki': 5}``. Hosts not listed use ``rate``.
+        directory (str, optional): A directory to keep shared bucket files in. Default is ``None`` (the budget is
+            shared by the threads of this process only).
+
+    Example:
+        Sharing a budget between several worker processes::
+
+            >>> limiter = RateLimiter(rate=2, per_host={'prices.runescape.wiki': 5}, directory='/tmp/rswiki')
+            >>> client = WikiClient(rate_limiter=limiter)
+            >>> latest = Latest(user_agent='My Project - me@example.com', client=client)
+    """
+
+    def __init__(self, rate: float = 1, capacity: float = 1, per_host: dict = None, directory: str = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.per_host = per_host or {}
+        self.directory = os.path.expanduser(directory) if directory is not None else None
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str):
+        """
+        Return the bucket of a URL's host, creating it on first use.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            :obj:`TokenBucket` or :obj:`FileTokenBucket`: The bucket of the host.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.per_host.get(host, self.rate)
+                if self.directory is None:
+                    self._buckets[host] = TokenBucket(rate, self.capacity)
+                else:
+                    path = os.path.join(self.directory, host.replace(':', '_') + '.bucket')
+                    self._buckets[host] = FileTokenBucket(path, rate, self.capacity)
+            return self._buckets[host]
+
+    def try_acquire(self, url: str) -> float:
+        """
+        Take a token for a request if one is available.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            float: ``0`` if a token was taken, otherwise the seconds to wait until one is available.
+        """
+        return self.bucket(url).try_acquire()
+
+    def acquire(self, url: str) -> None:
+        """
+        Take a token for a request, blocking until one is available.
+
+        Args:
+            url (str): The URL of the request.
+        """
+        self.bucket(url).acquire()
@@ -0,0 +1,90 @@
+# rswiki_wrapper/records.py
+# Contains compact record types for the rows of the real-time price routes
+
+class Record(object):
+    """
+    A compact, fixed-field row. Records store their fields in ``__slots__`` instead of a per-row ``dict``, so a
+    market snapshot takes a fraction of the memory of the decoded JSON. Fields keep the names of the API keys and can
+    be read as attributes or with ``record['key']`` and ``record.get('key')``, so records work with code written for
+    the dict content, such as ``to_table()``.
+
+    Fields missing from the API row are ``None``.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for field, value in zip(self.__slots__, args):
+            setattr(self, field, value)
+        for field in self.__slots__[len(args):]:
+            setattr(self, field, kwargs.get(field))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Build a record from a row of the API response.
+
+        Args:
+            data (dict): The row, keyed by the API field names. Unknown keys are ignored.
+
+        Returns:
+            The record.
+        """
+        record = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(record, field, data.get(field))
+        return record
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record back to a row in the format of the API response.
+
+        Returns:
+            dict: The fields of the record.
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __getitem__(self, field: str):
+        try:
+            return getattr(self, field)
+        except (AttributeError, TypeError):
+            raise KeyError(field) from None
+
+    def get(self, field: str, default=None):
+        return getattr(self, field) if field in self.__slots__ else default
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{field}={getattr(self, field)!r}' for field in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+class LatestPrice(Record):
+    """
+    A row of ``Latest.content``: the latest instant-buy and instant-sell prices of an item.
+    """
+    __slots__ = ('high', 'highTime', 'low', 'lowTime')
+
+
+class AvgPriceRow(Record):
+    """
+    A row of ``AvgPrice.content``: the average prices and volumes of an item over one bucket.
+    """
+    __slots__ = ('avgHighPrice', 'avgLowPrice', 'highPriceVolume', 'lowPriceVolume')
+
+
+class TimeSeriesPoint(Record):
+    """
+    A point of ``TimeSeries.content``: the average prices and volumes of an item over the bucket at ``timestamp``.
+    """
+    __slots__ = ('timestamp', 'avgHighPrice', 'avgLowPrice', 'highPriceVolume', 'lowPriceVolume')
+
+
+class MappingItem(Record):
+    """
+    An item of ``Mapping.content``: the static information of an item.
+    """
+    __slots__ = ('id', 'name', 'examine', 'members', 'lowalch', 'highalch', 'limit', 'value', 'icon')
@@ -0,0 +1,205 @@
+# rswiki_wrapper/retry.py
+# Contains the retry policy and circuit breaker used by WikiClient when upstream is throttling or unhealthy
+
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from urllib.parse import urlsplit
+
+from requests.exceptions import RequestException
+
+
+class CircuitOpenError(RequestException):
+    """
+    Raised instead of sending a request while the circuit breaker of its host is open.
+
+    Attributes:
+        host (str): The host whose circuit is open.
+        retry_in (float): The seconds until a trial request is allowed.
+    """
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f'The circuit for {host} is open after repeated failures; retry in {retry_in:.1f}s')
+        self.host = host
+        self.retry_in = retry_in
+
+
+class RetryPolicy(object):
+    """
+    When and how long to wait before sending a failed request again. Waits grow exponentially with "full jitter":
+    each wait is drawn uniformly between ``0`` and ``backoff * 2 ** attempt``, capped at ``max_backoff``, so that
+    many clients throttled at once do not retry in lockstep. A ``Retry-After`` header sent with the failure is
+    respected instead.
+
+    Args:
+        retries (int, optional): The largest number of times a request is sent again. Default is ``3``.
+        backoff (float, optional): The base wait in seconds. Default is ``0.5``.
+        max_backoff (float, optional): The longest computed wait in seconds. Default is ``30``.
+        statuses (tuple, optional): The response statuses that are retried. Default is ``429`` and the ``5xx``
+            statuses of an overloaded or restarting server.
+        max_retry_after (float, optional): The longest ``Retry-After`` honoured, in seconds. A longer one ends the
+            retries and the response is returned as it is. Default is ``60``.
+        seed (int, optional): Seeds the jitter, for reproducible tests. Default is ``None``.
+
+    Example:
+        Retrying throttled requests::
+
+            >>> client = WikiClient(retry=RetryPolicy(retries=5, backoff=1))
+            >>> latest = Latest(user_agent='My Project - me@example.com', client=client)
+    """
+
+    def __init__(self, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30,
+                 statuses: tuple = (429, 500, 502, 503, 504), max_retry_after: float = 60, seed: int = None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.max_retry_after = max_retry_after
+        self._random = random.Random(seed)
+
+    def should_retry(self, response=None) -> bool:
+        """
+        Whether a result is worth retrying.
+
+        Args:
+            response (:obj:`Response`, optional): The response, or ``None`` if the request raised a connection error or
+                timed out.
+
+        Returns:
+            bool: ``True`` for connection errors, timeouts and the ``statuses`` of the policy.
+        """
+        return response is None or response.status_code in self.statuses
+
+    def delay(self, attempt: int, response=None) -> float:
+        """
+        The seconds to wait before sending a request again.
+
+        Args:
+            attempt (int): The number of retries already made, starting at ``0``.
+            response (:obj:`Response`, optional): The failed response, whose ``Retry-After`` header is respected.
+
+        Returns:
+            float: The wait in seconds, or ``None`` if the server asked for a wait longer than ``max_retry_after``.
+        """
+        retry_after = None if response is None else parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return self._random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def parse_retry_after(value: str):
+    """
+    Parse a ``Retry-After`` header, given either as seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        float: The seconds to wait, or ``None`` if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker(object):
+    """
+    A per-host circuit breaker. After ``failures`` consecutive failed requests to a host (connection errors,
+    timeouts or ``5xx`` responses), its circuit opens and requests to it raise ``CircuitOpenError`` at once, without
+    waiting on the network. After ``reset_timeout`` seconds one trial request is let through: if it succeeds the
+    circuit closes, otherwise it stays open for another ``reset_timeout``.
+
+    ``429 Too Many Requests`` is not counted as a failure, since the host is healthy and the ``RetryPolicy`` already
+    waits as asked.
+
+    Args:
+        failures (int, optional): The consecutive failures that open the circuit. Default is ``5``.
+        reset_timeout (float, optional): The seconds a circuit stays open before a trial request. Default is ``30``.
+
+    Example:
+        Failing fast while the prices API is down::
+
+            >>> client = WikiClient(retry=RetryPolicy(), breaker=CircuitBreaker(failures=3, reset_timeout=60))
+    """
+
+    def __init__(self, failures: int = 5, reset_timeout: float = 30):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def state(self, url: str) -> str:
+        """
+        The state of a host's circuit.
+
+        Args:
+            url (str): A URL of the host.
+
+        Returns:
+            str: ``'closed'`` (requests are sent), ``'open'`` (requests fail fast) or ``'half-open'`` (a trial
+            request is allowed).
+        """
+        with self._lock:
+            failures, opened = self._hosts.get(urlsplit(url).netloc, (0, None))
+        if opened is None:
+            return 'closed'
+        return 'half-open' if monotonic() - opened >= self.reset_timeout else 'open'
+
+    def check(self, url: str) -> None:
+        """
+        Raise ``CircuitOpenError`` if requests to the host of a URL should not be sent. A half-open circuit lets one
+        trial request through and stays open for the others until it completes.
+
+        Args:
+            url (str): The URL of the request.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            failures, opened = self._hosts.get(host, (0, None))
+            if opened is None:
+                return
+            remaining = self.reset_timeout - (monotonic() - opened)
+            if remaining > 0:
+                raise CircuitOpenError(host, remaining)
+            # Let this request through as the trial and hold the others back until it completes
+            self._hosts[host] = (failures, monotonic())
+
+    def record(self, url: str, failed: bool) -> None:
+        """
+        Record the result of a request.
+
+        Args:
+            url (str): The URL of the request.
+            failed (bool): Whether the request failed.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if not failed:
+                self._hosts.pop(host, None)
+                return
+            failures, opened = self._hosts.get(host, (0, None))
+            failures += 1
+            if opened is not None or failures >= self.failures:
+                opened = monotonic()
+            self._hosts[host] = (failures, opened)
+
+    @staticmethod
+    def is_failure(response=None) -> bool:
+        """
+        Whether a result counts against the health of its host.
+
+        Args:
+            response (:obj:`Response`, optional): The response, or ``None`` if the request raised a connection error or
+                timed out.
+
+        Returns:
+            bool: ``True`` for connection errors, timeouts and ``5xx`` responses.
+        """
+        return response is None or response.status_code >= 500
@@ -0,0 +1,252 @@
+# rswiki_wrapper/standin.py
+# Contains a local stand-in server for the RS Wiki APIs, for offline tests and load tests
+
+import json
+import random
+import re
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep, time
+from urllib.parse import parse_qs, urlsplit
+
+# The timesteps served by the prices API, in seconds
+_STEPS = {'5m': 300, '1h': 3600, '6h': 21600, '24h': 86400}
+
+
+class StandInServer(object):
+    """
+    A local HTTP server that answers like the RS Wiki APIs, for tests and load tests that must not touch the real
+    hosts. It runs in a background thread of the current process and serves:
+
+    * the real-time prices routes ``latest``, ``mapping``, ``5m``, ``1h`` and ``timeseries``,
+    * the Weird Gloop ``exchange/history`` and ``runescape`` routes,
+    * the MediaWiki ``ask`` action with ``|offset=`` pagination, and the ``smwbrowse`` subject action.
+
+    Payloads are synthetic but have the same shape as the real responses, and are generated from a fixed ``seed`` so
+    that runs are reproducible. Point a client at the server with ``WikiClient(base_url=server.url)``.
+
+    Args:
+        items (int, optional): The number of items in the market. Default is ``4000``, close to the real OSRS market.
+        series_points (int, optional): The number of points in a time-series. Default is ``365``.
+        ask_results (int, optional): The total number of results of an ASK query. Default is ``500``.
+        page_size (int, optional): The number of ASK results per page. Default is ``50``.
+        latency (float, optional): The seconds to wait before answering each request. Default is ``0``.
+        error_rate (float, optional): The fraction of requests answered with ``429 Too Many Requests``. Default is
+            ``0``.
+        retry_after (int, optional): The ``Retry-After`` seconds sent with a ``429``. Default is ``1``.
+        seed (int, optional): The seed of the synthetic payloads and of the ``429`` injection. Default is ``0``.
+        host (str, optional): The interface to listen on. Default is ``'127.0.0.1'``.
+        port (int, optional): The port to listen on. Default is ``0`` (a free port).
+
+    Attributes:
+        url (str): The base URL of the running server, such as ``'http://127.0.0.1:50123'``.
+        requests (list): The path and query string of every request received, in order.
+
+    Example:
+        Running queries against the stand-in server::
+
+            >>> with StandInServer(latency=0.05, error_rate=0.1) as server:
+            >>>     client = WikiClient(base_url=server.url)
+            >>>     latest = Latest(user_agent='My Project - me@example.com', client=client)
+            >>>     len(latest.content)
+            4000
+    """
+
+    def __init__(self, items: int = 4000, series_points: int = 365, ask_results: int = 500, page_size: int = 50,
+                 latency: float = 0, error_rate: float = 0, retry_after: int = 1, seed: int = 0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.items = items
+        self.series_points = series_points
+        self.ask_results = ask_results
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.requests = []
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+        self.url = f'http://{host}:{self._httpd.server_address[1]}'
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        Returns:
+            :obj:`StandInServer`: The server.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05},
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the listening socket.
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def respond(self, target: str):
+        """
+        Build the response to a request.
+
+        Args:
+            target (str): The path and query string of the request.
+
+        Returns:
+            tuple: ``(status, headers, payload)``, where ``payload`` is serialized as JSON.
+        """
+        parts = urlsplit(target)
+        path, query = parts.path, parse_qs(parts.query)
+        with self._lock:
+            self.requests.append(target)
+            limited = self.error_rate and self._random.random() < self.error_rate
+        if self.latency:
+            sleep(self.latency)
+        if limited:
+            return 429, {'Retry-After': str(self.retry_after)}, {'error': 'Too many requests'}
+
+        args = {key: values[0] for key, values in query.items()}
+        for pattern, handler in self._routes():
+            match = pattern.fullmatch(path)
+            if match:
+                return 200, {}, handler(*match.groups(), args)
+        return 404, {}, {'error': 'Not found'}
+
+    def _routes(self):
+        return (
+            (re.compile(r'/api/v1/[\w-]+/latest'), self._latest),
+            (re.compile(r'/api/v1/[\w-]+/mapping'), self._mapping),
+            (re.compile(r'/api/v1/[\w-]+/(5m|1h)'), self._avg_price),
+            (re.compile(r'/api/v1/[\w-]+/timeseries'), self._timeseries),
+            (re.compile(r'/exchange/history/[\w-]+/(latest|all|last90d|sample)'), self._exchange),
+            (re.compile(r'/runescape/+([\w/]+)'), self._runescape),
+            (re.compile(r'/api\.php'), self._mediawiki),
+        )
+
+    def _item_ids(self, args: dict) -> list:
+        if 'id' in args:
+            return [int(args['id'])]
+        return range(2, 2 + self.items)
+
+    @staticmethod
+    def _price(item_id: int, salt: int = 0) -> int:
+        # A cheap multiplicative hash, so that large payloads are fast to build
+        return (item_id * 2654435761 + salt * 40503) % 100000 + 1
+
+    def _latest(self, args: dict) -> dict:
+        now = int(time())
+        return {'data': {str(item_id): {'high': self._price(item_id), 'highTime': now - item_id % 300,
+                                        'low': self._price(item_id, 1), 'lowTime': now - item_id % 600}
+                         for item_id in self._item_ids(args)}}
+
+    def _mapping(self, args: dict) -> list:
+        return [{'examine': f'A stand-in item with the ID {item_id}.', 'id': item_id, 'members': item_id % 2 == 0,
+                 'lowalch': item_id * 2, 'limit': 100 + item_id % 13000, 'value': item_id * 5,
+                 'highalch': item_id * 3, 'icon': f'Item {item_id}.png', 'name': f'Item {item_id}'}
+                for item_id in self._item_ids(args)]
+
+    def _avg_price(self, route: str, args: dict) -> dict:
+        step = _STEPS[route]
+        timestamp = int(args['timestamp']) if 'timestamp' in args else int(time()) // step * step - step
+        return {'data': {str(item_id): self._point(item_id, timestamp) for item_id in self._item_ids(args)},
+                'timestamp': timestamp}
+
+    def _timeseries(self, args: dict) -> dict:
+        item_id = int(args.get('id', 2))
+        step = _STEPS[args.get('timestep', '5m')]
+        end = int(time()) // step * step
+        points = []
+        for n in range(self.series_points):
+            timestamp = end - (self.series_points - n) * step
+            points.append(dict(self._point(item_id, timestamp), timestamp=timestamp))
+        return {'data': points, 'itemId': item_id}
+
+    def _point(self, item_id: int, timestamp: int) -> dict:
+        return {'avgHighPrice': self._price(item_id, timestamp), 'avgLowPrice': self._price(item_id, timestamp + 1),
+                'highPriceVolume': self._price(item_id, timestamp + 2) % 5000,
+                'lowPriceVolume': self._price(item_id, timestamp + 3) % 5000}
+
+    def _exchange(self, endpoint: str, args: dict) -> dict:
+        key = 'id' if 'id' in args else 'name'
+        records = 1 if endpoint == 'latest' else 90
+        content = {}
+        for item in args.get(key, '').split('|'):
+            item_id = item if key == 'id' else str(zlib.crc32(item.encode('utf-8')) % 50000)
+            history = [{'id': item_id, 'timestamp': 1672531200000 - n * 86400000,
+                        'price': self._price(int(item_id) if item_id.isdigit() else 0, n), 'volume': None}
+                       for n in range(records)]
+            content[item] = history[0] if endpoint == 'latest' else history
+        return content
+
+    def _runescape(self, endpoint: str, args: dict):
+        if endpoint == 'vos':
+            return {'timestamp': '2023-01-01T00:00:00.000Z', 'district1': 'Cadarn', 'district2': 'Ithell'}
+        if endpoint in ('vos/history', 'social'):
+            return {'data': [{'id': n, 'page': args.get('page', '1')} for n in range(10)]}
+        if endpoint.startswith('tms'):
+            return [{'id': str(n), 'en': f'Item {n}'} for n in range(3)]
+        return {}
+
+    def _mediawiki(self, args: dict) -> dict:
+        if args.get('action') == 'smwbrowse':
+            subject = json.loads(args['params'])['subject']
+            return {'query': {'subject': subject, 'data': [
+                {'property': 'All_Item_ID', 'dataitem': [{'type': 2, 'item': '2#0##'}]},
+                {'property': 'Production_JSON', 'dataitem': [
+                    {'type': 2, 'item': json.dumps({'ticks': '', 'output': {'name': subject}}) + '#0##'}]},
+                {'property': '_SKEY', 'dataitem': [{'type': 2, 'item': subject.replace('_', ' ')}]},
+            ]}}
+
+        query = args.get('query', '')
+        offset = int(query.split('|offset=')[1]) if '|offset=' in query else 0
+        printouts = [printout.split('|')[0] for printout in query.split('|?')[1:]]
+        last = min(offset + self.page_size, self.ask_results)
+
+        results = {}
+        for n in range(offset, last):
+            value = json.dumps({'ticks': str(n % 5), 'output': {'name': f'Result {n}', 'cost': n}})
+            results[f'Result {n}'] = {'printouts': {printout: [value] for printout in printouts},
+                                      'fulltext': f'Result {n}'}
+        page = {'query': {'printrequests': [], 'results': results, 'meta': {'offset': offset, 'count': len(results)}}}
+        if last < self.ask_results:
+            page['query-continue-offset'] = last
+        return page
+
+
+def _make_handler(server: StandInServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status, headers, payload = server.respond(self.path)
+            body = json.dumps(payload).encode('utf-8')
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
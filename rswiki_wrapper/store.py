@@ -0,0 +1,331 @@
+# rswiki_wrapper/store.py
+# Contains a local, append-only store of whole-market average price history
+
+import json
+import os
+
+from .osrs import AvgPrice
+from .tables import PriceTable, SeriesTable, SERIES_FIELDS, TIMESTEP_SECONDS, _require_numpy
+
+# NumPy is set by _require_numpy() when the first store is opened, so that importing the package stays fast
+np = None
+
+# The on-disk type of each column. Prices fit the 32-bit coin cap, volumes may not.
+COLUMN_DTYPES = {
+    'avgHighPrice': 'int32',
+    'avgLowPrice': 'int32',
+    'highPriceVolume': 'int64',
+    'lowPriceVolume': 'int64',
+}
+
+# The number of bucket rows added each time the column files grow
+GROW_ROWS = 288
+
+
+class PriceStore(object):
+    """
+    A local store of full-market price history built from ``AvgPrice`` snapshots. Each column is a memory-mapped file
+    of fixed-width rows: one row per ``'5m'`` or ``'1h'`` bucket, and one slot per item in each row. One ``AvgPrice``
+    request therefore adds the history of every traded item, and buckets that were missed can be backfilled with the
+    ``timestamp`` kwarg of ``AvgPrice``.
+
+    Reading the history of one item reads one slot from each row, and reading a period of time reads a contiguous
+    block of rows, so both are fast without loading the whole store. Missing prices are stored as ``0`` and read back
+    masked.
+
+    Args:
+        directory (str): The directory holding the store. Created if it does not exist; an existing store keeps the
+            timestep and slot count it was created with.
+        timestep (str, optional): The bucket length, ``'5m'`` or ``'1h'``. Default is ``'5m'``.
+        slots (int, optional): The number of items each row can hold. Default is ``8192``.
+        start (int, optional): The UNIX timestamp of the first bucket to keep. Default is ``None`` (the first bucket
+            ingested).
+
+    Attributes:
+        timestep (str): The bucket length.
+        step (int): The bucket length in seconds.
+        origin (int): The UNIX timestamp of the first row, or ``None`` before anything is ingested.
+
+    Note:
+        This class requires ``numpy``, installed with ``pip install rswiki-wrapper[numpy]``. A store should only have
+        one writer at a time.
+
+    Example:
+        Keeping hourly history up to date and reading one item back::
+
+            >>> store = PriceStore('~/rswiki-history', timestep='1h', start=1672531200)
+            >>> store.sync(user_agent='My Project - me@example.com')
+            >>> store.item(2).resample('24h').vwap()
+    """
+
+    def __init__(self, directory: str, timestep: str = '5m', slots: int = 8192, start: int = None):
+        global np
+        np = _require_numpy()
+
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+        if os.path.exists(self._path('meta.json')):
+            with open(self._path('meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        else:
+            step = TIMESTEP_SECONDS[timestep]
+            meta = {
+                'timestep': timestep,
+                'slots': slots,
+                'origin': None if start is None else start // step * step,
+                'rows': 0,
+                'items': [],
+            }
+
+        self.timestep = meta['timestep']
+        self.step = TIMESTEP_SECONDS[self.timestep]
+        self.slots = meta['slots']
+        self.origin = meta['origin']
+        self._rows = meta['rows']
+        self._items = meta['items']
+        self._slot_of = {item_id: slot for slot, item_id in enumerate(self._items)}
+        self._columns = {}
+        self._present = None
+        self._open()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self) -> None:
+        """
+        Memory-map the column files at their current size.
+        """
+        if self._rows == 0:
+            return
+        for field, dtype in COLUMN_DTYPES.items():
+            self._columns[field] = np.memmap(self._path(field + '.dat'), dtype=dtype, mode='r+',
+                                             shape=(self._rows, self.slots))
+        self._present = np.memmap(self._path('present.dat'), dtype='uint8', mode='r+', shape=(self._rows,))
+
+    def _grow(self, rows: int) -> None:
+        """
+        Extend every column file so that it holds at least ``rows`` buckets.
+        """
+        rows = max(rows, self._rows + GROW_ROWS)
+        self._close()
+        for field, dtype in COLUMN_DTYPES.items():
+            with open(self._path(field + '.dat'), 'ab') as f:
+                f.truncate(rows * self.slots * np.dtype(dtype).itemsize)
+        with open(self._path('present.dat'), 'ab') as f:
+            f.truncate(rows)
+
+        self._rows = rows
+        self._open()
+        self._save_meta()
+
+    def _close(self) -> None:
+        for column in self._columns.values():
+            column.flush()
+        self._columns = {}
+        self._present = None
+
+    def _save_meta(self) -> None:
+        meta = {'timestep': self.timestep, 'slots': self.slots, 'origin': self.origin, 'rows': self._rows,
+                'items': self._items}
+        tmp_path = self._path('meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path('meta.json'))
+
+    def _slots_for(self, item_ids: list) -> list:
+        """
+        Return the slot of each item, giving new items the next free slots.
+        """
+        for item_id in item_ids:
+            if item_id not in self._slot_of:
+                if len(self._items) >= self.slots:
+                    raise ValueError(f'The store is full; it was created with {self.slots} item slots')
+                self._slot_of[item_id] = len(self._items)
+                self._items.append(item_id)
+        return [self._slot_of[item_id] for item_id in item_ids]
+
+    def _row(self, timestamp: int) -> int:
+        if timestamp % self.step:
+            raise ValueError(f'{timestamp} is not the start of a {self.timestep} bucket')
+        if timestamp < self.origin:
+            raise ValueError(f'{timestamp} is before the first bucket of the store ({self.origin})')
+        return (timestamp - self.origin) // self.step
+
+    def ingest(self, query: AvgPrice) -> int:
+        """
+        Add an ``AvgPrice`` snapshot to the store. Ingesting a bucket again overwrites it.
+
+        Args:
+            query (:obj:`AvgPrice`): A completed query with the same timestep as the store.
+
+        Returns:
+            int: The UNIX timestamp of the bucket that was stored.
+        """
+        assert query.route == self.timestep, f'The store holds {self.timestep} buckets, not {query.route}'
+
+        timestamp = query.json.get('timestamp')
+        if timestamp is None:
+            timestamp = int(query.params['timestamp'])
+        if self.origin is None:
+            self.origin = timestamp
+
+        row = self._row(timestamp)
+        if row >= self._rows:
+            self._grow(row + 1)
+
+        item_ids = [int(item_id) for item_id in query.content]
+        slots = self._slots_for(item_ids)
+        rows = list(query.content.values())
+        for field, column in self._columns.items():
+            values = np.zeros(self.slots, dtype=column.dtype)
+            values[slots] = [prices.get(field) or 0 for prices in rows]
+            column[row] = values
+            column.flush()
+
+        self._present[row] = 1
+        self._present.flush()
+        self._save_meta()
+        return timestamp
+
+    def timestamps(self):
+        """
+        The buckets held by the store.
+
+        Returns:
+            :obj:`ndarray`: The UNIX timestamp of every stored bucket, in ascending order.
+        """
+        if self._present is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.origin + np.flatnonzero(self._present).astype(np.int64) * self.step
+
+    def missing(self, until: int) -> list:
+        """
+        Find the buckets between the first bucket of the store and ``until`` that have not been ingested.
+
+        Args:
+            until (int): The UNIX timestamp of the last bucket to check, inclusive.
+
+        Returns:
+            list: The UNIX timestamps of the missing buckets, oldest first.
+        """
+        if self.origin is None or until < self.origin:
+            return []
+        stored = set(self.timestamps().tolist())
+        return [timestamp for timestamp in range(self.origin, until // self.step * self.step + 1, self.step)
+                if timestamp not in stored]
+
+    def sync(self, game: str = 'osrs', user_agent: str = 'RS Wiki API Python Wrapper - Default', client=None,
+             limit: int = None) -> int:
+        """
+        Ingest the most recent bucket, then backfill every missed bucket since the first bucket of the store with the
+        ``timestamp`` kwarg of ``AvgPrice``. One request is made per bucket, for the whole market.
+
+        Args:
+            game (str, optional): The game mode to query. Default ``'osrs'``.
+            user_agent (str): The user agent string to use in the queries.
+            client (:obj:`WikiClient`, optional): The HTTP client to send the requests with.
+            limit (int, optional): The largest number of missed buckets to backfill, newest first. Default is
+                ``None`` (all of them).
+
+        Returns:
+            int: The number of buckets ingested.
+        """
+        latest = self.ingest(AvgPrice(self.timestep, game=game, user_agent=user_agent, client=client))
+
+        missing = self.missing(latest)
+        if limit is not None:
+            missing = missing[-limit:] if limit else []
+        for timestamp in reversed(missing):
+            self.ingest(AvgPrice(self.timestep, game=game, user_agent=user_agent, client=client,
+                                 timestamp=timestamp))
+        return len(missing) + 1
+
+    def _rows_between(self, start: int = None, end: int = None):
+        """
+        Return the stored rows with bucket timestamps in ``[start, end)``.
+        """
+        if self._present is None:
+            return np.zeros(0, dtype=np.int64)
+        first = 0 if start is None else max(0, -(-(start - self.origin) // self.step))
+        last = self._rows if end is None else max(0, min(self._rows, -(-(end - self.origin) // self.step)))
+        return first + np.flatnonzero(self._present[first:last])
+
+    def item(self, item_id: int, start: int = None, end: int = None) -> SeriesTable:
+        """
+        Read the history of one item.
+
+        Args:
+            item_id (int): The item ID.
+            start (int, optional): The first UNIX timestamp to read, inclusive. Default is the first bucket.
+            end (int, optional): The last UNIX timestamp to read, exclusive. Default is the last bucket.
+
+        Returns:
+            :obj:`SeriesTable`: The stored buckets of the item. Prices are masked where the item was not traded.
+        """
+        rows = self._rows_between(start, end)
+        slot = self._slot_of.get(int(item_id))
+
+        columns = {}
+        for field in SERIES_FIELDS:
+            values = self._columns[field][rows, slot] if slot is not None and len(rows) else \
+                np.zeros(len(rows), dtype=COLUMN_DTYPES[field])
+            values = np.asarray(values, dtype=np.int64)
+            columns[field] = np.ma.masked_equal(values, 0) if field.startswith('avg') else np.ma.MaskedArray(values)
+
+        return SeriesTable(self.origin + rows * self.step if len(rows) else rows, columns, step=self.step)
+
+    def window(self, start: int = None, end: int = None) -> dict:
+        """
+        Read every item over a period of time.
+
+        Args:
+            start (int, optional): The first UNIX timestamp to read, inclusive. Default is the first bucket.
+            end (int, optional): The last UNIX timestamp to read, exclusive. Default is the last bucket.
+
+        Returns:
+            dict: ``'timestamp'`` (one per row), ``'id'`` (one per column), and a 2D masked array of each of
+            ``SERIES_FIELDS`` with one row per bucket and one column per item.
+        """
+        rows = self._rows_between(start, end)
+        width = len(self._items)
+
+        result = {
+            'timestamp': self.origin + rows * self.step if len(rows) else rows,
+            'id': np.array(self._items, dtype=np.int64),
+        }
+        for field in SERIES_FIELDS:
+            if len(rows):
+                values = np.asarray(self._columns[field][rows[0]:rows[-1] + 1, :width])[rows - rows[0]]
+            else:
+                values = np.zeros((0, width), dtype=COLUMN_DTYPES[field])
+            result[field] = np.ma.masked_equal(values, 0) if field.startswith('avg') else np.ma.MaskedArray(values)
+        return result
+
+    def snapshot(self, timestamp: int) -> PriceTable:
+        """
+        Read every item in one bucket, in the same form as ``AvgPrice.to_table()``.
+
+        Args:
+            timestamp (int): The UNIX timestamp of the bucket.
+
+        Returns:
+            :obj:`PriceTable`: The average prices and volumes of every item, indexed by item ID.
+        """
+        row = self._row(timestamp) if self.origin is not None else self._rows
+        if row >= self._rows or not self._present[row]:
+            raise KeyError(f'Bucket {timestamp} is not in the store')
+
+        ids = np.array(self._items, dtype=np.int64)
+        size = int(ids.max()) + 1
+        columns = {}
+        for field in SERIES_FIELDS:
+            data = np.zeros(size, dtype=np.int64)
+            data[ids] = self._columns[field][row, :len(ids)]
+            if field.startswith('avg'):
+                mask = data == 0
+            else:
+                mask = np.ones(size, dtype=bool)
+                mask[ids] = False
+            columns[field] = np.ma.MaskedArray(data, mask=mask)
+        return PriceTable(columns, high='avgHighPrice', low='avgLowPrice')
@@ -0,0 +1,73 @@
+# rswiki_wrapper/stream.py
+# Contains the incremental JSON scanner used to stream large responses
+
+import json
+import re
+
+# The characters that open or close a container or start a string
+_TOKEN = re.compile(rb'[{}\[\]"]')
+# A complete JSON string, including escaped quotes
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+def iter_members(chunks, depth: int):
+    """
+    Scan a JSON document as its chunks arrive and yield each object found at one nesting ``depth``, without decoding
+    the rest of the document. Only the object being read and the current chunk are held in memory.
+
+    For example, the records of ``{"data": {"2": {...}, "6": {...}}}`` are at depth ``2``, and the items of
+    ``[{...}, {...}]`` are at depth ``1``.
+
+    Args:
+        chunks (iterable): The raw bytes of the document, in order, such as ``Response.iter_content()``.
+        depth (int): The number of containers enclosing the objects to yield.
+
+    Yields:
+        tuple: ``(key, body)``, where ``key`` is the member name of the object (``None`` inside an array) and ``body``
+        is the raw bytes of the object, ready to be decoded.
+    """
+    buffer = b''
+    pos = 0
+    level = 0
+    start = None
+    key = None
+
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            match = _TOKEN.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+
+            i = match.start()
+            char = buffer[i:i + 1]
+            if char == b'"':
+                string = _STRING.match(buffer, i)
+                if string is None:
+                    # The string continues in the next chunk
+                    pos = i
+                    break
+                pos = string.end()
+                if level == depth and start is None:
+                    key = string.group()
+                continue
+
+            pos = i + 1
+            if char in b'{[':
+                if level == depth and start is None and char == b'{':
+                    start = i
+                level += 1
+            else:
+                level -= 1
+                if level == depth and start is not None:
+                    yield (None if key is None else json.loads(key)), buffer[start:pos]
+                    start = None
+                    key = None
+
+        # Drop everything already scanned, keeping the start of an unfinished object
+        cut = pos if start is None else start
+        buffer = buffer[cut:]
+        pos -= cut
+        if start is not None:
+            start = 0
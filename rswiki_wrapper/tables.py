@@ -0,0 +1,348 @@
+# rswiki_wrapper/tables.py
+# Contains NumPy-backed representations of real-time price content
+
+# NumPy is imported by _require_numpy() on first use, so that importing the query classes stays fast
+np = None
+
+# The Grand Exchange tax on the sell price of an item, and the largest tax paid on one item
+GE_TAX_RATE = 0.02
+GE_TAX_CAP = 5000000
+
+# The length in seconds of each real-time price bucket
+TIMESTEP_SECONDS = {
+    '5m': 300,
+    '1h': 3600,
+    '6h': 21600,
+    '24h': 86400,
+}
+
+# The columns of a time-series, other than the timestamp
+SERIES_FIELDS = ['avgHighPrice', 'avgLowPrice', 'highPriceVolume', 'lowPriceVolume']
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('Price tables require numpy. Install it with pip install rswiki-wrapper[numpy]') from None
+        np = numpy
+    return np
+
+
+def _seconds(timestep) -> int:
+    return TIMESTEP_SECONDS[timestep] if isinstance(timestep, str) else int(timestep)
+
+
+class PriceTable(object):
+    """
+    A columnar, array-backed view of ``Latest`` or ``AvgPrice`` content. Each column is a dense NumPy masked array
+    indexed by item ID, so ``table['high'][4151]`` is the price of item 4151, and items that are missing or have no
+    value for a column are masked. Arithmetic on the columns is vectorized across the whole market.
+
+    Tables are normally created with ``Latest.to_table()`` or ``AvgPrice.to_table()``.
+
+    Args:
+        columns (dict): The masked array of each column, keyed by column name. All columns have the same length.
+        high (str, optional): The column holding the instant-buy price. Default is ``'high'``.
+        low (str, optional): The column holding the instant-sell price. Default is ``'low'``.
+
+    Attributes:
+        columns (dict): The masked array of each column.
+        ids (:obj:`ndarray`): The item IDs present in the content, in ascending order.
+
+    Note:
+        This class requires ``numpy``, installed with ``pip install rswiki-wrapper[numpy]``.
+
+    Example:
+        Finding the items with the largest after-tax flip profit::
+
+            >>> table = Latest(user_agent='My Project - me@example.com').to_table()
+            >>> profit = table.profit()
+            >>> best = profit.argsort(endwith=False)[::-1][:5]
+            >>> profit[best]
+    """
+
+    def __init__(self, columns: dict, high: str = 'high', low: str = 'low'):
+        _require_numpy()
+
+        self.columns = columns
+        self.high = high
+        self.low = low
+
+        present = np.zeros(len(next(iter(columns.values()))) if columns else 0, dtype=bool)
+        for column in columns.values():
+            present |= ~np.ma.getmaskarray(column)
+        self.ids = np.flatnonzero(present)
+
+    @classmethod
+    def from_content(cls, content: dict, fields: list[str], high: str = 'high', low: str = 'low'):
+        """
+        Build a table from content keyed by item ID, such as ``Latest.content`` or ``AvgPrice.content``.
+
+        Args:
+            content (dict): The content to convert. Keys are item IDs and values are dicts of fields.
+            fields (list[str]): The fields to store as columns.
+            high (str, optional): The column holding the instant-buy price. Default is ``'high'``.
+            low (str, optional): The column holding the instant-sell price. Default is ``'low'``.
+
+        Returns:
+            :obj:`PriceTable`: The table.
+        """
+        _require_numpy()
+
+        ids = np.fromiter((int(item_id) for item_id in content), dtype=np.int64, count=len(content))
+        size = int(ids.max()) + 1 if len(ids) else 0
+        rows = list(content.values())
+
+        columns = {}
+        for field in fields:
+            values = [row.get(field) for row in rows]
+            found = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+
+            data = np.zeros(size, dtype=np.int64)
+            mask = np.ones(size, dtype=bool)
+            data[ids[found]] = [value for value in values if value is not None]
+            mask[ids[found]] = False
+            columns[field] = np.ma.MaskedArray(data, mask=mask)
+
+        return cls(columns, high=high, low=low)
+
+    def __getitem__(self, column: str):
+        return self.columns[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def spread(self):
+        """
+        The difference between the instant-buy and instant-sell price of every item.
+
+        Returns:
+            :obj:`MaskedArray`: The spread, indexed by item ID.
+        """
+        return self.columns[self.high] - self.columns[self.low]
+
+    def margin(self):
+        """
+        The spread of every item as a fraction of its instant-sell price.
+
+        Returns:
+            :obj:`MaskedArray`: The relative margin, indexed by item ID. Items with a price of 0 are masked.
+        """
+        low = self.columns[self.low]
+        return self.spread() / np.ma.masked_equal(low, 0)
+
+    def tax(self, tax_rate: float = GE_TAX_RATE, tax_cap: int = GE_TAX_CAP, exempt: list = None):
+        """
+        The Grand Exchange tax paid when selling every item at its instant-buy price.
+
+        Args:
+            tax_rate (float, optional): The fraction of the sell price paid as tax. Default is ``GE_TAX_RATE``.
+            tax_cap (int, optional): The largest tax paid on one item. Default is ``GE_TAX_CAP``.
+            exempt (list, optional): Item IDs that are not taxed.
+
+        Returns:
+            :obj:`MaskedArray`: The tax, indexed by item ID.
+        """
+        tax = np.ma.minimum(np.ma.floor(self.columns[self.high] * tax_rate), tax_cap).astype(np.int64)
+        if exempt:
+            exempt = np.asarray(exempt, dtype=np.int64)
+            tax[exempt[exempt < len(tax)]] = 0
+        return tax
+
+    def profit(self, tax_rate: float = GE_TAX_RATE, tax_cap: int = GE_TAX_CAP, exempt: list = None):
+        """
+        The profit of buying every item at its instant-sell price and selling it at its instant-buy price, after tax.
+
+        Args:
+            tax_rate (float, optional): The fraction of the sell price paid as tax. Default is ``GE_TAX_RATE``.
+            tax_cap (int, optional): The largest tax paid on one item. Default is ``GE_TAX_CAP``.
+            exempt (list, optional): Item IDs that are not taxed.
+
+        Returns:
+            :obj:`MaskedArray`: The profit per item, indexed by item ID.
+        """
+        return self.spread() - self.tax(tax_rate, tax_cap, exempt)
+
+    def volume_weighted_price(self):
+        """
+        The average of the instant-buy and instant-sell prices of every item, weighted by their volumes. Only
+        available for ``AvgPrice`` tables.
+
+        Returns:
+            :obj:`MaskedArray`: The volume-weighted price, indexed by item ID. Items without volume are masked.
+        """
+        high_volume = self.columns['highPriceVolume']
+        low_volume = self.columns['lowPriceVolume']
+
+        # A price with no volume is missing, so it contributes nothing to the weighted sum
+        traded = high_volume.filled(0) * self.columns[self.high].filled(0) \
+            + low_volume.filled(0) * self.columns[self.low].filled(0)
+        volume = high_volume.filled(0) + low_volume.filled(0)
+        return traded / np.ma.masked_equal(volume, 0)
+
+
+class SeriesTable(object):
+    """
+    A columnar, array-backed view of ``TimeSeries`` content. The ``timestamp`` column is an integer array and the
+    price and volume columns are NumPy masked arrays, with missing prices masked. Resampling to a longer timestep and
+    volume-weighted rollups are vectorized, so thousands of series can be processed without Python loops.
+
+    Tables are normally created with ``TimeSeries.to_table()``.
+
+    Args:
+        timestamp (:obj:`ndarray`): The UNIX timestamp of each point, in ascending order.
+        columns (dict): The masked array of each of ``SERIES_FIELDS``, aligned with ``timestamp``.
+        step (int or str, optional): The timestep of the series, in seconds or as ``'5m'``, ``'1h'``, ``'6h'`` or
+            ``'24h'``. Default is ``None`` (inferred from the smallest distance between points).
+
+    Attributes:
+        timestamp (:obj:`ndarray`): The UNIX timestamp of each point.
+        columns (dict): The masked array of each column.
+        step (int): The timestep of the series in seconds.
+
+    Note:
+        This class requires ``numpy``, installed with ``pip install rswiki-wrapper[numpy]``.
+
+    Example:
+        Rolling a 5 minute series up to hourly volume-weighted prices::
+
+            >>> series = TimeSeries(id='2', timestep='5m', user_agent='My Project - me@example.com').to_table()
+            >>> hourly = series.resample('1h')
+            >>> hourly['highPriceVolume'][-1], hourly.vwap()[-1]
+    """
+
+    def __init__(self, timestamp, columns: dict, step=None):
+        _require_numpy()
+
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.columns = columns
+        if step is None:
+            gaps = np.diff(self.timestamp)
+            step = int(gaps.min()) if len(gaps) else 0
+        self.step = _seconds(step)
+
+    @classmethod
+    def from_content(cls, content: list, step=None):
+        """
+        Build a table from ``TimeSeries.content``.
+
+        Args:
+            content (list): A list of points, each a dict with a ``'timestamp'`` and the ``SERIES_FIELDS``.
+            step (int or str, optional): The timestep of the series. Default is ``None`` (inferred).
+
+        Returns:
+            :obj:`SeriesTable`: The table, sorted by timestamp.
+        """
+        _require_numpy()
+
+        timestamp = np.fromiter((point['timestamp'] for point in content), dtype=np.int64, count=len(content))
+        order = np.argsort(timestamp, kind='stable')
+
+        columns = {}
+        for field in SERIES_FIELDS:
+            values = [point.get(field) for point in content]
+            mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+            data = np.fromiter((0 if value is None else value for value in values), dtype=np.int64,
+                               count=len(values))
+            columns[field] = np.ma.MaskedArray(data, mask=mask)[order]
+
+        return cls(timestamp[order], columns, step=step)
+
+    def __getitem__(self, column: str):
+        if column == 'timestamp':
+            return self.timestamp
+        return self.columns[column]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def vwap(self):
+        """
+        The average of the instant-buy and instant-sell prices at each point, weighted by their volumes.
+
+        Returns:
+            :obj:`MaskedArray`: The volume-weighted price of each point. Points without volume are masked.
+        """
+        high, low = self.columns['avgHighPrice'], self.columns['avgLowPrice']
+        high_volume = np.where(np.ma.getmaskarray(high), 0, self.columns['highPriceVolume'].filled(0))
+        low_volume = np.where(np.ma.getmaskarray(low), 0, self.columns['lowPriceVolume'].filled(0))
+
+        traded = high.filled(0) * high_volume + low.filled(0) * low_volume
+        return traded / np.ma.masked_equal(high_volume + low_volume, 0)
+
+    def resample(self, timestep):
+        """
+        Roll the series up to a longer timestep. Volumes are summed over each new bucket, and prices are the
+        volume-weighted average of the points in the bucket. Buckets are aligned to multiples of the timestep since
+        the UNIX epoch, like the buckets of the API.
+
+        Args:
+            timestep (int or str): The new timestep, in seconds or as ``'1h'``, ``'6h'`` or ``'24h'``. It must be a
+                multiple of the current timestep.
+
+        Returns:
+            :obj:`SeriesTable`: The resampled series, with float prices.
+        """
+        step = _seconds(timestep)
+        assert self.step == 0 or step % self.step == 0, 'The new timestep must be a multiple of the current timestep'
+
+        buckets, inverse = np.unique(self.timestamp // step * step, return_inverse=True)
+        size = len(buckets)
+
+        columns = {}
+        for price, volume in (('avgHighPrice', 'highPriceVolume'), ('avgLowPrice', 'lowPriceVolume')):
+            prices = self.columns[price]
+            volumes = self.columns[volume].filled(0)
+            # A missing price carries no weight, even if a volume was reported with it
+            weights = np.where(np.ma.getmaskarray(prices), 0, volumes)
+
+            weighted = np.bincount(inverse, weights=prices.filled(0) * weights, minlength=size)
+            total = np.bincount(inverse, weights=weights, minlength=size)
+            columns[price] = weighted / np.ma.masked_equal(total, 0)
+            columns[volume] = np.ma.MaskedArray(np.bincount(inverse, weights=volumes, minlength=size)
+                                                .astype(np.int64))
+
+        return SeriesTable(buckets, columns, step=step)
+
+    def fill_gaps(self, method: str = None):
+        """
+        Insert the points missing from the series, so that the timestamps form a continuous grid of ``step``.
+
+        Args:
+            method (str, optional): ``None`` to mask the prices of inserted points, or ``'ffill'`` to carry the
+                last known price forward. Volumes of inserted points are always ``0``.
+
+        Returns:
+            :obj:`SeriesTable`: The continuous series.
+        """
+        if len(self) == 0 or self.step == 0:
+            return self
+
+        timestamp = np.arange(self.timestamp[0], self.timestamp[-1] + 1, self.step, dtype=np.int64)
+        index = (self.timestamp - self.timestamp[0]) // self.step
+
+        columns = {}
+        for field, column in self.columns.items():
+            data = np.zeros(len(timestamp), dtype=column.dtype)
+            mask = np.ones(len(timestamp), dtype=bool)
+            data[index] = column.filled(0)
+            mask[index] = np.ma.getmaskarray(column)
+
+            if field.endswith('Volume'):
+                columns[field] = np.ma.MaskedArray(data)
+                continue
+
+            if method == 'ffill':
+                # Index of the last unmasked point at or before each position
+                last = np.maximum.accumulate(np.where(mask, 0, np.arange(len(mask))))
+                data = data[last]
+                mask = mask[last]
+            columns[field] = np.ma.MaskedArray(data, mask=mask)
+
+        return SeriesTable(timestamp, columns, step=self.step)
@@ -1,9 +1,30 @@
 # rswiki_wrapper/wiki.py
 # Contains generic functions for RS Wiki API calls
 
-import requests
+import itertools
 import json
-from time import sleep
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+from urllib.parse import quote
+
+from .client import WikiClient, get_default_client
+from .decode import decode_json
+
+# The markers SMWbrowse adds to the end of each data item, such as '#0##' for a page
+_DATAITEM_MARKER = re.compile(r'#(?:0|6|14)##')
+
+# The human-readable names of the special SMW properties
+PROPERTY_NAMES = {
+    "_INST": "Category",
+    "_MDAT": "Modification Date",
+    "_SKEY": "Name",
+    "_SOBJ": "Subobject"
+}
+
+# The longest pipe-joined ``id`` or ``name`` value sent in one Exchange 'latest' request, after URL encoding
+MAX_LATEST_LENGTH = 1500
 
 
 class WikiQuery(object):
@@ -16,14 +37,33 @@ class WikiQuery(object):
         url (str, optional): The URL of the API endpoint to query.
         user_agent (str, optional): The user agent string to use for the request. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with. Default is the shared
+            client returned by ``get_default_client()``.
         ``**kwargs``: Additional parameters to include in the query. See child classes for required kwargs.
 
     Attributes:
         headers (dict): The headers sent with the request object. Created from ``user_agent``
+        client (:obj:`WikiClient`): The HTTP client used for the request.
+        url (str): The URL of the API endpoint being queried.
+        params (dict): The query string parameters sent with the request.
         response (:obj:`Response`): The response object provided by the ``requests`` library.
+        decoder (callable): The function that decodes raw response bytes into ``.json``. Default is ``decode_json``,
+            which uses ``orjson`` when it is installed. Replace it on a class to plug in another parser.
+        hedge (float): Seconds after which an unanswered request is sent a second time. See ``WikiClient.get()``.
+            Default is ``None`` (no hedging).
     """
-
-    def __init__(self, url: str = None, user_agent: str = 'RS Wiki API Python Wrapper - Default', **kwargs):
+    decoder = staticmethod(decode_json)
+    hedge = None
+    # The expiry policy used by a client's ``MemoryCache``. Child classes whose responses can be shared between callers
+    # define it as a method ``_cache_expiry(now, ttl)`` returning the UNIX time the response expires at. Queries
+    # without one are sent without looking in the memory cache.
+    _cache_expiry = None
+    # Whether responses are kept in a client's ``DiskCache`` and revalidated with conditional requests. Only
+    # slow-changing endpoints turn it on, so that polled routes are not rewritten to disk on every request.
+    _revalidate = False
+
+    def __init__(self, url: str = None, user_agent: str = 'RS Wiki API Python Wrapper - Default',
+                 client: WikiClient = None, **kwargs):
         """
         Constructor method
         """
@@ -36,9 +76,36 @@ class WikiQuery(object):
         self.headers = {
             'User-Agent': user_agent
         }
+        self.client = client if client is not None else get_default_client()
+        self.url = url
+        self.params = kwargs
+
+        # Non-blocking clients (see ``rswiki_wrapper.aio`` and ``rswiki_wrapper.plan``) send the request later and
+        # then call ``_parse()``
+        if url is not None and self.client.blocking:
+            self.update(url, **kwargs)
+            self._parse()
+        elif url is not None:
+            self._defer(url, **kwargs)
+
+    def _defer(self, url, **kwargs) -> bool:
+        """
+        Hand the request to a deferring client, such as a ``QueryPlan``, instead of sending it now.
 
-        if url is not None:
-            self.response = requests.get(url, headers=self.headers, params=kwargs)
+        Args:
+            url (str): The URL of the API endpoint to query.
+            ``**kwargs``: The query string parameters.
+
+        Returns:
+            bool: Whether the request was deferred. Blocking clients send requests at once and return ``False``.
+        """
+        defer = getattr(self.client, 'defer', None)
+        if self.client.blocking or defer is None:
+            return False
+        self.url = url
+        self.params = kwargs
+        defer(self)
+        return True
 
     def update(self, url, **kwargs):
         """
@@ -48,7 +115,44 @@ class WikiQuery(object):
             url (str): The URL of the API endpoint to query.
             ``**kwargs``: Additional parameters to include in the query. See child classes for required kwargs.
         """
-        self.response = requests.get(url, headers=self.headers, params=kwargs)
+        self.url = url
+        self.params = kwargs
+        if self.hedge is None:
+            self.response = self.client.get(url, headers=self.headers, params=kwargs, expiry=self._cache_expiry,
+                                            revalidate=self._revalidate)
+        else:
+            self.response = self.client.get(url, headers=self.headers, params=kwargs, expiry=self._cache_expiry,
+                                            revalidate=self._revalidate, hedge=self.hedge)
+
+    def _decode(self, response=None):
+        """
+        Decode the JSON body of a response from its raw bytes with ``self.decoder``.
+
+        Args:
+            response (:obj:`Response`, optional): The response to decode. Default is ``self.response``.
+
+        Returns:
+            The decoded JSON document.
+        """
+        response = self.response if response is None else response
+        metrics = getattr(self.client, 'metrics', None)
+        started = perf_counter()
+        try:
+            document = self.decoder(response.content)
+        except ValueError:
+            # An error page such as a 429 or 503 is not JSON; report the status rather than the parse failure
+            response.raise_for_status()
+            raise
+        if metrics is not None:
+            metrics.observe_phase(self.url or response.url, 'decode', perf_counter() - started)
+        return document
+
+    def _parse(self):
+        """
+        Build the ``.json`` and ``.content`` attributes from ``self.response``. Child classes override this method to
+        shape the content of their route; the base class keeps only the raw response.
+        """
+        pass
 
 
 class WeirdGloop(WikiQuery):
@@ -62,6 +166,7 @@ class WeirdGloop(WikiQuery):
         endpoint (str): The endpoint of the Weird Gloop API to query.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
         ``**kwargs``: Additional keyword arguments to pass, depending on the specific query
 
     Attributes:
@@ -69,12 +174,12 @@ class WeirdGloop(WikiQuery):
         response (:obj:`Response`): The response object provided by the ``requests`` library.
     """
 
-    def __init__(self, route: str, game:str, endpoint: str, user_agent: str, **kwargs):
+    def __init__(self, route: str, game:str, endpoint: str, user_agent: str, client: WikiClient = None, **kwargs):
         # https://api.weirdgloop.org/#/ for full documentation
 
         base_url = 'https://api.weirdgloop.org/' + route + game + '/' + endpoint
 
-        super().__init__(base_url, user_agent, **kwargs)
+        super().__init__(base_url, user_agent, client=client, **kwargs)
 
 
 class Exchange(WeirdGloop):
@@ -88,22 +193,30 @@ class Exchange(WeirdGloop):
             ``'last90d'``, and ``'sample'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
+
+        workers (int, optional): The number of requests sent at once when a list of items is split into several
+            requests. Default is ``4``.
+        chunk_size (int, optional): The largest number of items sent in one request. Default is ``100``.
 
     Keyword Args:
-        id (str): The itemID or a trade index like *GE Common Trade Index*
-        name (str): The exact Grand Exchange item name.
+        id (str or list): The itemID or a trade index like *GE Common Trade Index*
+        name (str or list): The exact Grand Exchange item name.
 
     Note:
         * Only ``id`` or ``name`` can be provided as kwargs, not both.
 
-        * If using the ``latest`` endpoint, multiple items can be specified using pipes "|" like ``id='2|6'``
+        * If using the ``latest`` endpoint, multiple items can be specified using pipes "|" like ``id='2|6'``, or as a
+          list like ``id=['2', '6']``. A list is split into requests of at most ``chunk_size`` items and a bounded URL
+          length, which are sent concurrently and merged into one ``content``.
 
         * If using ``all``, ``last90d``, and ``sample`` endpoints, multiple item ID or names cannot be provided.
 
     Attributes:
         headers (dict): The headers sent with the request object. Created from ``user_agent``
         response (:obj:`Response`): The response object provided by the ``requests`` library.
-        json (dict): The raw JSON formatted response from the API
+        responses (list): Every response of the query, one per request sent.
+        json (dict): The raw JSON formatted response from the API, merged across requests.
         content (dict): The parsed content of the request. Formatted as follows. ``item`` is either the item name or
             item ID that you provided to the request.
             Sample content format::
@@ -129,20 +242,89 @@ class Exchange(WeirdGloop):
             >>> query.content['2'][0]['id']
             '2'
 
+        Example pricing a list of items with the ``latest`` endpoint::
+
+            >>> query = Exchange('rs', 'latest', user_agent='My Project - me@example.com', id=catalogue_ids)
+            >>> len(query.responses)
+            4
+
         Example usage of ``all`` endpoint::
 
             >>> query = Exchange('osrs', 'all', user_agent='My Project - me@example.com', name='Coal')
             >>> query.content['Coal'][0]['id']
             '453'
     """
-    def __init__(self, game, endpoint, user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
+    def __init__(self, game, endpoint, user_agent='RS Wiki API Python Wrapper - Default', client=None, workers=4,
+                 chunk_size=100, **kwargs):
         # https://api.weirdgloop.org/#/ for full documentation
 
-        super().__init__('exchange/history/', game, endpoint, user_agent, **kwargs)
-        self.json = self.response.json()
+        self.endpoint = endpoint
+        self.workers = workers
+        self.chunk_size = chunk_size
+        super().__init__('exchange/history/', game, endpoint, user_agent, client=client, **kwargs)
+
+    def update(self, url, **kwargs):
+        """
+        Refresh the query with a new URL and additional parameters. Updates the ``self.response`` and
+        ``self.responses`` attributes, sending one request per chunk of a list of items.
+
+        Args:
+            url (str): The URL of the API endpoint to query.
+            ``**kwargs``: Additional parameters to include in the query.
+        """
+        self.url = url
+        self.params = kwargs
+        chunks = self._param_chunks()
+
+        def fetch(params):
+            return self.client.get(url, headers=self.headers, params=params, expiry=self._cache_expiry,
+                                   revalidate=self._revalidate)
+
+        if len(chunks) == 1:
+            self.responses = [fetch(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(chunks)))) as pool:
+                self.responses = list(pool.map(fetch, chunks))
+        self.response = self.responses[-1]
+
+    def _param_chunks(self) -> list:
+        """
+        Split the ``id`` or ``name`` list of ``self.params`` into the params of each request. Each request holds at most
+        ``chunk_size`` items, pipe-joined into a value of at most ``MAX_LATEST_LENGTH`` characters once URL encoded.
+
+        Returns:
+            list: The params of each request. A single item of ``self.params`` if it holds no list.
+        """
+        key = next((key for key in ('id', 'name') if isinstance(self.params.get(key), (list, tuple))), None)
+        if key is None:
+            return [self.params]
+        assert self.endpoint == 'latest', 'A list of items can only be queried with the latest endpoint'
+        assert len(self.params[key]) > 0, 'The list of items is empty'
+
+        chunks = []
+        items, length = [], 0
+        for item in self.params[key]:
+            item = str(item)
+            # Each item after the first adds an encoded pipe, '%7C'
+            item_length = len(quote(item, safe='')) + (3 if items else 0)
+            if items and (len(items) >= self.chunk_size or length + item_length > MAX_LATEST_LENGTH):
+                chunks.append(items)
+                items, length = [], 0
+                item_length -= 3
+            items.append(item)
+            length += item_length
+        if items:
+            chunks.append(items)
+
+        return [dict(self.params, **{key: '|'.join(chunk)}) for chunk in chunks]
+
+    def _parse(self):
+        self.json = {}
+        for response in getattr(self, 'responses', None) or [self.response]:
+            self.json.update(self._decode(response))
 
         self.content = self.json
-        if endpoint == 'latest':
+        if self.endpoint == 'latest':
             # To standardize the format of content
             self.content = {key: [value] for key, value in self.content.items()}
 
@@ -157,6 +339,7 @@ class Runescape(WeirdGloop):
             ``'social'``, ``'social/last'``, ``'tms/current'``, ``'tms/next'``, and ``'tms/search'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
 
     Keyword Args:
         lang (str): Required for ``'tms/current'`` and ``'tms/next'`` endpoints. Optional for ``'tms/search'``. Valid
@@ -193,7 +376,7 @@ class Runescape(WeirdGloop):
             dict_keys(['id', 'url', 'title', 'excerpt', 'author', 'curator', 'source', 'image', 'icon', 'expiryDate', 'datePublished', 'dateAdded'])
     """
 
-    def __init__(self, endpoint, user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
+    def __init__(self, endpoint, user_agent='RS Wiki API Python Wrapper - Default', client=None, **kwargs):
         # Used for the general endpoints for Runescape information
 
         if endpoint == 'tms/search':
@@ -203,9 +386,10 @@ class Runescape(WeirdGloop):
                 self.content = None
                 return
 
-        super().__init__('runescape/', game="", endpoint=endpoint, user_agent=user_agent, **kwargs)
+        super().__init__('runescape/', game="", endpoint=endpoint, user_agent=user_agent, client=client, **kwargs)
 
-        self.json = self.response.json()
+    def _parse(self):
+        self.json = self._decode()
 
         # tms data can be a list or dict, depending on the kwargs used in lang
         if isinstance(self.json, list):
@@ -250,6 +434,7 @@ class MediaWiki(WikiQuery):
         game (str, optional): The game RSWiki should refer to. Valid options are ``'osrs'`` or ``'rs3'``.
         user_agent (str): The user agent string to use in the query. Default is
             ``'RS Wiki API Python Wrapper - Default'``.
+        client (:obj:`WikiClient`, optional): The pooled HTTP client to send the request with.
 
     Attributes:
         headers (dict): The headers sent with the request object. Created from ``user_agent``
@@ -259,7 +444,7 @@ class MediaWiki(WikiQuery):
             to the json content. If created via the built-in methods, it will be formatted to contain the requested
             data with minimal data wrangling required.
     """
-    def __init__(self, game, user_agent='RS Wiki API Python Wrapper - Default', **kwargs):
+    def __init__(self, game, user_agent='RS Wiki API Python Wrapper - Default', client=None, **kwargs):
         assert game in ['osrs', 'rs3'], 'Invalid game; choose osrs or rs3'
 
         if game == 'osrs':
@@ -267,14 +452,16 @@ class MediaWiki(WikiQuery):
         else:
             self.base_url = 'https://runescape.wiki/api.php'
 
+        self.json = None
+        self.content = None
         if kwargs:
-            super().__init__(self.base_url, user_agent=user_agent, **kwargs)
-            self.json = self.response.json()
-            self.content = self.json
+            super().__init__(self.base_url, user_agent=user_agent, client=client, **kwargs)
         else:
-            super().__init__(user_agent=user_agent)
-            self.json = None
-            self.content = None
+            super().__init__(user_agent=user_agent, client=client)
+
+    def _parse(self):
+        self.json = self._decode()
+        self.content = self.json
 
     # Use the ASK route
     def ask(self, result_format: str = 'json', conditions: list[str] = None, printouts: list[str] = None,
@@ -310,6 +497,30 @@ class MediaWiki(WikiQuery):
             If trying to access the Production JSON or Exchange JSON information, use the included ``ask_production``
             and ``ask_exchange`` methods below, which make the result navigation much simpler.
         """
+        kwargs = self._ask_params(result_format, conditions, printouts, offset, **kwargs)
+        if not self._defer(self.base_url, **kwargs):
+            self._request(**kwargs)
+
+    def _request(self, **kwargs) -> None:
+        """
+        Send a request to the API at once, even with a deferring client, and decode it into ``.json``. Used by the
+        helpers whose next request depends on the last response.
+
+        Args:
+            ``**kwargs``: The params to send to the MediaWiki API.
+        """
+        self.update(self.base_url, **kwargs)
+        self.json = self._decode()
+
+    @staticmethod
+    def _ask_params(result_format: str = 'json', conditions: list[str] = None, printouts: list[str] = None,
+                    offset: str = None, **kwargs) -> dict:
+        """
+        Build the query parameters of an ASK request. See ``ask()`` for a description of the arguments.
+
+        Returns:
+            dict: The params to send to the MediaWiki API.
+        """
         kwargs['action'] = 'ask'
         kwargs['format'] = result_format
         if isinstance(conditions, list):
@@ -328,50 +539,186 @@ class MediaWiki(WikiQuery):
                 query_mod = f'|offset={offset}'
             kwargs['query'] = query + query_mod
 
-        # Send the ASK query to the API and update the response
-        self.update(self.base_url, **kwargs)
-        self.json = self.response.json()
+        return kwargs
 
-    def get_ask_content(self, conditions: list[str], printouts: list[str], get_all: bool = False) -> None:
+    def get_ask_content(self, conditions: list[str], printouts: list[str], get_all: bool = False, workers: int = 1,
+                        rate: float = 1) -> None:
         """
         A helper function to retrieve content from an ASK query in the MediaWiki API.
 
         Args:
             conditions (list[str]): The conditions to match in the ASK query.
             printouts (list[str]): The printouts (results) to provide from the ASK query.
-            get_all (bool, optional): Whether to retrieve all results from the ASK query recursively.
+            get_all (bool, optional): Whether to retrieve all results from the ASK query by following the
+                continuation offset.
+            workers (int, optional): The number of result pages to request at once when ``get_all`` is used. Default
+                is ``1`` (one page after another).
+            rate (float, optional): The budget of requests per second when ``workers`` is above ``1``. Default is
+                ``1``. See ``WikiClient.map_limited()``.
 
         Warning:
-            Using get_all will recursively retrieve all results of the query. For some queries such as getting all
+            Using get_all will retrieve all results of the query. For some queries such as getting all
             production JSON information for all items, this results in a long wait to retrieve the results. This is
-            because the wrapper has a limit of 1 query/second when recursively following the results to reduce load
-            on the API.
+            because the wrapper has a limit of 1 query/second when following the results to reduce load
+            on the API, unless the client has a ``rate_limiter``. To process results as they arrive instead, use
+            ``iter_ask()``.
+        """
+        self._add_ask_results(printouts)
+
+        # If we want to retrieve all results and the query has more than the default limit of 50 results
+        offset = self.json.get('query-continue-offset')
+        if get_all and offset is not None:
+            if workers > 1:
+                self._get_ask_pages_concurrent(conditions, printouts, int(offset), workers, rate)
+                return
+
+            # Sleep 1s to limit hits to API
+            self._pause(1 / rate)
+            for page in self.iter_ask(conditions, printouts, offset=offset, delay=1 / rate):
+                self.content.update(page)
+
+    def _get_ask_pages_concurrent(self, conditions: list[str], printouts: list[str], offset: int, workers: int,
+                                  rate: float) -> None:
+        """
+        Request the remaining pages of the ASK query in ``.json`` with up to ``workers`` pages in flight at a time, and
+        merge them into ``.content`` in offset order. The API does not report the total number of results, so pages
+        are requested speculatively from the page size. Each page past the end would be a wasted request, so the
+        number of pages requested ahead doubles with every full page returned, up to ``workers``, and no further page
+        is requested once the final page has arrived.
+
+        Args:
+            conditions (list[str]): The conditions to match in the ASK query.
+            printouts (list[str]): The printouts (results) to provide from the ASK query.
+            offset (int): The offset of the first page to request.
+            workers (int): The largest number of pages requested at once.
+            rate (float): The budget of requests per second shared by all workers.
+        """
+        # The page size is the distance between the current page and the next one
+        start = int(self.json['query'].get('meta', {}).get('offset', 0))
+        step = offset - start if offset > start else len(self.json['query']['results'])
+
+        def is_last(page) -> bool:
+            return page.get('query-continue-offset') is None or len(page['query']['results']) < step
+
+        progress = {'full': 0, 'done': False}
+        changed = threading.Condition()
+
+        def fetch(page_offset):
+            page = None
+            try:
+                params = self._ask_params(conditions=conditions, printouts=printouts, offset=str(page_offset))
+                page = self._decode(self.client.get(self.base_url, headers=self.headers, params=params))
+                return page
+            finally:
+                # A failed request ends the pages too, since its error is raised to the caller
+                with changed:
+                    if page is None or is_last(page):
+                        progress['done'] = True
+                    else:
+                        progress['full'] += 1
+                    changed.notify_all()
+
+        def offsets():
+            for n in itertools.count():
+                with changed:
+                    changed.wait_for(lambda: progress['done'] or n < 2 ** progress['full'])
+                    if progress['done']:
+                        return
+                yield offset + n * step
+
+        pages = self.client.map_limited(fetch, offsets(), workers, rate)
+        try:
+            for page_offset, future in pages:
+                page = future.result()
+                self.content.update(self._parse_ask_results(page, printouts))
+                if is_last(page):
+                    return
+        finally:
+            pages.close()
+
+    def iter_ask(self, conditions: list[str], printouts: list[str], offset: str = None, delay: float = 1):
+        """
+        Page through the results of an ASK query, yielding the parsed results of one page at a time. Only the current
+        page is held in memory, and the next page is only requested when the consumer asks for it, so iteration can
+        be stopped early.
+
+        Args:
+            conditions (list[str]): The conditions to match in the ASK query.
+            printouts (list[str]): The printouts (results) to provide from the ASK query.
+            offset (str, optional): The offset in results to start from.
+            delay (float, optional): The seconds to wait between pages to reduce load on the API. Default is ``1``.
+                Ignored if the client has a ``rate_limiter``, which then paces the requests.
+
+        Yields:
+            dict: The results of one page, formatted like the ``.content`` of ``get_ask_content()``.
+
+        Example:
+            Example of processing Production JSON information for all items page by page::
+
+                >>> query = MediaWiki('osrs', user_agent='My Project - me@example.com')
+                >>> for page in query.iter_ask(['Production JSON::+'], ['Production JSON']):
+                >>>     for name, productions in page.items():
+                >>>         print(name, productions[0]['output']['cost'])
+        """
+        while True:
+            self._request(**self._ask_params(conditions=conditions, printouts=printouts, offset=offset))
+            yield self._parse_ask_results(self.json, printouts)
+
+            offset = self.json.get('query-continue-offset')
+            if offset is None:
+                return
+            self._pause(delay)
+
+    def _pause(self, seconds: float) -> None:
+        """
+        Wait between ASK pages to reduce load on the API. A client ``rate_limiter`` already paces every request, so
+        the fixed wait only applies to clients without one.
+
+        Args:
+            seconds (float): The seconds to wait.
+        """
+        if self.client.rate_limiter is None:
+            sleep(seconds)
+
+    def _add_ask_results(self, printouts: list[str]) -> None:
+        """
+        Parse the JSON printouts of the current ASK page in ``.json`` and add them to ``.content``.
+
+        Args:
+            printouts (list[str]): The printouts (results) provided by the ASK query.
+        """
+        self.content.update(self._parse_ask_results(self.json, printouts))
+
+    @staticmethod
+    def _parse_ask_results(ask_json: dict, printouts: list[str]) -> dict:
+        """
+        Parse the JSON printouts of one ASK page.
+
+        Args:
+            ask_json (dict): The JSON response of the ASK query.
+            printouts (list[str]): The printouts (results) provided by the ASK query.
+
+        Returns:
+            dict: The parsed printout values of each result, keyed by result name.
         """
+        results = {}
         # Iterate over the results of the query
-        for the_name, prods in self.json['query']['results'].items():
+        for the_name, prods in ask_json['query']['results'].items():
             # Initialize an empty list to store the printout values for this result
-            self.content[the_name] = []
+            results[the_name] = []
             # Iterate over the printouts for this result
             for printout in printouts:
                 # Iterate over the values for this printout
                 for prod in prods['printouts'][printout]:
                     # Append the parsed JSON value to the list
-                    self.content[the_name].append(json.loads(prod))
-
-        # If we want to retrieve all results and the query has more than the default limit of 50 results
-        if get_all and self.json.get('query-continue-offset') is not None:
-            # Sleep 1s to limit hits to API
-            sleep(1)
-            # Make another ASK query to retrieve the remaining results, using the provided offset
-            self.ask(conditions=conditions, printouts=printouts, offset=self.json.get('query-continue-offset'))
-            # Process the results of this additional query
-            self.get_ask_content(conditions, printouts, get_all)
+                    results[the_name].append(json.loads(prod))
+        return results
 
     # Helper function to format a production JSON query for a specific item or category
     # item can be 'Category:Items' or 'Cake' for example or None for all Production JSON
     # All is whether to get all items (aka continue past limit of 50 items per query)
     # Note: All=True may result in many queries
-    def ask_production(self, item: str = None, get_all: bool = False):
+    def ask_production(self, item: str = None, get_all: bool = False, workers: int = 1, rate: float = 1):
         """
         Makes a query to the MediaWiki API to retrieve production data for a given item or category of items.
 
@@ -380,6 +727,8 @@ class MediaWiki(WikiQuery):
                 ``'Category:X'``. If no name is provided, all items with a valid Production JSON will be returned.
             get_all (bool, optional): To recursively search for all matching items, or only provide the first page of
                 results, which by RSWiki convention is 50 results.
+            workers (int, optional): The number of result pages to request at once when ``get_all`` is used.
+            rate (float, optional): The budget of requests per second when ``get_all`` is used. Default is ``1``.
 
         Returns:
             None. Updates the ``.content`` attribute as follows. ``item`` is the name of the item provided in args or
@@ -435,18 +784,13 @@ class MediaWiki(WikiQuery):
             because the wrapper has a limit of 1 query/second when recursively following the results to reduce load
             on the API.
         """
-        if item is None:
-            conditions = ['Production JSON::+']
-        else:
-            conditions = [item, 'Production JSON::+']
-
-        printouts = ['Production JSON']
+        conditions, printouts = self._production_query(item)
         self.content = {}
 
-        self.ask(conditions=conditions, printouts=printouts)
-        self.get_ask_content(conditions, printouts, get_all)
+        self._request(**self._ask_params(conditions=conditions, printouts=printouts))
+        self.get_ask_content(conditions, printouts, get_all, workers=workers, rate=rate)
 
-    def ask_exchange(self, item: str = None, get_all: bool = False):
+    def ask_exchange(self, item: str = None, get_all: bool = False, workers: int = 1, rate: float = 1):
         """
         This method retrieves exchange data for the specified item or all items.
 
@@ -455,6 +799,8 @@ class MediaWiki(WikiQuery):
                 all items with a valid Exchange JSON will be returned.
             get_all (bool, optional): To recursively search for all matching items, or only provide the first page of
                 results, which by RSWiki convention is 50 results.
+            workers (int, optional): The number of result pages to request at once when ``get_all`` is used.
+            rate (float, optional): The budget of requests per second when ``get_all`` is used. Default is ``1``.
 
         Warning:
             Unlike the ask_production method, a category can not be specified. This is because the Exchange JSON is
@@ -496,16 +842,41 @@ class MediaWiki(WikiQuery):
             will result in a long wait to retrieve the results. This is because the wrapper has a limit of
             1 query/second when recursively following the results to reduce load on the API.
         """
+        conditions, printouts = self._exchange_query(item)
+        self.content = {}
+
+        self._request(**self._ask_params(conditions=conditions, printouts=printouts))
+        self.get_ask_content(conditions, printouts, get_all, workers=workers, rate=rate)
+
+    @staticmethod
+    def _production_query(item: str = None) -> tuple:
+        """
+        Build the ASK conditions and printouts used by ``ask_production()``.
+
+        Returns:
+            tuple: The ``(conditions, printouts)`` lists.
+        """
+        if item is None:
+            conditions = ['Production JSON::+']
+        else:
+            conditions = [item, 'Production JSON::+']
+
+        return conditions, ['Production JSON']
+
+    @staticmethod
+    def _exchange_query(item: str = None) -> tuple:
+        """
+        Build the ASK conditions and printouts used by ``ask_exchange()``.
+
+        Returns:
+            tuple: The ``(conditions, printouts)`` lists.
+        """
         if item is None:
             conditions = ['Exchange JSON::+']
         else:
             conditions = ['Exchange:' + item, 'Exchange JSON::+']
 
-        printouts = ['Exchange JSON']
-        self.content = {}
-
-        self.ask(conditions=conditions, printouts=printouts)
-        self.get_ask_content(conditions, printouts, get_all)
+        return conditions, ['Exchange JSON']
 
     def browse(self, result_format: str = 'json', format_version: str = 'latest', **kwargs) -> None:
         """
@@ -525,43 +896,53 @@ class MediaWiki(WikiQuery):
             If trying to browse for properties of pages ``(Special:Browse)`` the ``browse_properties()`` method will
             simplify the parsing of json content.
         """
+        kwargs = self._browse_params(result_format, format_version, **kwargs)
+        if not self._defer(self.base_url, **kwargs):
+            self._request(**kwargs)
+
+    @staticmethod
+    def _browse_params(result_format: str = 'json', format_version: str = 'latest', **kwargs) -> dict:
+        """
+        Build the query parameters of an SMWbrowse request. See ``browse()`` for a description of the arguments.
+
+        Returns:
+            dict: The params to send to the MediaWiki API.
+        """
         # Add required kwargs for this endpoint
         kwargs['action'] = 'smwbrowse'
         kwargs['format'] = result_format
         kwargs['formatversion'] = format_version
-
-        # Update the class and parse the json
-        self.update(self.base_url, **kwargs)
-        self.json = self.response.json()
+        return kwargs
 
     # Helper to sub out built-in property names to readable versions
     def _clean_properties(self):
         """
         Clean the property keys in the `content` attribute by renaming them to more human-readable names.
         """
-        property_map = {
-            "_INST": "Category",
-            "_MDAT": "Modification Date",
-            "_SKEY": "Name",
-            "_SOBJ": "Subobject"
-        }
-        for old, new in property_map.items():
-            if old in self.content:
-                self.content[new] = self.content.pop(old)
+        self._rename_properties(self.content, PROPERTY_NAMES)
 
     def _dirty_properties(self):
         """
         Revert the property keys in the `content` attribute to their original names.
         """
-        property_map = {
-            "Category": "_INST",
-            "Modification Date": "_MDAT",
-            "Name": "_SKEY",
-            "Subobject": "_SOBJ"
-        }
+        self._rename_properties(self.content, {new: old for old, new in PROPERTY_NAMES.items()})
+
+    @staticmethod
+    def _rename_properties(properties: dict, property_map: dict) -> dict:
+        """
+        Rename the keys of a properties dict in place.
+
+        Args:
+            properties (dict): The properties of a subject.
+            property_map (dict): The new name of each key to rename.
+
+        Returns:
+            dict: The same properties dict.
+        """
         for old, new in property_map.items():
-            if old in self.content:
-                self.content[new] = self.content.pop(old)
+            if old in properties:
+                properties[new] = properties.pop(old)
+        return properties
 
     def browse_properties(self, item: str):
         """
@@ -590,37 +971,100 @@ class MediaWiki(WikiQuery):
                 'Cooking_level', 'Default_version', 'Is_boostable', 'Is_members_only', 'Production_JSON', 'Store_price_delta',
                 'Uses_facility', 'Uses_material', 'Uses_skill', 'Version_count', 'Category', 'Modification Date', 'Name', 'Subobject'])
         """
-        # Format the subject for the API request
-        browse_subject = '{"subject":"' + item.replace(" ", "_") + '","ns":0,"iw":"","subobject":"","options":{' \
-                                                                   '"dir":null,"lang":"en-gb","group":null,' \
-                                                                   '"printable":null,"offset":null,"including":false,' \
-                                                                   '"showInverse":false,"showAll":true,' \
-                                                                   '"showGroup":true,"showSort":false,"api":true,' \
-                                                                   '"valuelistlimit.out":"30",' \
-                                                                   '"valuelistlimit.in":"20"}} '
-        self.content = {}
-
         # Make the API request and update the `self.json` attribute
-        self.browse(browse='subject', params=browse_subject)
+        self._request(**self._browse_params(browse='subject', params=self._browse_subject(item)))
+        self._parse_properties()
 
-        # Iterate through the retrieved data items and format them for the `self.content` attribute
-        for prop in self.json['query']['data']:
-            if len(prop['dataitem']) == 1:
-                # If there is only one data item, store it in a single string
-                temp_property = prop['dataitem'][0]['item'].replace("#6##", "").replace("#14##", "").replace("#0##", "")
+    def browse_properties_many(self, items: list[str], clean: bool = False, workers: int = 4,
+                               rate: float = 1) -> dict:
+        """
+        Retrieve the property values of many subjects, with several requests in flight at once under a shared rate
+        budget.
 
-                # If the string appears to be in JSON format, parse it to a dictionary
-                if "{" in temp_property:
-                    temp_property = eval(temp_property)
-            else:
-                # If there are multiple data items, store them in a list
-                temp_property = []
-                for item in prop['dataitem']:
-                    temp_property.append(item['item'].replace("#6##", "").replace("#14##", "").replace("#0##", ""))
+        Args:
+            items (list[str]): The page names to search properties for.
+            clean (bool, optional): Whether to rename the special ``_X`` properties to human-readable names, as
+                ``_clean_properties()`` does. Default is ``False``.
+            workers (int, optional): The number of requests in flight at once. Default is ``4``.
+            rate (float, optional): The budget of requests per second. Default is ``1``. See
+                ``WikiClient.map_limited()``.
+
+        Returns:
+            dict: The properties of each subject, keyed by the page name given in ``items``, in the format of
+            ``browse_properties()``. The same dict is stored in ``.content``.
+
+        Example:
+            Example of getting the properties of several pages::
+
+                >>> query = MediaWiki('osrs', user_agent='My Project - me@example.com')
+                >>> properties = query.browse_properties_many(['Cake', 'Coal'], clean=True)
+                >>> properties['Coal']['Name']
+                'Coal'
+        """
+
+        def fetch(item):
+            params = self._browse_params(browse='subject', params=self._browse_subject(item))
+            properties = self._properties_from_json(self._decode(self.client.get(self.base_url, headers=self.headers,
+                                                                                 params=params)))
+            return self._rename_properties(properties, PROPERTY_NAMES) if clean else properties
 
-                    # If the string appears to be in JSON format, parse it to a dictionary
-                    if "{" in temp_property:
-                        temp_property = eval(temp_property)
+        self.content = {item: future.result() for item, future in self.client.map_limited(fetch, items, workers, rate)}
+        return self.content
 
-            # Add the property and its value to the `self.content`
-            self.content[prop['property']] = temp_property
+    @staticmethod
+    def _browse_subject(item: str) -> str:
+        """
+        Format the ``params`` value of an SMWbrowse subject request for a page.
+
+        Args:
+            item (str): The page name to search properties for.
+
+        Returns:
+            str: The JSON formatted subject.
+        """
+        # Format the subject for the API request
+        return '{"subject":"' + item.replace(" ", "_") + '","ns":0,"iw":"","subobject":"","options":{' \
+                                                         '"dir":null,"lang":"en-gb","group":null,' \
+                                                         '"printable":null,"offset":null,"including":false,' \
+                                                         '"showInverse":false,"showAll":true,' \
+                                                         '"showGroup":true,"showSort":false,"api":true,' \
+                                                         '"valuelistlimit.out":"30",' \
+                                                         '"valuelistlimit.in":"20"}} '
+
+    def _parse_properties(self) -> None:
+        """
+        Build the ``.content`` attribute from the SMWbrowse subject response in ``.json``.
+        """
+        self.content = self._properties_from_json(self.json)
+
+    @staticmethod
+    def _properties_from_json(browse_json: dict) -> dict:
+        """
+        Parse an SMWbrowse subject response into a dict of properties. A property with one data item becomes a single
+        value and a property with several becomes a list. Values that hold JSON, such as ``Production_JSON``, are
+        decoded with a JSON parser; other values are kept as strings.
+
+        Args:
+            browse_json (dict): The decoded SMWbrowse subject response.
+
+        Returns:
+            dict: The value of each property, keyed by property name.
+        """
+        properties = {}
+        for prop in browse_json['query']['data']:
+            values = [MediaWiki._property_value(item['item']) for item in prop['dataitem']]
+            properties[prop['property']] = values[0] if len(values) == 1 else values
+        return properties
+
+    @staticmethod
+    def _property_value(item: str):
+        """
+        Strip the SMWbrowse markers from a data item, decoding it if it holds a JSON object or array.
+        """
+        value = _DATAITEM_MARKER.sub('', item)
+        if value[:1] in ('{', '['):
+            try:
+                return decode_json(value)
+            except ValueError:
+                pass
+        return value
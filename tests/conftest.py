@@ -0,0 +1,77 @@
+# tests/conftest.py
+# Offline fixtures shared by the test suite
+
+import json
+
+from pytest import fixture
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from rswiki_wrapper import WikiClient
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    A transport adapter that answers requests from canned payloads keyed by URL path, without any network I/O. A
+    payload may be a callable taking the request, and may return a ready-made ``Response``.
+    """
+
+    def __init__(self, routes=None):
+        super().__init__()
+        self.routes = routes or {}
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        path = request.path_url.split('?')[0]
+        payload = self.routes.get(path)
+
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        if callable(payload):
+            payload = payload(request)
+        if isinstance(payload, Response):
+            payload.request = request
+            payload.url = request.url
+            return payload
+        if payload is None:
+            response.status_code = 404
+            response._content = b'{"error": "not found"}'
+        else:
+            response.status_code = 200
+            response._content = json.dumps(payload).encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+def make_response(status_code=200, payload=None, headers=None):
+    response = Response()
+    response.status_code = status_code
+    response.encoding = 'utf-8'
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = b'' if payload is None else json.dumps(payload).encode('utf-8')
+    return response
+
+
+@fixture
+def fake_adapter():
+    return FakeAdapter()
+
+
+@fixture
+def client(fake_adapter):
+    wiki_client = WikiClient()
+    wiki_client.session.mount('https://', fake_adapter)
+    wiki_client.session.mount('http://', fake_adapter)
+    return wiki_client
+
+
+@fixture
+def user_agent():
+    return 'RS Wiki API Python Wrapper - Test Suite'
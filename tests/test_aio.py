@@ -0,0 +1,213 @@
+# tests/test_aio.py
+
+import asyncio
+import json
+import threading
+
+from pytest import importorskip
+from requests import Response
+
+importorskip('aiohttp')
+
+from rswiki_wrapper import AsyncWikiClient, AsyncLatest, AsyncTimeSeries, AsyncExchange, AsyncMediaWiki, Latest, Metrics
+
+
+class CannedAsyncClient(AsyncWikiClient):
+    """An AsyncWikiClient that answers from canned payloads keyed by URL and records the peak concurrency"""
+
+    def __init__(self, routes, **kwargs):
+        super().__init__(**kwargs)
+        self.routes = routes
+        self.sent = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _send(self, session, url, headers, params, timings=None):
+        self.sent.append((url, params))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        payload = self.routes[url]
+        response = Response()
+        response.status_code = 200
+        response.encoding = 'utf-8'
+        response._content = json.dumps(payload(params) if callable(payload) else payload).encode('utf-8')
+        return response
+
+
+def test_async_latest(user_agent):
+    """Tests an awaitable Latest query builds the same content as the blocking class"""
+
+    routes = {'https://prices.runescape.wiki/api/v1/osrs/latest': {'data': {'2': {'high': 1, 'low': 2}}}}
+
+    async def run():
+        async with CannedAsyncClient(routes) as client:
+            return await AsyncLatest.fetch(user_agent=user_agent, client=client)
+
+    query = asyncio.run(run())
+
+    assert isinstance(query, Latest)
+    assert query.content == {'2': {'high': 1, 'low': 2}}
+
+
+def test_async_bounded_concurrency(user_agent):
+    """Tests that gathered queries never exceed the configured concurrency"""
+
+    url = 'https://prices.runescape.wiki/api/v1/osrs/timeseries'
+    routes = {url: lambda params: {'data': [{'timestamp': int(params['id'])}]}}
+    client = CannedAsyncClient(routes, concurrency=3)
+
+    async def run():
+        queries = [AsyncTimeSeries.fetch(id=i, timestep='5m', user_agent=user_agent, client=client) for i in range(20)]
+        results = await asyncio.gather(*queries)
+        await client.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [query.content[0]['timestamp'] for query in results] == list(range(20))
+    assert client.peak <= 3, "No more than 3 requests should be in flight"
+    assert all(params['timestep'] == '5m' for _, params in client.sent)
+
+
+def test_async_exchange(user_agent):
+    """Tests an awaitable Exchange query standardizes the latest content"""
+
+    routes = {'https://api.weirdgloop.org/exchange/history/rs/latest': {'2': {'id': '2', 'price': 5}}}
+
+    async def run():
+        async with CannedAsyncClient(routes) as client:
+            return await AsyncExchange.fetch('rs', 'latest', id='2', user_agent=user_agent, client=client)
+
+    assert asyncio.run(run()).content == {'2': [{'id': '2', 'price': 5}]}
+
+
+def test_async_ask_production(user_agent):
+    """Tests the awaitable ASK helpers follow the continuation offset"""
+
+    def ask(params):
+        if '|offset=' in params['query']:
+            return {'query': {'results': {'Pie': {'printouts': {'Production JSON': ['{"ticks": "2"}']}}}}}
+        return {'query-continue-offset': 1,
+                'query': {'results': {'Cake': {'printouts': {'Production JSON': ['{"ticks": "1"}']}}}}}
+
+    routes = {'https://oldschool.runescape.wiki/api.php': ask}
+
+    async def run():
+        async with CannedAsyncClient(routes) as client:
+            query = AsyncMediaWiki('osrs', user_agent=user_agent, client=client)
+            await query.ask_production(get_all=True)
+            return query
+
+    query = asyncio.run(run())
+
+    assert query.content == {'Cake': [{'ticks': '1'}], 'Pie': [{'ticks': '2'}]}
+
+
+def test_async_exchange_list(user_agent):
+    """Tests an awaitable Exchange query gathers the chunks of a list of ids"""
+
+    url = 'https://api.weirdgloop.org/exchange/history/rs/latest'
+    routes = {url: lambda params: {item: {'id': item} for item in params['id'].split('|')}}
+    client = CannedAsyncClient(routes)
+
+    async def run():
+        query = await AsyncExchange.fetch('rs', 'latest', id=list(range(5)), chunk_size=2, user_agent=user_agent,
+                                          client=client)
+        await client.close()
+        return query
+
+    query = asyncio.run(run())
+
+    assert len(client.sent) == 3
+    assert sorted(query.content) == ['0', '1', '2', '3', '4']
+
+
+def test_async_browse_properties_many(user_agent):
+    """Tests the awaitable multi-subject browse gathers every subject"""
+
+    def browse(params):
+        subject = json.loads(params['params'])['subject']
+        return {'query': {'data': [{'property': '_SKEY', 'dataitem': [{'item': subject + '#0##'}]}]}}
+
+    routes = {'https://oldschool.runescape.wiki/api.php': browse}
+
+    async def run():
+        async with CannedAsyncClient(routes) as client:
+            query = AsyncMediaWiki('osrs', user_agent=user_agent, client=client)
+            return await query.browse_properties_many(['Cake', 'Coal'], clean=True)
+
+    assert asyncio.run(run()) == {'Cake': {'Name': 'Cake'}, 'Coal': {'Name': 'Coal'}}
+
+
+def test_async_metrics(user_agent):
+    """Tests that the async client records requests and decode times in its metrics registry"""
+
+    routes = {'https://prices.runescape.wiki/api/v1/osrs/latest': {'data': {'2': {'high': 1, 'low': 2}}}}
+
+    async def run():
+        async with CannedAsyncClient(routes, metrics=Metrics()) as client:
+            await asyncio.gather(*(AsyncLatest.fetch(user_agent=user_agent, client=client) for _ in range(3)))
+            return client.metrics.to_dict()
+
+    route = asyncio.run(run())['prices.runescape.wiki']['/api/v1/osrs/latest']
+    assert route['requests'] == {200: 3}
+    assert route['phases']['queue']['count'] == 3
+    assert route['phases']['decode']['count'] == 3, "Decoding inside the query classes should be timed"
+
+
+def test_async_session_per_loop():
+    """Tests that each event loop gets its own session, and that the session of a closed loop is closed"""
+
+    client = AsyncWikiClient()
+
+    async def session():
+        return client._get_session()[0]
+
+    first = asyncio.run(session())
+    assert not first.closed
+
+    async def replace():
+        second = client._get_session()[0]
+        await client.close()
+        return second
+
+    second = asyncio.run(replace())
+
+    assert second is not first
+    assert first.closed, "The session of the closed loop should be closed"
+    assert second.closed
+
+
+def test_async_running_loops_keep_sessions():
+    """Tests that a client shared by two running event loops does not close the session of the other loop"""
+
+    client = AsyncWikiClient()
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+
+    async def session():
+        return client._get_session()[0]
+
+    try:
+        theirs = asyncio.run_coroutine_threadsafe(session(), other).result(timeout=5)
+
+        async def ours():
+            mine = client._get_session()[0]
+            await client.close()
+            return mine
+
+        mine = asyncio.run(ours())
+
+        assert mine is not theirs
+        assert mine.closed
+        assert not theirs.closed, "The session of a loop that is still running should be left open"
+        asyncio.run_coroutine_threadsafe(client.close(), other).result(timeout=5)
+        assert theirs.closed
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join()
+        other.close()
@@ -0,0 +1,74 @@
+# tests/test_ask.py
+
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from pytest import fixture
+
+from rswiki_wrapper import MediaWiki
+
+
+@fixture
+def ask_pages(fake_adapter):
+    """Serves three ASK pages of two results each, following the ``|offset=`` query modifier"""
+
+    def ask(request):
+        query = parse_qs(urlsplit(request.url).query)['query'][0]
+        offset = int(query.split('|offset=')[1]) if '|offset=' in query else 0
+        results = {f'Item {n}': {'printouts': {'Production JSON': [json.dumps({'n': n})]}}
+                   for n in range(offset, offset + 2)}
+        page = {'query': {'results': results}}
+        if offset < 4:
+            page['query-continue-offset'] = offset + 2
+        return page
+
+    fake_adapter.routes['/api.php'] = ask
+    return fake_adapter
+
+
+@fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr('rswiki_wrapper.wiki.sleep', lambda seconds: None)
+
+
+def test_iter_ask(client, ask_pages, user_agent):
+    """Tests the ASK generator yields one parsed page at a time"""
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=client)
+    pages = list(query.iter_ask(['Production JSON::+'], ['Production JSON'], delay=0))
+
+    assert [list(page) for page in pages] == [['Item 0', 'Item 1'], ['Item 2', 'Item 3'], ['Item 4', 'Item 5']]
+    assert pages[2]['Item 5'] == [{'n': 5}]
+
+
+def test_iter_ask_early_stop(client, ask_pages, user_agent):
+    """Tests that no further pages are requested once the consumer stops"""
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=client)
+    for page in query.iter_ask(['Production JSON::+'], ['Production JSON'], delay=0):
+        break
+
+    assert len(ask_pages.requests) == 1
+
+
+def test_ask_production_get_all(client, ask_pages, user_agent, no_sleep):
+    """Tests that get_all collects every page into the content"""
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=client)
+    query.ask_production(get_all=True)
+
+    assert len(query.content) == 6
+    assert query.content['Item 0'] == [{'n': 0}]
+    assert len(ask_pages.requests) == 3
+
+
+def test_ask_concurrent(client, ask_pages, user_agent):
+    """Tests that concurrent page fetching builds the same content as the serial path"""
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=client)
+    query.ask_production(get_all=True, workers=4, rate=1000)
+
+    assert list(query.content) == [f'Item {n}' for n in range(6)]
+    assert query.content['Item 5'] == [{'n': 5}]
+    assert len(ask_pages.requests) == 3, "No page past the final one should be requested"
+
@@ -0,0 +1,88 @@
+# tests/test_batch.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from pytest import fixture, raises
+
+from rswiki_wrapper import BatchLoader, ExchangeLoader, LatestLoader
+
+
+@fixture
+def routes(fake_adapter):
+    def exchange(request):
+        ids = parse_qs(urlsplit(request.url).query)['id'][0].split('|')
+        return {item_id: {'id': item_id, 'price': int(item_id) * 10} for item_id in ids if item_id != '404'}
+
+    fake_adapter.routes['/exchange/history/rs/latest'] = exchange
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 150}, '6': {'high': 9000}}}
+    return fake_adapter
+
+
+def test_exchange_loader_batches(client, routes, user_agent):
+    """Tests that concurrent lookups within the window share one request"""
+
+    loader = ExchangeLoader('rs', user_agent=user_agent, client=client, window=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        prices = list(pool.map(lambda item_id: loader.get(item_id)['price'], [2, 6, 10, 2, 6, 12]))
+
+    assert prices == [20, 60, 100, 20, 60, 120]
+    assert len(routes.requests) == 1, "The lookups should be combined into one request"
+    assert sorted(parse_qs(urlsplit(routes.requests[0].url).query)['id'][0].split('|'), key=int) == \
+        ['2', '6', '10', '12'], "Repeated items should only be requested once"
+
+
+def test_exchange_loader_max_batch(client, routes, user_agent):
+    """Tests that a full batch is sent without waiting for the window, and without blocking the caller"""
+
+    release = threading.Event()
+    exchange = routes.routes['/exchange/history/rs/latest']
+
+    def slow_exchange(request):
+        release.wait(timeout=5)
+        return exchange(request)
+
+    routes.routes['/exchange/history/rs/latest'] = slow_exchange
+    loader = ExchangeLoader('rs', user_agent=user_agent, client=client, window=60, max_batch=2)
+    first = loader.load(2)
+    second = loader.load(6)
+
+    assert not second.done(), "load() should return before the batch completes"
+    release.set()
+    assert first.result(timeout=1)['price'] == 20
+    assert second.result(timeout=1)['price'] == 60
+    assert len(routes.requests) == 1
+
+
+def test_missing_item(client, routes, user_agent):
+    """Tests that items missing from the response resolve with a KeyError"""
+
+    loader = ExchangeLoader('rs', user_agent=user_agent, client=client)
+    future = loader.load(404)
+    loader.flush()
+
+    with raises(KeyError):
+        future.result(timeout=1)
+
+
+def test_latest_loader(client, routes, user_agent):
+    """Tests that Latest lookups are answered from one full pull"""
+
+    loader = LatestLoader(user_agent=user_agent, client=client, window=0.05)
+    futures = [loader.load(2), loader.load('6')]
+
+    assert [future.result(timeout=1)['high'] for future in futures] == [150, 9000]
+    assert len(routes.requests) == 1
+
+
+def test_loader_requires_fetch():
+    """Tests that a loader without a _fetch() fails when it is constructed rather than on its first batch"""
+
+    class Incomplete(BatchLoader):
+        pass
+
+    with raises(TypeError):
+        BatchLoader()
+    with raises(TypeError):
+        Incomplete()
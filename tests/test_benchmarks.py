@@ -0,0 +1,30 @@
+# tests/test_benchmarks.py
+
+from benchmarks.suite import compare, run
+
+
+def test_suite_runs_offline():
+    """Tests that every benchmark case runs against the canned payloads and reports its measurements"""
+
+    results = run(items=50, series_points=10, ask_results=120, min_iterations=2, min_seconds=0)
+
+    assert set(results) == {'latest', 'mapping', 'timeseries', 'exchange_latest', 'runescape_vos',
+                            'default_user_agent', 'ask_production', 'browse_properties'}
+    for name, result in results.items():
+        assert result['iterations'] >= 2, f"{name} should be timed at least min_iterations times"
+        assert result['p99_ms'] >= result['p50_ms'] > 0, f"{name} should report ordered latencies"
+        assert result['peak_kib'] > 0, f"{name} should report its peak memory"
+
+
+def test_compare_flags_regressions():
+    """Tests that only changes beyond the threshold are reported"""
+
+    baseline = {'results': {'latest': {'p50_ms': 10.0, 'peak_kib': 1000.0},
+                            'mapping': {'p50_ms': 10.0, 'peak_kib': 1000.0}}}
+    results = {'latest': {'p50_ms': 11.0, 'peak_kib': 1100.0},
+               'mapping': {'p50_ms': 13.0, 'peak_kib': 1300.0},
+               'timeseries': {'p50_ms': 1.0, 'peak_kib': 1.0}}
+
+    regressions = compare(results, baseline, threshold=0.2)
+    assert len(regressions) == 2
+    assert all(regression.startswith('mapping') for regression in regressions)
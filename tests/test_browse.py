@@ -0,0 +1,61 @@
+# tests/test_browse.py
+
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from pytest import fixture
+
+from rswiki_wrapper import MediaWiki
+
+
+@fixture
+def browse_route(fake_adapter):
+    """Answers SMWbrowse subject requests with the properties of the requested page"""
+
+    def browse(request):
+        subject = json.loads(parse_qs(urlsplit(request.url).query)['params'][0])['subject']
+        production = json.dumps({'ticks': '', 'members': 'Yes', 'output': {'name': subject, 'cost': None}})
+        return {'query': {'subject': subject, 'data': [
+            {'property': 'Production_JSON', 'dataitem': [{'type': 2, 'item': production + '#0##'}]},
+            {'property': 'Uses_material', 'dataitem': [{'type': 9, 'item': 'Egg#0##'},
+                                                        {'type': 9, 'item': 'Bucket of milk#0##'}]},
+            {'property': 'Examine', 'dataitem': [{'type': 2, 'item': 'A {curly} note, not JSON#6##'}]},
+            {'property': '_SKEY', 'dataitem': [{'type': 2, 'item': subject.replace('_', ' ')}]},
+        ]}}
+
+    fake_adapter.routes['/api.php'] = browse
+    return fake_adapter
+
+
+def test_browse_properties_values(client, browse_route, user_agent):
+    """Tests that JSON values are decoded without eval and markers are stripped from every item"""
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=client)
+    query.browse_properties('Cake')
+
+    assert query.content['Production_JSON'] == {'ticks': '', 'members': 'Yes', 'output': {'name': 'Cake', 'cost': None}}
+    assert query.content['Uses_material'] == ['Egg', 'Bucket of milk']
+    assert query.content['Examine'] == 'A {curly} note, not JSON', "Text with braces should be kept as a string"
+
+    query._clean_properties()
+    assert query.content['Name'] == 'Cake'
+    query._dirty_properties()
+    assert query.content['_SKEY'] == 'Cake'
+
+
+def test_browse_properties_many(client, browse_route, user_agent, monkeypatch):
+    """Tests that many subjects are browsed concurrently under the rate budget"""
+
+    acquired = []
+    monkeypatch.setattr('rswiki_wrapper.ratelimit.TokenBucket.acquire', lambda bucket: acquired.append(bucket.rate))
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=client)
+    items = ['Cake', 'Chocolate cake', 'Coal']
+    properties = query.browse_properties_many(items, clean=True, workers=3, rate=4)
+
+    assert list(properties) == items
+    assert properties['Chocolate cake']['Name'] == 'Chocolate cake'
+    assert properties['Coal']['Production_JSON']['output']['name'] == 'Coal'
+    assert '_SKEY' not in properties['Coal']
+    assert query.content is properties
+    assert acquired == [4, 4, 4]
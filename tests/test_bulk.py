@@ -0,0 +1,59 @@
+# tests/test_bulk.py
+
+import threading
+from time import sleep
+from urllib.parse import parse_qs, urlsplit
+
+from pytest import fixture
+
+from rswiki_wrapper import RateLimiter, TimeSeries, WikiClient
+
+from tests.conftest import make_response
+
+
+@fixture
+def series_route(fake_adapter):
+    """Serves a one-point series per item, failing for item 13 and counting the requests in flight"""
+    state = {'in_flight': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def series(request):
+        item_id = parse_qs(urlsplit(request.url).query)['id'][0]
+        with lock:
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+        sleep(0.01)
+        with lock:
+            state['in_flight'] -= 1
+        if item_id == '13':
+            return make_response(500, {'error': 'server error'})
+        return {'data': [{'timestamp': 300, 'avgHighPrice': int(item_id)}]}
+
+    fake_adapter.routes['/api/v1/osrs/timeseries'] = series
+    return state
+
+
+def test_bulk_streams_results(series_route, fake_adapter, user_agent):
+    """Tests that every item is yielded once and failures are reported per item"""
+
+    client = WikiClient(rate_limiter=RateLimiter(rate=1000, capacity=1000))
+    client.session.mount('https://', fake_adapter)
+
+    ids = [str(n) for n in range(2, 20)]
+    results = dict(TimeSeries.bulk(ids, '5m', user_agent=user_agent, client=client, workers=3))
+
+    assert sorted(results, key=int) == ids
+    assert isinstance(results['13'], Exception), "A failed item should be reported, not raised"
+    assert results['2'].content[0]['avgHighPrice'] == 2
+    assert results['2'].params['timestep'] == '5m'
+    assert series_route['peak'] <= 3, "No more than the worker limit should be in flight"
+
+
+def test_bulk_rate_budget(series_route, client, user_agent, monkeypatch):
+    """Tests that requests wait on the rate budget when the client has no rate limiter"""
+
+    acquired = []
+    monkeypatch.setattr('rswiki_wrapper.ratelimit.TokenBucket.acquire', lambda bucket: acquired.append(bucket.rate))
+
+    list(TimeSeries.bulk(['2', '6', '10'], '1h', user_agent=user_agent, client=client, rate=5))
+    assert acquired == [5, 5, 5]
@@ -0,0 +1,106 @@
+# tests/test_cache.py
+
+from pytest import fixture
+
+from rswiki_wrapper import Latest, Mapping, WikiClient
+from rswiki_wrapper.cache import DiskCache, canonical_url
+from tests.conftest import make_response
+
+
+@fixture
+def mapping_payload():
+    return [{'id': 453, 'name': 'Coal'}, {'id': 2, 'name': 'Cannonball'}]
+
+
+def test_canonical_url():
+    """Tests that parameter order does not change the cache key"""
+
+    url = 'https://prices.runescape.wiki/api/v1/osrs/timeseries'
+    assert canonical_url(url, {'id': 2, 'timestep': '5m'}) == canonical_url(url, {'timestep': '5m', 'id': 2})
+    assert canonical_url(url, {'id': 2, 'timestamp': None}) == url + '?id=2'
+
+
+def test_conditional_request(tmp_path, fake_adapter, mapping_payload):
+    """Tests that a 304 response rebuilds the content from disk"""
+
+    sent_headers = []
+
+    def mapping(request):
+        sent_headers.append(dict(request.headers))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return make_response(304, headers={'ETag': '"v1"'})
+        return make_response(200, mapping_payload, headers={'ETag': '"v1"', 'Content-Type': 'application/json'})
+
+    fake_adapter.routes['/api/v1/osrs/mapping'] = mapping
+    client = WikiClient(cache=DiskCache(str(tmp_path)))
+    client.session.mount('https://', fake_adapter)
+
+    user_agent = 'RS Wiki API Python Wrapper - Test Suite'
+    first = Mapping(user_agent=user_agent, client=client)
+    second = Mapping(user_agent=user_agent, client=client)
+
+    assert 'If-None-Match' not in sent_headers[0]
+    assert sent_headers[1]['If-None-Match'] == '"v1"'
+    assert not getattr(first.response, 'from_cache', False)
+    assert second.response.from_cache
+    assert second.content == first.content == mapping_payload
+
+
+def test_no_validators_not_stored(tmp_path, fake_adapter):
+    """Tests that responses without an ETag or Last-Modified header are not cached"""
+
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {}}
+    cache = DiskCache(str(tmp_path))
+    client = WikiClient(cache=cache)
+    client.session.mount('https://', fake_adapter)
+    response = client.get('https://prices.runescape.wiki/api/v1/osrs/latest', revalidate=True)
+
+    assert response.status_code == 200
+    assert cache.validators(canonical_url(response.url)) == {}
+
+
+def test_missing_body_refetched(tmp_path, fake_adapter, mapping_payload, user_agent):
+    """Tests that a 304 for an entry whose body is gone drops the entry and downloads the body again"""
+
+    sent_headers = []
+
+    def mapping(request):
+        sent_headers.append(dict(request.headers))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return make_response(304, headers={'ETag': '"v1"'})
+        return make_response(200, mapping_payload, headers={'ETag': '"v1"', 'Content-Type': 'application/json'})
+
+    fake_adapter.routes['/api/v1/osrs/mapping'] = mapping
+    cache = DiskCache(str(tmp_path))
+    client = WikiClient(cache=cache)
+    client.session.mount('https://', fake_adapter)
+
+    first = Mapping(user_agent=user_agent, client=client)
+    key = canonical_url(first.response.url)
+    for path in tmp_path.glob('*.body'):
+        path.unlink()
+
+    second = Mapping(user_agent=user_agent, client=client)
+
+    assert len(sent_headers) == 3
+    assert sent_headers[1]['If-None-Match'] == '"v1"'
+    assert 'If-None-Match' not in sent_headers[2], "The retried request should not send the stale validator"
+    assert not getattr(second.response, 'from_cache', False)
+    assert second.content == mapping_payload
+    assert cache.load(key) is not None, "The downloaded body should be stored again"
+
+
+def test_polled_routes_not_stored(tmp_path, fake_adapter, user_agent):
+    """Tests that only queries that opt in, such as Mapping, are written to the disk cache"""
+
+    fake_adapter.routes['/api/v1/osrs/latest'] = lambda request: make_response(
+        200, {'data': {'2': {'high': 1}}}, headers={'ETag': '"v1"'})
+    cache = DiskCache(str(tmp_path))
+    client = WikiClient(cache=cache)
+    client.session.mount('https://', fake_adapter)
+
+    Latest(user_agent=user_agent, client=client)
+    Latest(user_agent=user_agent, client=client)
+
+    assert list(tmp_path.iterdir()) == [], "Latest should not be written to disk"
+    assert all('If-None-Match' not in request.headers for request in fake_adapter.requests)
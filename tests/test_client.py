@@ -0,0 +1,87 @@
+# tests/test_client.py
+
+from requests.adapters import HTTPAdapter
+
+from rswiki_wrapper import WikiClient, Latest, Exchange, RateLimiter, get_default_client, set_default_client
+
+
+def test_pool_configuration():
+    """Tests the client mounts a pooled adapter sized from its arguments"""
+
+    client = WikiClient(pool_connections=2, pool_maxsize=25, timeout=5)
+    adapter = client.session.get_adapter('https://prices.runescape.wiki/api/v1/osrs/latest')
+
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 25
+    assert client.timeout == 5
+
+
+def test_default_client():
+    """Tests the module-level default client can be replaced"""
+
+    original = get_default_client()
+    assert get_default_client() is original, "The default client should be created once"
+
+    replacement = WikiClient()
+    set_default_client(replacement)
+    try:
+        assert get_default_client() is replacement
+    finally:
+        set_default_client(original)
+
+
+def test_queries_share_client(client, fake_adapter):
+    """Tests that several query classes send their requests through one client session"""
+
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 1, 'highTime': 2, 'low': 3, 'lowTime': 4}}}
+    fake_adapter.routes['/exchange/history/rs/latest'] = {'2': {'id': '2', 'timestamp': 't', 'price': 5, 'volume': 6}}
+
+    user_agent = 'RS Wiki API Python Wrapper - Test Suite'
+    latest = Latest(user_agent=user_agent, client=client)
+    exchange = Exchange('rs', 'latest', id='2', user_agent=user_agent, client=client)
+
+    assert latest.client is client and exchange.client is client
+    assert len(fake_adapter.requests) == 2
+    assert latest.content['2']['high'] == 1
+    assert exchange.content['2'][0]['price'] == 5
+    assert fake_adapter.requests[0].headers['User-Agent'] == user_agent
+
+
+def test_map_limited():
+    """Tests ordered and completion-order results, bounded concurrency, errors and stopping an endless input early"""
+
+    import itertools
+    import threading
+    from time import sleep
+
+    client = WikiClient(rate_limiter=RateLimiter(rate=1e9, capacity=1e9))
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def square(n):
+        with lock:
+            in_flight.append(n)
+            peak.append(len(in_flight))
+        sleep(0.01 * (5 - n % 5))
+        with lock:
+            in_flight.remove(n)
+        if n == 3:
+            raise ValueError(n)
+        return n * n
+
+    results = list(client.map_limited(square, range(10), workers=3))
+    assert [arg for arg, future in results] == list(range(10)), "Results should follow the order of args"
+    assert [future.result() for arg, future in results if arg != 3] == [n * n for n in range(10) if n != 3]
+    assert isinstance(results[3][1].exception(), ValueError)
+    assert max(peak) <= 3
+
+    unordered = [arg for arg, future in client.map_limited(square, range(10), workers=3, ordered=False)]
+    assert sorted(unordered) == list(range(10))
+
+    started = []
+    endless = client.map_limited(lambda n: started.append(n) or n, itertools.count(), workers=2)
+    assert [future.result() for _, future in itertools.islice(endless, 5)] == [0, 1, 2, 3, 4]
+    endless.close()
+    assert len(started) <= 7, "Closing the results should stop reading an endless input"
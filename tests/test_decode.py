@@ -0,0 +1,38 @@
+# tests/test_decode.py
+
+from pytest import raises
+
+from rswiki_wrapper import Latest, Mapping, decode
+
+
+def test_stdlib_fallback(monkeypatch):
+    """Tests that the stdlib fallback decodes the same document as orjson"""
+
+    body = '{"data": {"2": {"high": 150, "name": "Cannonball – x"}}}'.encode('utf-8')
+    expected = decode.decode_json(body)
+
+    monkeypatch.setattr(decode, 'orjson', None)
+    assert decode.decode_json(body) == expected
+    assert expected['data']['2']['name'] == 'Cannonball – x', "Bodies should be decoded as UTF-8"
+    with raises(ValueError):
+        decode.decode_json(b'not json')
+
+
+def test_pluggable_decoder(client, fake_adapter, user_agent, monkeypatch):
+    """Tests that queries decode through the decoder set on the class"""
+
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 150}}}
+    fake_adapter.routes['/api/v1/osrs/mapping'] = [{'id': 2, 'name': 'Cannonball'}]
+
+    decoded = []
+
+    def decoder(content):
+        decoded.append(content)
+        return decode.decode_json(content)
+
+    monkeypatch.setattr(Latest, 'decoder', staticmethod(decoder))
+    latest = Latest(user_agent=user_agent, client=client)
+    Mapping(user_agent=user_agent, client=client)
+
+    assert latest.content == {'2': {'high': 150}}
+    assert decoded == [latest.response.content], "Only the class with the custom decoder should use it"
@@ -0,0 +1,59 @@
+# tests/test_exchange.py
+
+from urllib.parse import parse_qs, urlsplit
+
+from pytest import fixture, raises
+
+from rswiki_wrapper import Exchange
+
+
+@fixture
+def latest_route(fake_adapter):
+    """Answers Exchange 'latest' requests for any pipe-joined ids or names"""
+
+    def latest(request):
+        query = parse_qs(urlsplit(request.url).query)
+        key = 'id' if 'id' in query else 'name'
+        return {item: {'id': item, 'price': len(item)} for item in query[key][0].split('|')}
+
+    fake_adapter.routes['/exchange/history/rs/latest'] = latest
+    return fake_adapter
+
+
+def test_latest_list_chunks(client, latest_route, user_agent):
+    """Tests that a list of ids is split into chunks and merged into one content"""
+
+    ids = [str(n) for n in range(250)]
+    query = Exchange('rs', 'latest', user_agent=user_agent, client=client, chunk_size=100, id=ids)
+
+    assert len(latest_route.requests) == 3
+    assert len(query.responses) == 3
+    assert sorted(query.content, key=int) == ids
+    assert query.content['42'] == [{'id': '42', 'price': 2}], "Content should be standardized to lists"
+
+
+def test_latest_list_url_length(client, latest_route, user_agent):
+    """Tests that chunks of long names are kept under the URL length limit"""
+
+    names = ['Super restore mix(2) ' + 'x' * 40 + str(n) for n in range(100)]
+    query = Exchange('rs', 'latest', user_agent=user_agent, client=client, name=names)
+
+    assert len(latest_route.requests) > 1
+    assert all(len(request.url) < 2000 for request in latest_route.requests)
+    assert set(query.content) == set(names)
+
+
+def test_latest_string_unchanged(client, latest_route, user_agent):
+    """Tests that a pipe-joined string is still sent as one request"""
+
+    query = Exchange('rs', 'latest', user_agent=user_agent, client=client, id='2|6')
+
+    assert len(latest_route.requests) == 1
+    assert sorted(query.content) == ['2', '6']
+
+
+def test_list_requires_latest(client, latest_route, user_agent):
+    """Tests that lists are rejected by endpoints that take one item"""
+
+    with raises(AssertionError):
+        Exchange('rs', 'all', user_agent=user_agent, client=client, id=['2', '6'])
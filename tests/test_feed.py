@@ -0,0 +1,61 @@
+# tests/test_feed.py
+
+from pytest import fixture
+
+from rswiki_wrapper import LatestFeed
+
+
+@fixture
+def snapshots(fake_adapter):
+    """Serves a sequence of Latest snapshots, one per request"""
+    pages = [
+        {'2': {'high': 150, 'highTime': 1, 'low': 140, 'lowTime': 2},
+         '6': {'high': 9000, 'highTime': 3, 'low': 8000, 'lowTime': 4}},
+        {'2': {'high': 150, 'highTime': 1, 'low': 140, 'lowTime': 2},
+         '6': {'high': 9100, 'highTime': 5, 'low': 8000, 'lowTime': 4},
+         '10': {'high': 20, 'highTime': 6, 'low': None, 'lowTime': None}},
+        {'6': {'high': 9100, 'highTime': 5, 'low': 8000, 'lowTime': 4},
+         '10': {'high': 20, 'highTime': 6, 'low': None, 'lowTime': None}},
+        {'6': {'high': 9100, 'highTime': 5, 'low': 8000, 'lowTime': 4},
+         '10': {'high': 20, 'highTime': 6, 'low': None, 'lowTime': None}},
+        {'6': {'high': 9100, 'highTime': 5, 'low': 8050, 'lowTime': 7},
+         '10': {'high': 20, 'highTime': 6, 'low': None, 'lowTime': None}},
+    ]
+    fake_adapter.routes['/api/v1/osrs/latest'] = lambda request: {'data': pages.pop(0)}
+    return pages
+
+
+def test_poll_deltas(client, snapshots, user_agent):
+    """Tests that each poll reports only the added, changed and removed items"""
+
+    feed = LatestFeed(user_agent=user_agent, client=client)
+
+    first = feed.poll()
+    assert sorted(first.added) == ['2', '6'], "Every item should be added on the first poll"
+    assert not first.changed and not first.removed
+
+    second = feed.poll()
+    assert list(second.added) == ['10']
+    assert second.changed == {'6': {'high': 9100, 'highTime': 5, 'low': 8000, 'lowTime': 4}}
+    assert second.removed == []
+
+    third = feed.poll()
+    assert third.removed == ['2']
+    assert len(third) == 1
+    assert '2' not in feed.snapshot
+
+
+def test_iter_skips_quiet_polls(client, snapshots, user_agent, monkeypatch):
+    """Tests that iterating sleeps between polls and skips polls without changes"""
+
+    waits = []
+    monkeypatch.setattr('rswiki_wrapper.feed.sleep', waits.append)
+
+    feed = LatestFeed(user_agent=user_agent, client=client, interval=30)
+    deltas = iter(feed)
+    [next(deltas) for _ in range(3)]
+    fourth = next(deltas)
+
+    assert list(fourth.changed) == ['6'], "The unchanged fourth snapshot should not be yielded"
+    assert len(waits) == 4
+    assert all(0 < wait <= 30 for wait in waits)
@@ -0,0 +1,52 @@
+# tests/test_import.py
+
+import subprocess
+import sys
+
+from pytest import raises
+
+import rswiki_wrapper
+
+# The most time a cold ``import rswiki_wrapper`` may take, in microseconds. The lazy package takes about 1 ms, while
+# eagerly importing requests, numpy and aiohttp took several hundred.
+IMPORT_BUDGET_US = 50000
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter, so that nothing is imported already"""
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                          check=True)
+
+
+def test_cold_import_time():
+    """Tests that importing the package stays within the cold-start budget and loads no heavy dependency"""
+
+    result = run_python('import sys, rswiki_wrapper; '
+                        'print(*sorted(m for m in ("requests", "numpy", "aiohttp") if m in sys.modules))')
+    assert result.stdout.strip() == '', f"Importing the package should not load {result.stdout.strip()}"
+
+    # Each line of -X importtime is 'import time: self | cumulative | module'
+    timings = {line.split('|')[2].strip(): int(line.split('|')[1]) for line in result.stderr.splitlines()
+               if line.startswith('import time:') and line.split('|')[1].strip().isdigit()}
+    assert timings['rswiki_wrapper'] < IMPORT_BUDGET_US, \
+        f"import rswiki_wrapper took {timings['rswiki_wrapper']} us, over the {IMPORT_BUDGET_US} us budget"
+
+
+def test_query_classes_skip_optional_dependencies():
+    """Tests that the blocking query classes load neither numpy nor aiohttp"""
+
+    result = run_python('import sys; from rswiki_wrapper import Latest, Mapping, Exchange; '
+                        'print(*sorted(m for m in ("numpy", "aiohttp") if m in sys.modules))')
+    assert result.stdout.strip() == ''
+
+
+def test_lazy_exports():
+    """Tests that every public name and submodule resolves, and unknown names raise AttributeError"""
+
+    for name in rswiki_wrapper.__all__:
+        assert getattr(rswiki_wrapper, name).__name__ == name
+    assert rswiki_wrapper.wiki.MediaWiki is rswiki_wrapper.MediaWiki
+    assert 'Latest' in dir(rswiki_wrapper)
+
+    with raises(AttributeError):
+        rswiki_wrapper.NotAQuery
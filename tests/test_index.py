@@ -0,0 +1,51 @@
+# tests/test_index.py
+
+from pytest import fixture
+
+from rswiki_wrapper import Mapping
+
+
+@fixture
+def mapping(client, fake_adapter):
+    fake_adapter.routes['/api/v1/osrs/mapping'] = [
+        {'id': 453, 'name': 'Coal'},
+        {'id': 536, 'name': 'Dragon bones'},
+        {'id': 9341, 'name': 'Dragon bolts'},
+        {'id': 11286, 'name': 'Draconic visage'},
+        {'id': 2, 'name': 'Cannonball'},
+    ]
+    return Mapping(user_agent='RS Wiki API Python Wrapper - Test Suite', client=client)
+
+
+def test_get_item(mapping):
+    """Tests lookups by item ID"""
+
+    assert mapping.get_item(453)['name'] == 'Coal'
+    assert mapping.get_item('536')['name'] == 'Dragon bones'
+    assert mapping.get_item(1) is None
+
+
+def test_get_id(mapping):
+    """Tests lookups by normalized item name"""
+
+    assert mapping.get_id('Coal') == 453
+    assert mapping.get_id('  dragon   BONES ') == 536
+    assert mapping.get_id('Dragon') is None
+
+
+def test_search(mapping):
+    """Tests prefix search for autocomplete"""
+
+    assert [item['id'] for item in mapping.search('dra')] == [11286, 9341, 536]
+    assert [item['id'] for item in mapping.search('Dragon b', limit=1)] == [9341]
+    assert mapping.search('zzz') == []
+
+
+def test_index_built_once(mapping):
+    """Tests the index is built once and rebuilt after a new fetch"""
+
+    index = mapping.index
+    assert mapping.index is index
+
+    mapping._parse()
+    assert mapping.index is not index
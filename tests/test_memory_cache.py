@@ -0,0 +1,69 @@
+# tests/test_memory_cache.py
+
+from pytest import fixture
+
+from rswiki_wrapper import AvgPrice, Latest, Mapping, MemoryCache, WikiClient
+
+
+@fixture
+def cached_client(fake_adapter):
+    fake_adapter.routes['/api/v1/osrs/5m'] = {'data': {'2': {'avgHighPrice': 1}}}
+    fake_adapter.routes['/api/v1/osrs/1h'] = {'data': {'2': {'avgHighPrice': 2}}}
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 1}}}
+    fake_adapter.routes['/api/v1/osrs/mapping'] = [{'id': 2}]
+
+    client = WikiClient(memory_cache=MemoryCache(maxsize=2, ttl=30))
+    client.session.mount('https://', fake_adapter)
+    return client
+
+
+def test_avg_price_shared(cached_client, fake_adapter, user_agent):
+    """Tests that repeated AvgPrice queries are answered from memory"""
+
+    first = AvgPrice('5m', user_agent=user_agent, client=cached_client)
+    second = AvgPrice('5m', user_agent=user_agent, client=cached_client)
+
+    assert len(fake_adapter.requests) == 1
+    assert first.content == second.content
+    assert first.content is not second.content, "Each query should parse its own content"
+    assert cached_client.memory_cache.info() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 2}
+
+
+def test_uncached_routes(cached_client, fake_adapter, user_agent):
+    """Tests that queries without an expiry policy are always sent"""
+
+    Mapping(user_agent=user_agent, client=cached_client)
+    Mapping(user_agent=user_agent, client=cached_client)
+
+    assert len(fake_adapter.requests) == 2
+    info = cached_client.memory_cache.info()
+    assert info['size'] == 0
+    assert info['misses'] == 0, "Routes without an expiry policy should not be looked up"
+
+
+def test_bucket_expiry(cached_client, user_agent):
+    """Tests that AvgPrice entries expire when the next bucket closes"""
+
+    query = AvgPrice('1h', user_agent=user_agent, client=cached_client)
+    assert query._cache_expiry(7201, 30) == 10800
+    assert query._cache_expiry(7200, 30) == 10800
+
+    historical = AvgPrice('5m', user_agent=user_agent, client=cached_client, timestamp=1672531200)
+    assert historical._cache_expiry(7201, 30) == float('inf')
+
+    latest = Latest(user_agent=user_agent, client=cached_client)
+    assert latest._cache_expiry(100, 30) == 130
+
+
+def test_lru_eviction():
+    """Tests that expired and least recently used entries are dropped"""
+
+    cache = MemoryCache(maxsize=2)
+    cache.set('a', 'A', expires=100)
+    cache.set('b', 'B', expires=100)
+    assert cache.get('a', now=0) == 'A'
+
+    cache.set('c', 'C', expires=100)
+    assert cache.get('b', now=0) is None, "b was the least recently used entry"
+    assert cache.get('a', now=100) is None, "a has expired"
+    assert cache.info() == {'hits': 1, 'misses': 2, 'size': 1, 'maxsize': 2}
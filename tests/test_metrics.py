@@ -0,0 +1,96 @@
+# tests/test_metrics.py
+
+from rswiki_wrapper import DiskCache, Latest, Mapping, MemoryCache, Metrics, Runescape, WikiClient
+from rswiki_wrapper.metrics import RequestEvent
+from tests.conftest import make_response
+
+
+def instrumented(client, **caches):
+    """Give the offline client a metrics registry, and optionally caches"""
+    client.metrics = Metrics()
+    for name, cache in caches.items():
+        setattr(client, name, cache)
+    return client.metrics
+
+
+def test_request_metrics(client, fake_adapter):
+    """Tests that each request records its labels, status, size and phases, with decode timed by the query"""
+
+    metrics = instrumented(client)
+    events = []
+    metrics.subscribe(events.append)
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 1}}}
+
+    Latest(user_agent='Test', client=client)
+    Latest(user_agent='Test', client=client)
+
+    route = metrics.to_dict()['prices.runescape.wiki']['/api/v1/osrs/latest']
+    assert route['requests'] == {200: 2}
+    assert route['bytes'] == 2 * len(b'{"data": {"2": {"high": 1}}}')
+    assert route['cache'] == {}, "A client without caches should not record cache results"
+    assert set(route['phases']) == {'queue', 'response', 'download', 'decode'}
+    assert all(phase['count'] == 2 for phase in route['phases'].values())
+
+    assert len(events) == 2 and events[0].status == 200 and events[0].cache is None
+
+
+def test_route_labels_and_errors(client, fake_adapter):
+    """Tests that query strings are dropped, duplicate slashes are collapsed and error statuses are counted"""
+
+    metrics = instrumented(client)
+    Runescape('vos', user_agent='Test', client=client)
+    fake_adapter.routes['/runescape//vos'] = make_response(503, {'error': 'busy'}, {'Content-Length': '17'})
+    Runescape('vos', user_agent='Test', client=client)
+
+    route = metrics.to_dict()['api.weirdgloop.org']['/runescape/vos']
+    assert route['requests'] == {404: 1, 503: 1}
+    assert route['bytes'] == len(b'{"error": "not found"}') + 17, "Content-Length should be used when sent"
+
+
+def test_cache_results(client, fake_adapter, tmp_path):
+    """Tests that memory cache hits are not counted as requests, and disk revalidations are labelled"""
+
+    metrics = instrumented(client, memory_cache=MemoryCache(ttl=60))
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {}}
+    Latest(user_agent='Test', client=client)
+    Latest(user_agent='Test', client=client)
+
+    route = metrics.to_dict()['prices.runescape.wiki']['/api/v1/osrs/latest']
+    assert route['cache'] == {'miss': 1, 'hit': 1}
+    assert route['requests'] == {200: 1}
+
+    disk = WikiClient(cache=DiskCache(str(tmp_path)), metrics=Metrics())
+    disk.session = client.session
+    fake_adapter.routes['/api/v1/osrs/mapping'] = lambda request: make_response(
+        304 if 'If-None-Match' in request.headers else 200, [{'id': 2}], {'ETag': '"v1"'})
+    Mapping(user_agent='Test', client=disk)
+    Mapping(user_agent='Test', client=disk)
+
+    route = disk.metrics.to_dict()['prices.runescape.wiki']['/api/v1/osrs/mapping']
+    assert route['cache'] == {'miss': 1, 'revalidated': 1}
+    assert route['requests'] == {200: 1, 304: 1}
+
+
+def test_prometheus_export():
+    """Tests the text exposition format, including cumulative histogram buckets"""
+
+    metrics = Metrics(buckets=(0.1, 1))
+    for seconds in (0.05, 0.5, 5):
+        metrics.observe(RequestEvent('prices.runescape.wiki', '/api/v1/osrs/latest', 200, 100, 'miss', 1,
+                                     {'response': seconds}))
+
+    text = metrics.to_prometheus()
+    labels = 'host="prices.runescape.wiki",route="/api/v1/osrs/latest"'
+    assert '# TYPE rswiki_requests_total counter' in text
+    assert f'rswiki_requests_total{{{labels},status="200"}} 3' in text
+    assert f'rswiki_response_bytes_total{{{labels}}} 300' in text
+    assert f'rswiki_cache_total{{{labels},result="miss"}} 3' in text
+    assert f'rswiki_retries_total{{{labels}}} 3' in text
+    assert f'rswiki_phase_seconds_bucket{{{labels},phase="response",le="0.1"}} 1' in text
+    assert f'rswiki_phase_seconds_bucket{{{labels},phase="response",le="1"}} 2' in text
+    assert f'rswiki_phase_seconds_bucket{{{labels},phase="response",le="+Inf"}} 3' in text
+    assert f'rswiki_phase_seconds_count{{{labels},phase="response"}} 3' in text
+    assert text.endswith('\n')
+
+    metrics.reset()
+    assert metrics.to_dict() == {}
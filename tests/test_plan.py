@@ -0,0 +1,135 @@
+# tests/test_plan.py
+
+import threading
+from time import sleep
+
+from pytest import fixture, raises
+from requests import HTTPError
+
+from rswiki_wrapper import Exchange, Latest, Mapping, MediaWiki, QueryPlan, Runescape, TimeSeries
+from tests.conftest import make_response
+
+
+@fixture
+def plan(client):
+    return QueryPlan(client=client, per_host=4)
+
+
+def series(request):
+    item_id = int(request.url.split('id=')[1].split('&')[0])
+    return {'data': [{'timestamp': 300, 'avgHighPrice': item_id, 'avgLowPrice': None, 'highPriceVolume': 1,
+                      'lowPriceVolume': 0}], 'itemId': item_id}
+
+
+def test_queries_are_deferred(plan, fake_adapter, user_agent):
+    """Tests that planned queries send nothing until executed, and can be inspected"""
+
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 1}}}
+    fake_adapter.routes['/api/v1/osrs/timeseries'] = series
+
+    latest = Latest(user_agent=user_agent, client=plan)
+    points = TimeSeries(id='2', timestep='5m', user_agent=user_agent, client=plan)
+
+    assert fake_adapter.requests == [], "Building planned queries should not send requests"
+    assert plan.queries == [latest, points]
+    assert plan.requests() == ['https://prices.runescape.wiki/api/v1/osrs/latest',
+                               'https://prices.runescape.wiki/api/v1/osrs/timeseries?id=2&timestep=5m']
+
+    assert plan.execute() == [latest, points]
+    assert latest.content == {'2': {'high': 1}}
+    assert points.content[0]['avgHighPrice'] == 2
+    assert plan.queries == [], "Executing should empty the plan"
+
+
+def test_duplicates_collapsed(plan, fake_adapter, user_agent):
+    """Tests that identical requests, including the chunks of Exchange lists, are sent once"""
+
+    fake_adapter.routes['/api/v1/osrs/timeseries'] = series
+    fake_adapter.routes['/exchange/history/rs/latest'] = lambda request: {
+        item: {'id': item, 'price': 1} for item in request.url.split('id=')[1].split('%7C')}
+
+    queries = [TimeSeries(id=item_id, timestep='5m', user_agent=user_agent, client=plan)
+               for item_id in ('2', '6', '2', '6', '2')]
+    # Keyword order does not matter
+    queries.append(TimeSeries(timestep='5m', id='2', user_agent=user_agent, client=plan))
+    exchanges = [Exchange('rs', 'latest', user_agent=user_agent, client=plan, id=['2', '6', '8'], chunk_size=2)
+                 for _ in range(3)]
+
+    plan.execute()
+
+    assert len(fake_adapter.requests) == 4, "Two time-series and two Exchange chunks should be sent"
+    assert [query.content[0]['avgHighPrice'] for query in queries] == [2, 6, 2, 6, 2, 2]
+    assert all(set(exchange.content) == {'2', '6', '8'} for exchange in exchanges)
+    assert len(exchanges[0].responses) == 2
+
+
+def test_hosts_run_concurrently(client, fake_adapter, user_agent):
+    """Tests that hosts are queried concurrently, with at most per_host requests in flight to each host"""
+
+    lock = threading.Lock()
+    in_flight = {}
+    peak = {}
+
+    def tracked(payload):
+        def route(request):
+            host = request.url.split('/')[2]
+            with lock:
+                in_flight[host] = in_flight.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), in_flight[host])
+            sleep(0.02)
+            with lock:
+                in_flight[host] -= 1
+            return make_response(200, payload(request) if callable(payload) else payload)
+        return route
+
+    fake_adapter.routes['/api/v1/osrs/timeseries'] = tracked(series)
+    fake_adapter.routes['/runescape//vos'] = tracked({'district1': 'Cadarn'})
+
+    plan = QueryPlan(client=client, per_host=2)
+    for item_id in range(8):
+        TimeSeries(id=str(item_id), timestep='5m', user_agent=user_agent, client=plan)
+    Runescape('vos', user_agent=user_agent, client=plan)
+    plan.execute()
+
+    assert peak['prices.runescape.wiki'] == 2, "Requests to one host should be bounded by per_host"
+    assert peak['api.weirdgloop.org'] == 1
+
+
+def test_mediawiki_deferred(plan, fake_adapter, user_agent):
+    """Tests that MediaWiki.ask and browse are deferred, while helpers built on them still run at once"""
+
+    def api(request):
+        if 'smwbrowse' in request.url:
+            return {'query': {'subject': 'Cake', 'data': [
+                {'property': 'All_Item_ID', 'dataitem': [{'type': 2, 'item': '1891#0##'}]}]}}
+        return {'query': {'results': {'Cake': {'printouts': {}}}}}
+    fake_adapter.routes['/api.php'] = api
+
+    ask = MediaWiki('osrs', user_agent=user_agent, client=plan)
+    ask.ask(conditions=['Category:Items'], printouts=['Production JSON'])
+    browse = MediaWiki('osrs', user_agent=user_agent, client=plan)
+    browse.browse(browse='subject', params='{"subject": "Cake", "ns": 0}')
+    assert ask.json is None and browse.json is None and fake_adapter.requests == []
+
+    plan.execute()
+    assert ask.json['query']['results'] == {'Cake': {'printouts': {}}}
+    assert browse.json['query']['subject'] == 'Cake'
+
+    helper = MediaWiki('osrs', user_agent=user_agent, client=plan)
+    helper.browse_properties('Cake')
+    assert helper.content == {'All_Item_ID': '1891'}, "Helpers should run through the wrapped client at once"
+    assert plan.queries == []
+
+
+def test_errors_after_completion(plan, fake_adapter, user_agent):
+    """Tests that a failed request raises once the other queries have been completed"""
+
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {}}
+    fake_adapter.routes['/api/v1/osrs/mapping'] = make_response(503, None)
+
+    Mapping(user_agent=user_agent, client=plan)
+    latest = Latest(user_agent=user_agent, client=plan)
+
+    with raises(HTTPError):
+        plan.execute()
+    assert latest.content == {}
@@ -0,0 +1,58 @@
+# tests/test_ratelimit.py
+
+from rswiki_wrapper import MediaWiki, RateLimiter, WikiClient
+from rswiki_wrapper.ratelimit import TokenBucket
+
+
+def test_token_bucket():
+    """Tests the token bucket allows a burst of its capacity and then waits for the rate"""
+
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 0.1
+
+
+def test_per_host_buckets():
+    """Tests that each host has its own bucket and per-host rates are applied"""
+
+    limiter = RateLimiter(rate=1, per_host={'prices.runescape.wiki': 5})
+    prices = limiter.bucket('https://prices.runescape.wiki/api/v1/osrs/latest')
+
+    assert prices is limiter.bucket('https://prices.runescape.wiki/api/v1/osrs/mapping')
+    assert prices is not limiter.bucket('https://api.weirdgloop.org/exchange/history/rs/latest')
+    assert prices.rate == 5
+    assert limiter.try_acquire('https://api.weirdgloop.org/runescape/vos') == 0
+    assert limiter.try_acquire('https://api.weirdgloop.org/runescape/vos') > 0
+
+
+def test_shared_file_bucket(tmp_path):
+    """Tests that two limiters using the same directory share one budget, as separate processes would"""
+
+    first = RateLimiter(rate=0.5, directory=str(tmp_path))
+    second = RateLimiter(rate=0.5, directory=str(tmp_path))
+    url = 'https://oldschool.runescape.wiki/api.php'
+
+    assert first.try_acquire(url) == 0
+    assert second.try_acquire(url) > 1, "The token was already taken by the other limiter"
+
+
+def test_client_rate_limiter(fake_adapter, monkeypatch):
+    """Tests that the client waits on the limiter and ASK paging skips the fixed pause"""
+
+    def fail(seconds):
+        raise AssertionError('The fixed pause should not be used with a rate limiter')
+
+    monkeypatch.setattr('rswiki_wrapper.wiki.sleep', fail)
+    pages = iter([{'query-continue-offset': 1, 'query': {'results': {}}}, {'query': {'results': {}}}])
+    fake_adapter.routes['/api.php'] = lambda request: next(pages)
+
+    limiter = RateLimiter(rate=1000, capacity=10)
+    acquired = []
+    monkeypatch.setattr(limiter, 'acquire', acquired.append)
+    client = WikiClient(rate_limiter=limiter)
+    client.session.mount('https://', fake_adapter)
+
+    query = MediaWiki('osrs', user_agent='RS Wiki API Python Wrapper - Test Suite', client=client)
+    assert len(list(query.iter_ask(['Production JSON::+'], ['Production JSON']))) == 2
+    assert acquired == ['https://oldschool.runescape.wiki/api.php'] * 2
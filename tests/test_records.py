@@ -0,0 +1,63 @@
+# tests/test_records.py
+
+from pytest import fixture, raises
+
+from rswiki_wrapper import AvgPrice, Latest, LatestPrice, Mapping, MappingItem, TimeSeries, TimeSeriesPoint
+
+
+@fixture
+def routes(fake_adapter):
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {'2': {'high': 150, 'highTime': 1, 'low': None,
+                                                                 'lowTime': None}}}
+    fake_adapter.routes['/api/v1/osrs/5m'] = {'data': {'2': {'avgHighPrice': 150, 'avgLowPrice': 140,
+                                                             'highPriceVolume': 3, 'lowPriceVolume': 4}},
+                                              'timestamp': 300}
+    fake_adapter.routes['/api/v1/osrs/timeseries'] = {'data': [{'timestamp': 300, 'avgHighPrice': 150}]}
+    fake_adapter.routes['/api/v1/osrs/mapping'] = [{'id': 453, 'name': 'Coal', 'members': False, 'limit': 13000},
+                                                   {'id': 2, 'name': 'Cannonball', 'members': True}]
+    return fake_adapter
+
+
+def test_record_access():
+    """Tests that records can be read like the dict rows they replace"""
+
+    record = LatestPrice.from_dict({'high': 150, 'highTime': 1, 'unknown': 'ignored'})
+
+    assert record.high == 150 and record['highTime'] == 1
+    assert record.low is None, "Missing fields should be None"
+    assert record.get('low', 0) is None and record.get('unknown', 0) == 0
+    assert record == LatestPrice(150, 1)
+    assert record.to_dict() == {'high': 150, 'highTime': 1, 'low': None, 'lowTime': None}
+    with raises(KeyError):
+        record['unknown']
+    with raises(AttributeError):
+        record.unknown = 1
+
+
+def test_query_records(client, routes, user_agent):
+    """Tests that each query class builds records when asked to"""
+
+    latest = Latest(user_agent=user_agent, client=client, records=True)
+    assert latest.content['2'] == LatestPrice(high=150, highTime=1)
+    assert latest.json['data'] is latest.content, "The dicts should not be kept alongside the records"
+
+    avg_price = AvgPrice('5m', user_agent=user_agent, client=client, records=True)
+    assert avg_price.content['2'].lowPriceVolume == 4
+    assert avg_price.json['timestamp'] == 300
+
+    series = TimeSeries(id=2, timestep='5m', user_agent=user_agent, client=client, records=True)
+    assert series.content == [TimeSeriesPoint(timestamp=300, avgHighPrice=150)]
+    assert 'records' not in series.params, "The flag should not be sent to the API"
+
+    assert isinstance(Latest(user_agent=user_agent, client=client).content['2'], dict)
+
+
+def test_mapping_records_index(client, routes, user_agent):
+    """Tests that the Mapping lookups work on records"""
+
+    mapping = Mapping(user_agent=user_agent, client=client, records=True)
+
+    assert isinstance(mapping.content[0], MappingItem)
+    assert mapping.get_id('coal') == 453
+    assert mapping.get_item(2).name == 'Cannonball'
+    assert mapping.get_item(2).limit is None
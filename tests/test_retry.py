@@ -0,0 +1,158 @@
+# tests/test_retry.py
+
+import threading
+from time import perf_counter, sleep
+
+from pytest import raises
+from requests import ConnectionError, HTTPError
+
+from rswiki_wrapper import CircuitBreaker, CircuitOpenError, Latest, Metrics, RetryPolicy, StandInServer, WikiClient
+from rswiki_wrapper.retry import parse_retry_after
+from tests.conftest import make_response
+
+LATEST = '/api/v1/osrs/latest'
+
+
+def sequence(*responses):
+    """Answer each request with the next response, repeating the last one"""
+    queue = list(responses)
+
+    def route(request):
+        response = queue.pop(0) if len(queue) > 1 else queue[0]
+        return response() if callable(response) else make_response(*response)
+    return route
+
+
+def test_retry_until_success(client, fake_adapter, monkeypatch):
+    """Tests that 429 and 5xx responses are retried with growing jittered waits, and retries are counted"""
+
+    waits = []
+    monkeypatch.setattr('rswiki_wrapper.client.sleep', waits.append)
+    client.retry = RetryPolicy(retries=3, backoff=1, seed=0)
+    client.metrics = Metrics()
+    fake_adapter.routes[LATEST] = sequence((503, None), (429, None), (200, {'data': {'2': {'high': 1}}}))
+
+    latest = Latest(user_agent='Test', client=client)
+
+    assert latest.content == {'2': {'high': 1}}
+    assert len(fake_adapter.requests) == 3
+    assert 0 <= waits[0] <= 1 and 0 <= waits[1] <= 2, "Waits should be drawn up to backoff * 2 ** attempt"
+    route = client.metrics.to_dict()['prices.runescape.wiki'][LATEST]
+    assert route['retries'] == 2 and route['requests'] == {200: 1}
+
+
+def test_retry_after(client, fake_adapter, monkeypatch):
+    """Tests that Retry-After is respected, and a wait longer than allowed ends the retries with an HTTPError"""
+
+    waits = []
+    monkeypatch.setattr('rswiki_wrapper.client.sleep', waits.append)
+    client.retry = RetryPolicy(retries=3, max_retry_after=10)
+    fake_adapter.routes[LATEST] = sequence((429, None, {'Retry-After': '7'}), (200, {'data': {}}))
+
+    Latest(user_agent='Test', client=client)
+    assert waits == [7.0]
+
+    fake_adapter.routes[LATEST] = sequence((429, None, {'Retry-After': '3600'}))
+    with raises(HTTPError):
+        Latest(user_agent='Test', client=client)
+    assert waits == [7.0], "A Retry-After above max_retry_after should not be waited for"
+
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+
+
+def test_connection_errors(client, fake_adapter, monkeypatch):
+    """Tests that connection errors are retried and raised once the retries are used up"""
+
+    monkeypatch.setattr('rswiki_wrapper.client.sleep', lambda seconds: None)
+    client.retry = RetryPolicy(retries=2)
+
+    def refuse(request):
+        raise ConnectionError('refused')
+    fake_adapter.routes[LATEST] = refuse
+
+    with raises(ConnectionError):
+        Latest(user_agent='Test', client=client)
+    assert len(fake_adapter.requests) == 3
+
+
+def test_circuit_breaker(client, fake_adapter):
+    """Tests that the circuit opens after repeated failures, fails fast, and closes after a good trial request"""
+
+    client.breaker = CircuitBreaker(failures=2, reset_timeout=0.05)
+    fake_adapter.routes[LATEST] = sequence((503, None), (503, None), (200, {'data': {}}))
+
+    for _ in range(2):
+        with raises(HTTPError):
+            Latest(user_agent='Test', client=client)
+    assert client.breaker.state('https://prices.runescape.wiki/') == 'open'
+
+    with raises(CircuitOpenError):
+        Latest(user_agent='Test', client=client)
+    assert len(fake_adapter.requests) == 2, "An open circuit should not send requests"
+
+    sleep(0.06)
+    assert client.breaker.state('https://prices.runescape.wiki/') == 'half-open'
+    Latest(user_agent='Test', client=client)
+    assert client.breaker.state('https://prices.runescape.wiki/') == 'closed'
+
+
+def test_hedged_latest(client, fake_adapter):
+    """Tests that a slow Latest request is hedged and the first answer is used"""
+
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return make_response(200, {'data': {'2': {'high': 'slow'}}})
+    fake_adapter.routes[LATEST] = sequence(slow, (200, {'data': {'2': {'high': 'fast'}}}))
+
+    started = perf_counter()
+    latest = Latest(user_agent='Test', client=client, hedge=0.05)
+    elapsed = perf_counter() - started
+    release.set()
+
+    assert latest.content['2']['high'] == 'fast'
+    assert elapsed < 1, "The hedged request should answer before the slow one"
+    assert len(fake_adapter.requests) == 2
+
+
+def test_hedged_latest_fast_primary(client, fake_adapter):
+    """Tests that a hedged request answered within the delay is used as it is, without a second request"""
+
+    fake_adapter.routes[LATEST] = sequence((200, {'data': {'2': {'high': 'first'}}}))
+
+    latest = Latest(user_agent='Test', client=client, hedge=0.5)
+
+    assert latest.content['2']['high'] == 'first'
+    assert len(fake_adapter.requests) == 1, "No hedge should be sent when the first answer is in time"
+
+
+def test_hedged_loser_closed(client, fake_adapter):
+    """Tests that the response of the attempt losing the race is closed once it arrives"""
+
+    release = threading.Event()
+    slow_response = make_response(200, {'data': {'2': {'high': 'slow'}}})
+    closed = threading.Event()
+    slow_response.close = closed.set
+
+    def slow():
+        release.wait(2)
+        return slow_response
+    fake_adapter.routes[LATEST] = sequence(slow, (200, {'data': {'2': {'high': 'fast'}}}))
+
+    latest = Latest(user_agent='Test', client=client, hedge=0.05)
+    release.set()
+
+    assert latest.content['2']['high'] == 'fast'
+    assert closed.wait(2), "The losing response should be closed"
+
+
+def test_throttled_standin():
+    """Tests that queries keep succeeding against a server rejecting half of all requests"""
+
+    with StandInServer(items=20, error_rate=0.5, retry_after=0, seed=1) as server:
+        client = WikiClient(base_url=server.url, retry=RetryPolicy(retries=10))
+        for _ in range(5):
+            assert len(Latest(user_agent='Test', client=client).content) == 20
+        assert len(server.requests) > 5
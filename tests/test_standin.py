@@ -0,0 +1,75 @@
+# tests/test_standin.py
+
+from pytest import fixture
+
+from rswiki_wrapper import AvgPrice, Exchange, Latest, Mapping, MediaWiki, Runescape, TimeSeries, WikiClient
+from rswiki_wrapper.standin import StandInServer
+
+
+@fixture
+def server():
+    with StandInServer(items=300, series_points=30, ask_results=120) as stand_in:
+        yield stand_in
+
+
+@fixture
+def standin_client(server):
+    with WikiClient(base_url=server.url) as client:
+        yield client
+
+
+def test_prices_routes(standin_client, user_agent):
+    """Tests the real-time prices routes through the base-URL override"""
+
+    latest = Latest(user_agent=user_agent, client=standin_client)
+    assert len(latest.content) == 300
+    assert set(latest.content['2']) == {'high', 'highTime', 'low', 'lowTime'}
+    assert latest.url.startswith('https://prices.runescape.wiki/'), "Queries should keep their upstream URL"
+
+    assert Mapping(user_agent=user_agent, client=standin_client).get_item(2)['name'] == 'Item 2'
+
+    avg_price = AvgPrice('1h', user_agent=user_agent, client=standin_client, timestamp=3600)
+    assert avg_price.json['timestamp'] == 3600
+    assert len(avg_price.content) == 300
+
+    series = TimeSeries(id=2, timestep='5m', user_agent=user_agent, client=standin_client)
+    assert len(series.content) == 30
+
+
+def test_weirdgloop_routes(standin_client, user_agent):
+    """Tests the Weird Gloop exchange and runescape routes"""
+
+    latest = Exchange('rs', 'latest', user_agent=user_agent, client=standin_client, id=['2', '6'])
+    assert latest.content['6'][0]['id'] == '6'
+
+    history = Exchange('osrs', 'last90d', user_agent=user_agent, client=standin_client, name='Coal')
+    assert len(history.content['Coal']) == 90
+
+    assert 'district1' in Runescape('vos', user_agent=user_agent, client=standin_client).content
+
+
+def test_mediawiki_routes(server, standin_client, user_agent, monkeypatch):
+    """Tests the ASK pagination and SMWbrowse subject routes"""
+
+    monkeypatch.setattr('rswiki_wrapper.wiki.sleep', lambda seconds: None)
+
+    query = MediaWiki('osrs', user_agent=user_agent, client=standin_client)
+    query.ask_production(get_all=True)
+    assert len(query.content) == 120
+    assert query.content['Result 119'][0]['output']['cost'] == 119
+    assert len(server.requests) == 3, "Three pages of 50 results should be requested"
+
+    query.browse_properties('Cake')
+    assert query.content['Production_JSON']['output']['name'] == 'Cake'
+
+
+def test_latency_and_rate_limiting(user_agent):
+    """Tests the configurable latency and 429 injection"""
+
+    with StandInServer(items=5, latency=0.05, error_rate=1, retry_after=7) as server:
+        with WikiClient(base_url=server.url) as client:
+            response = client.get('https://prices.runescape.wiki/api/v1/osrs/latest')
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '7'
+    assert response.elapsed.total_seconds() >= 0.05
@@ -0,0 +1,100 @@
+# tests/test_store.py
+
+from pytest import fixture, importorskip, raises
+
+np = importorskip('numpy')
+
+from rswiki_wrapper import AvgPrice, PriceStore
+
+START = 1672531200
+
+
+@fixture
+def buckets(fake_adapter):
+    """Serves three hourly buckets, the last one being the current bucket"""
+    snapshots = {
+        START: {'2': {'avgHighPrice': 150, 'avgLowPrice': 140, 'highPriceVolume': 10, 'lowPriceVolume': 30}},
+        START + 3600: {'2': {'avgHighPrice': 160, 'avgLowPrice': None, 'highPriceVolume': 5, 'lowPriceVolume': 0},
+                       '6': {'avgHighPrice': 9000, 'avgLowPrice': 8000, 'highPriceVolume': 1, 'lowPriceVolume': 2}},
+        START + 7200: {'6': {'avgHighPrice': 9100, 'avgLowPrice': 8100, 'highPriceVolume': 3, 'lowPriceVolume': 4}},
+    }
+
+    def serve(request):
+        timestamp = int(request.url.split('timestamp=')[1]) if 'timestamp=' in request.url else START + 7200
+        return {'data': snapshots[timestamp], 'timestamp': timestamp}
+
+    fake_adapter.routes['/api/v1/osrs/1h'] = serve
+    return snapshots
+
+
+def test_sync_backfills(tmp_path, client, fake_adapter, buckets, user_agent):
+    """Tests that sync ingests the current bucket and backfills the missed ones"""
+
+    store = PriceStore(str(tmp_path), timestep='1h', start=START)
+    assert store.sync(user_agent=user_agent, client=client) == 3
+    assert len(fake_adapter.requests) == 3
+    assert list(store.timestamps()) == [START, START + 3600, START + 7200]
+    assert store.missing(START + 7200) == []
+
+    assert store.sync(user_agent=user_agent, client=client) == 1, "Nothing should be left to backfill"
+
+
+def test_sync_limit(tmp_path, client, buckets, user_agent):
+    """Tests that limit backfills the newest missed buckets, and all of them when it exceeds the number missed"""
+
+    store = PriceStore(str(tmp_path / 'one'), timestep='1h', start=START)
+    assert store.sync(user_agent=user_agent, client=client, limit=1) == 2
+    assert list(store.timestamps()) == [START + 3600, START + 7200]
+
+    store = PriceStore(str(tmp_path / 'all'), timestep='1h', start=START)
+    assert store.sync(user_agent=user_agent, client=client, limit=3) == 3, "Both missed buckets should be backfilled"
+    assert list(store.timestamps()) == [START, START + 3600, START + 7200]
+
+
+def test_item_history(tmp_path, client, buckets, user_agent):
+    """Tests reading the history of one item, including a time range"""
+
+    store = PriceStore(str(tmp_path), timestep='1h', start=START)
+    store.sync(user_agent=user_agent, client=client)
+
+    history = store.item(2)
+    assert list(history.timestamp) == [START, START + 3600, START + 7200]
+    assert list(history['avgHighPrice'].filled(0)) == [150, 160, 0]
+    assert history['avgLowPrice'][1] is np.ma.masked, "Missing prices should be masked"
+    assert history['avgHighPrice'][2] is np.ma.masked, "Untraded buckets should be masked"
+
+    ranged = store.item(6, start=START + 3600, end=START + 7200)
+    assert list(ranged.timestamp) == [START + 3600]
+    assert ranged['avgHighPrice'][0] == 9000
+
+
+def test_window_and_snapshot(tmp_path, client, buckets, user_agent):
+    """Tests reading every item over a time range and in one bucket"""
+
+    store = PriceStore(str(tmp_path), timestep='1h', start=START)
+    store.sync(user_agent=user_agent, client=client)
+
+    window = store.window(start=START + 3600)
+    assert list(window['timestamp']) == [START + 3600, START + 7200]
+    assert list(window['id']) == [6, 2], "Columns should be in the order items were first stored"
+    assert window['avgHighPrice'].shape == (2, 2)
+    assert window['avgHighPrice'][1, 0] == 9100
+    assert window['avgHighPrice'][1, 1] is np.ma.masked
+
+    table = store.snapshot(START + 3600)
+    assert list(table.ids) == [2, 6]
+    assert table['avgHighPrice'][6] == 9000
+    with raises(KeyError):
+        store.snapshot(START + 10800)
+
+
+def test_reopen(tmp_path, client, buckets, user_agent):
+    """Tests that a store keeps its settings and history when it is opened again"""
+
+    store = PriceStore(str(tmp_path), timestep='1h', start=START)
+    store.ingest(AvgPrice('1h', user_agent=user_agent, client=client, timestamp=START))
+
+    reopened = PriceStore(str(tmp_path), timestep='5m')
+    assert reopened.timestep == '1h', "The stored timestep should win over the argument"
+    assert reopened.missing(START + 3600) == [START + 3600]
+    assert reopened.item(2)['avgLowPrice'][0] == 140
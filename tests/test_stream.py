@@ -0,0 +1,69 @@
+# tests/test_stream.py
+
+import io
+import json
+
+from pytest import raises
+from requests import HTTPError, Response
+
+from rswiki_wrapper import AvgPrice, Latest, Mapping
+from rswiki_wrapper.stream import iter_members
+
+
+def streamed(payload, status_code=200):
+    """Build a response whose body is read from a raw stream, as with ``stream=True``"""
+    def route(request):
+        response = Response()
+        response.status_code = status_code
+        response.raw = io.BytesIO(json.dumps(payload).encode('utf-8'))
+        return response
+    return route
+
+
+def chunked(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_iter_members_chunk_boundaries():
+    """Tests that objects are found whatever the chunk boundaries, including braces and quotes inside strings"""
+
+    payload = {'data': {'2': {'name': 'Odd "{item}" [1]\\', 'high': 1}, '6': {'name': '}}', 'high': None}},
+               'timestamp': 300}
+    body = json.dumps(payload).encode('utf-8')
+
+    for size in (1, 2, 3, 7, 64, len(body)):
+        members = [(key, json.loads(value)) for key, value in iter_members(chunked(body, size), 2)]
+        assert members == list(payload['data'].items()), f"Chunks of {size} bytes should not change the result"
+
+
+def test_latest_stream(client, fake_adapter, user_agent):
+    """Tests that Latest.stream yields the same items as .content"""
+
+    data = {str(n): {'high': n, 'highTime': 1, 'low': None, 'lowTime': None} for n in range(50)}
+    fake_adapter.routes['/api/v1/osrs/latest'] = streamed({'data': data})
+
+    items = list(Latest.stream(user_agent=user_agent, client=client, chunk_size=16))
+    assert items == list(data.items())
+
+
+def test_avg_price_stream(client, fake_adapter, user_agent):
+    """Tests that AvgPrice.stream passes its kwargs and skips the timestamp"""
+
+    data = {'2': {'avgHighPrice': 150, 'avgLowPrice': 140, 'highPriceVolume': 1, 'lowPriceVolume': 2}}
+    fake_adapter.routes['/api/v1/osrs/1h'] = streamed({'data': data, 'timestamp': 3600})
+
+    items = list(AvgPrice.stream('1h', user_agent=user_agent, client=client, timestamp=3600))
+    assert items == [('2', data['2'])]
+    assert 'timestamp=3600' in fake_adapter.requests[0].url
+
+
+def test_mapping_stream(client, fake_adapter, user_agent):
+    """Tests that Mapping.stream yields item dicts and errors are raised"""
+
+    mapping = [{'id': n, 'name': f'Item {n}', 'examine': 'A {curly} item.'} for n in range(20)]
+    fake_adapter.routes['/api/v1/osrs/mapping'] = streamed(mapping)
+    assert list(Mapping.stream(user_agent=user_agent, client=client, chunk_size=5)) == mapping
+
+    fake_adapter.routes['/api/v1/osrs/mapping'] = streamed({'error': 'busy'}, status_code=503)
+    with raises(HTTPError):
+        list(Mapping.stream(user_agent=user_agent, client=client))
@@ -0,0 +1,98 @@
+# tests/test_tables.py
+
+from pytest import fixture, importorskip
+
+np = importorskip('numpy')
+
+from rswiki_wrapper import AvgPrice, Latest, TimeSeries
+
+
+@fixture
+def latest_table(client, fake_adapter, user_agent):
+    fake_adapter.routes['/api/v1/osrs/latest'] = {'data': {
+        '2': {'high': 200, 'highTime': 10, 'low': 150, 'lowTime': 11},
+        '6': {'high': 300000000, 'highTime': 12, 'low': 299000000, 'lowTime': 13},
+        '10': {'high': 50, 'highTime': 14, 'low': None, 'lowTime': None},
+    }}
+    return Latest(user_agent=user_agent, client=client).to_table()
+
+
+def test_latest_table(latest_table):
+    """Tests the table is indexed by item ID with missing values masked"""
+
+    assert list(latest_table.ids) == [2, 6, 10]
+    assert latest_table['high'][2] == 200
+    assert latest_table['lowTime'][6] == 13
+    assert latest_table['low'][10] is np.ma.masked
+    assert latest_table['high'][3] is np.ma.masked, "Items not in the content should be masked"
+
+
+def test_latest_helpers(latest_table):
+    """Tests the vectorized spread, margin and after-tax profit"""
+
+    assert latest_table.spread()[2] == 50
+    assert latest_table.spread()[10] is np.ma.masked
+    assert abs(latest_table.margin()[2] - 50 / 150) < 1e-9
+    assert latest_table.profit()[2] == 50 - 4
+    assert latest_table.profit()[6] == 1000000 - 5000000, "The tax should be capped"
+    assert latest_table.profit(exempt=[2])[2] == 50
+
+
+def test_avg_price_table(client, fake_adapter, user_agent):
+    """Tests the AvgPrice table columns and volume-weighted price"""
+
+    fake_adapter.routes['/api/v1/osrs/5m'] = {'data': {
+        '2': {'avgHighPrice': 160, 'highPriceVolume': 3, 'avgLowPrice': 150, 'lowPriceVolume': 1},
+        '4': {'avgHighPrice': None, 'highPriceVolume': 0, 'avgLowPrice': 90, 'lowPriceVolume': 2},
+    }}
+    table = AvgPrice('5m', user_agent=user_agent, client=client).to_table()
+
+    assert table.spread()[2] == 10
+    assert table.volume_weighted_price()[2] == (160 * 3 + 150) / 4
+    assert table.volume_weighted_price()[4] == 90
+
+
+@fixture
+def series_table(client, fake_adapter, user_agent):
+    fake_adapter.routes['/api/v1/osrs/timeseries'] = {'data': [
+        {'timestamp': 3600, 'avgHighPrice': 100, 'avgLowPrice': 90, 'highPriceVolume': 1, 'lowPriceVolume': 2},
+        {'timestamp': 3900, 'avgHighPrice': 110, 'avgLowPrice': None, 'highPriceVolume': 3, 'lowPriceVolume': 0},
+        {'timestamp': 4800, 'avgHighPrice': None, 'avgLowPrice': 80, 'highPriceVolume': 0, 'lowPriceVolume': 4},
+        {'timestamp': 7200, 'avgHighPrice': 120, 'avgLowPrice': 100, 'highPriceVolume': 5, 'lowPriceVolume': 5},
+    ]}
+    return TimeSeries(id=2, timestep='5m', user_agent=user_agent, client=client).to_table()
+
+
+def test_series_table(series_table):
+    """Tests the columnar form of a time-series"""
+
+    assert series_table.step == 300
+    assert list(series_table['timestamp']) == [3600, 3900, 4800, 7200]
+    assert series_table['avgLowPrice'][1] is np.ma.masked
+    assert series_table.vwap()[0] == (100 + 90 * 2) / 3
+
+
+def test_series_resample(series_table):
+    """Tests the volume-weighted hourly rollup"""
+
+    hourly = series_table.resample('1h')
+
+    assert hourly.step == 3600
+    assert list(hourly['timestamp']) == [3600, 7200]
+    assert hourly['avgHighPrice'][0] == (100 * 1 + 110 * 3) / 4
+    assert hourly['avgLowPrice'][0] == (90 * 2 + 80 * 4) / 6
+    assert list(hourly['lowPriceVolume']) == [6, 5]
+
+
+def test_series_fill_gaps(series_table):
+    """Tests missing points are inserted masked, or carried forward"""
+
+    filled = series_table.fill_gaps()
+    assert len(filled) == (7200 - 3600) // 300 + 1
+    assert filled['avgHighPrice'][2] is np.ma.masked
+    assert filled['highPriceVolume'][2] == 0
+
+    carried = series_table.fill_gaps('ffill')
+    assert carried['avgHighPrice'][2] == 110
+    assert carried['avgHighPrice'][4] == 110, "A missing price should also be carried forward"
+    assert carried['avgLowPrice'][1] == 90